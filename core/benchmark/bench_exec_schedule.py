@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the latency of the compute_exec_schedule and notify_content_changed
+comm handlers on synthetic notebooks of various shapes, under every
+execution schedule and flow direction.
+"""
+import json
+import logging
+import random
+import sys
+import time
+from test.utils import make_flow_harness
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from benchmark.utils import (
+    latency_percentiles,
+    make_metadata,
+    make_parser,
+    write_results,
+)
+from ipyflow.config import ExecutionSchedule, FlowDirection
+from ipyflow.singletons import flow
+
+logging.basicConfig(level=logging.ERROR)
+
+
+class NotebookShape(NamedTuple):
+    name: str
+    description: str
+    # (num_cells, symbols_per_cell, rng) -> cell contents, in notebook order
+    make_cells: Callable[[int, int, random.Random], List[str]]
+
+
+def _sym(cell_idx: int, sym_idx: int) -> str:
+    return "v%d_%d" % (cell_idx, sym_idx)
+
+
+def _source_cell(num_syms: int) -> str:
+    return "\n".join("%s = %d" % (_sym(0, j), j) for j in range(num_syms))
+
+
+def _chain_cells(num_cells: int, num_syms: int, _rng: random.Random) -> List[str]:
+    return [_source_cell(num_syms)] + [
+        "\n".join("%s = %s + 1" % (_sym(i, j), _sym(i - 1, j)) for j in range(num_syms))
+        for i in range(1, num_cells)
+    ]
+
+
+def _fanout_cells(num_cells: int, num_syms: int, _rng: random.Random) -> List[str]:
+    return [_source_cell(num_syms)] + [
+        "\n".join("%s = %s + %d" % (_sym(i, j), _sym(0, j), i) for j in range(num_syms))
+        for i in range(1, num_cells)
+    ]
+
+
+def _diamond_cells(num_cells: int, num_syms: int, _rng: random.Random) -> List[str]:
+    # every third cell joins the two branches that read from the previous join
+    cells = [_source_cell(num_syms)]
+    for i in range(1, num_cells):
+        if i % 3 == 0:
+            rhs = [
+                "%s + %s" % (_sym(i - 2, j), _sym(i - 1, j)) for j in range(num_syms)
+            ]
+        else:
+            top = i - i % 3
+            rhs = ["%s * %d" % (_sym(top, j), i % 3 + 1) for j in range(num_syms)]
+        cells.append(
+            "\n".join("%s = %s" % (_sym(i, j), rhs[j]) for j in range(num_syms))
+        )
+    return cells
+
+
+def _random_dag_cells(num_cells: int, num_syms: int, rng: random.Random) -> List[str]:
+    cells = [_source_cell(num_syms)]
+    for i in range(1, num_cells):
+        cells.append(
+            "\n".join(
+                "%s = %s + 1"
+                % (_sym(i, j), _sym(rng.randrange(i), rng.randrange(num_syms)))
+                for j in range(num_syms)
+            )
+        )
+    return cells
+
+
+SHAPES = [
+    NotebookShape("chain", "each cell reads the previous one", _chain_cells),
+    NotebookShape("fanout", "every cell reads the first one", _fanout_cells),
+    NotebookShape("diamond", "repeated fork / join of two branches", _diamond_cells),
+    NotebookShape(
+        "random_dag", "each symbol reads a random earlier symbol", _random_dag_cells
+    ),
+]
+
+
+class StubComm:
+    """
+    Stands in for the frontend comm. Responses are serialized like the real
+    comm would, so that their cost and size are part of the measurement.
+    """
+
+    def __init__(self) -> None:
+        self.num_sent = 0
+        self.bytes_sent = 0
+        self.num_failed = 0
+
+    def send(self, data: Dict[str, Any]) -> None:
+        self.num_sent += 1
+        self.bytes_sent += len(json.dumps(data))
+        if not data.get("success", True):
+            self.num_failed += 1
+
+
+def _make_cell_metadata(cells: List[str]) -> Dict[int, Dict[str, Any]]:
+    return {
+        cell_id: {"index": cell_id, "content": content, "type": "code"}
+        for cell_id, content in enumerate(cells)
+    }
+
+
+def _time_request(comm: StubComm, request: Dict[str, Any]) -> float:
+    start = time.perf_counter()
+    flow().handle(request, comm=comm)
+    return time.perf_counter() - start
+
+
+def run_schedule_scenario(
+    shape: NotebookShape,
+    flow_context: Any,
+    run_cell: Callable[..., Any],
+    num_cells: int,
+    symbols_per_cell: int,
+    num_requests: int,
+    seed: int,
+) -> Dict[str, Any]:
+    cells = shape.make_cells(num_cells, symbols_per_cell, random.Random(seed))
+    rng = random.Random(seed)
+    comm = StubComm()
+    compute_latencies: List[float] = []
+    notify_latencies: List[float] = []
+    with flow_context():
+        start = time.perf_counter()
+        for cell_id, content in enumerate(cells):
+            run_cell(content, cell_id=cell_id)
+        execute_seconds = time.perf_counter() - start
+        metadata = _make_cell_metadata(cells)
+        for req_idx in range(num_requests):
+            # the frontend asks for a new schedule after every execution
+            executed_id = rng.randrange(len(cells))
+            run_cell(cells[executed_id], cell_id=executed_id)
+            compute_latencies.append(
+                _time_request(
+                    comm,
+                    {
+                        "type": "compute_exec_schedule",
+                        "executed_cell_id": executed_id,
+                        "cell_metadata_by_id": metadata,
+                    },
+                )
+            )
+            # ... and notifies the kernel whenever some cell gets edited
+            edited_id = rng.randrange(len(cells))
+            metadata = dict(metadata)
+            metadata[edited_id] = dict(
+                metadata[edited_id],
+                content="%s\n# edit %d" % (cells[edited_id], req_idx),
+            )
+            notify_latencies.append(
+                _time_request(
+                    comm,
+                    {"type": "notify_content_changed", "cell_metadata_by_id": metadata},
+                )
+            )
+    return {
+        "shape": shape.name,
+        "description": shape.description,
+        "num_cells": len(cells),
+        "symbols_per_cell": symbols_per_cell,
+        "execute_all_seconds": execute_seconds,
+        "compute_exec_schedule_seconds": latency_percentiles(compute_latencies),
+        "notify_content_changed_seconds": latency_percentiles(notify_latencies),
+        "mean_response_bytes": comm.bytes_sent / comm.num_sent
+        if comm.num_sent > 0
+        else None,
+        "num_failed_requests": comm.num_failed,
+    }
+
+
+def main(argv: List[str]) -> None:
+    parser = make_parser(__doc__.strip(), default_output="exec-schedule.json")
+    parser.add_argument(
+        "-n", "--num-cells", type=int, default=None, help="defaults to 50 * scale"
+    )
+    parser.add_argument("-m", "--symbols-per-cell", type=int, default=5)
+    parser.add_argument(
+        "--requests", type=int, default=20, help="request pairs timed per scenario"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    num_cells: int = args.num_cells or 50 * args.scale
+    results = []
+    for exec_schedule in ExecutionSchedule:
+        for flow_order in FlowDirection:
+            flow_context, run_cell = make_flow_harness(
+                exec_schedule=exec_schedule, flow_direction=flow_order
+            )
+            for shape in SHAPES:
+                name = "%s/%s/%s" % (shape.name, exec_schedule.value, flow_order.value)
+                if args.filter is not None and args.filter not in name:
+                    continue
+                result: Dict[str, Any] = {
+                    "name": name,
+                    "exec_schedule": exec_schedule.value,
+                    "flow_order": flow_order.value,
+                }
+                result.update(
+                    run_schedule_scenario(
+                        shape,
+                        flow_context,
+                        run_cell,
+                        num_cells=num_cells,
+                        symbols_per_cell=args.symbols_per_cell,
+                        num_requests=args.requests,
+                        seed=args.seed,
+                    )
+                )
+                results.append(result)
+    write_results(
+        {
+            "benchmark": "exec_schedule",
+            "metadata": make_metadata(
+                scale=args.scale,
+                num_cells=num_cells,
+                symbols_per_cell=args.symbols_per_cell,
+                requests=args.requests,
+                seed=args.seed,
+            ),
+            "scenarios": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Measures how much memory DataSymbol / Namespace bookkeeping retains per symbol
+for synthetic notebooks that create many explicit and implicit symbols.
+"""
+import gc
+import logging
+import sys
+import tracemalloc
+from test.utils import make_flow_harness
+from typing import Any, Callable, Dict, Iterable, List
+
+from IPython import get_ipython
+
+from benchmark.utils import Scenario, make_metadata, make_parser, write_results
+from ipyflow.singletons import flow
+
+logging.basicConfig(level=logging.ERROR)
+
+
+# attributes that reference user data rather than bookkeeping owned by the symbol
+_NON_OWNED_ATTRS = {"obj"}
+
+
+def _owned_attr_values(obj: Any) -> Iterable[Any]:
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        for name, value in attrs.items():
+            if name not in _NON_OWNED_ATTRS:
+                yield value
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if name not in _NON_OWNED_ATTRS:
+                yield getattr(obj, name, None)
+
+
+def shallow_footprint(obj: Any) -> int:
+    """
+    Size of the object plus that of any containers it directly owns.
+    """
+    size = sys.getsizeof(obj)
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+    for value in _owned_attr_values(obj):
+        if isinstance(value, (dict, list, set)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def _globals_cells(scale: int) -> List[str]:
+    n = 500 * scale
+    return [
+        "\n".join("g%d_%d = %d" % (chunk, i, i) for i in range(n)) for chunk in range(4)
+    ]
+
+
+def _subscript_cells(scale: int) -> List[str]:
+    n = 50 * scale
+    return [
+        "base = 0",
+        "\n".join("lst%d = [%s]" % (i, ", ".join(["base"] * 20)) for i in range(n)),
+        "\n".join(
+            "d%d = {%s}" % (i, ", ".join("%d: base" % j for j in range(20)))
+            for i in range(n)
+        ),
+    ]
+
+
+def _attribute_cells(scale: int) -> List[str]:
+    n = 200 * scale
+    return [
+        """
+        class Point:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+        """,
+        "\n".join("p%d = Point(%d, %d)" % (i, i, i + 1) for i in range(n)),
+        "\n".join("s%d = p%d.x + p%d.y" % (i, i, i) for i in range(n)),
+    ]
+
+
+SCENARIOS = [
+    Scenario("globals", "many plain global variables", _globals_cells),
+    Scenario(
+        "subscripts",
+        "list / dict literals with a symbol per element",
+        _subscript_cells,
+    ),
+    Scenario(
+        "attributes",
+        "objects whose attributes get symbols via loads / stores",
+        _attribute_cells,
+    ),
+]
+
+
+def _retained_bytes(run_cells: Callable[[], None]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        run_cells()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before
+
+
+def run_memory_scenario(
+    scenario: Scenario, flow_context: Any, run_cell: Callable[[str], Any], scale: int
+) -> Dict[str, Any]:
+    cells = scenario.cells(scale)
+    shell = get_ipython()
+
+    names_before = set(shell.user_ns.keys())
+
+    def run_vanilla() -> None:
+        for cell in cells:
+            shell.run_cell(cell, store_history=False, silent=True)
+
+    vanilla_bytes = _retained_bytes(run_vanilla)
+    # drop what the vanilla run defined without clobbering the rest of user_ns
+    for name in set(shell.user_ns.keys()) - names_before:
+        del shell.user_ns[name]
+
+    def run_traced() -> None:
+        for cell in cells:
+            run_cell(cell)
+
+    with flow_context():
+        traced_bytes = _retained_bytes(run_traced)
+        symbols = set(flow().all_data_symbols())
+        namespaces = list(flow().namespaces.values())
+        symbol_bytes = sum(shallow_footprint(sym) for sym in symbols)
+        namespace_bytes = sum(shallow_footprint(ns) for ns in namespaces)
+    num_symbols = len(symbols)
+    overhead_bytes = traced_bytes - vanilla_bytes
+    return {
+        "name": scenario.name,
+        "description": scenario.description,
+        "num_cells": len(cells),
+        "num_symbols": num_symbols,
+        "num_namespaces": len(namespaces),
+        "symbol_shallow_bytes": symbol_bytes,
+        "namespace_shallow_bytes": namespace_bytes,
+        "shallow_bytes_per_symbol": symbol_bytes / num_symbols
+        if num_symbols > 0
+        else None,
+        "vanilla_retained_bytes": vanilla_bytes,
+        "traced_retained_bytes": traced_bytes,
+        "overhead_bytes_per_symbol": overhead_bytes / num_symbols
+        if num_symbols > 0
+        else None,
+    }
+
+
+def main(argv: List[str]) -> None:
+    args = make_parser(__doc__.strip(), default_output="symbol-memory.json").parse_args(
+        argv
+    )
+    flow_context, run_cell = make_flow_harness()
+    results = []
+    for scenario in SCENARIOS:
+        if args.filter is not None and args.filter not in scenario.name:
+            continue
+        results.append(
+            run_memory_scenario(scenario, flow_context, run_cell, scale=args.scale)
+        )
+    write_results(
+        {
+            "benchmark": "symbol_memory",
+            "metadata": make_metadata(scale=args.scale),
+            "scenarios": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the overhead that DataflowTracer adds on top of vanilla IPython
+for synthetic notebooks that stress its hot handlers.
+"""
+import logging
+import sys
+from test.utils import make_flow_harness
+from typing import List
+
+from benchmark.utils import (
+    Scenario,
+    make_metadata,
+    make_parser,
+    run_scenario,
+    write_results,
+)
+
+logging.basicConfig(level=logging.ERROR)
+
+
+def _attrsub_cells(scale: int) -> List[str]:
+    n = 20 * scale
+    return [
+        """
+        class Foo:
+            def __init__(self, x):
+                self.x = x
+                self.children = {"a": [x], "b": {"c": x}}
+        foos = [Foo(i) for i in range(%d)]
+        """
+        % n,
+        "\n".join(
+            "t%d = foos[%d].x + foos[%d].children['a'][0] + foos[%d].children['b']['c']"
+            % (i, i, i, i)
+            for i in range(n)
+        ),
+        "\n".join("foos[%d].x = t%d" % (i, i) for i in range(n)),
+        "total = sum(foo.x for foo in foos)",
+    ]
+
+
+def _literal_cells(scale: int) -> List[str]:
+    n = 20 * scale
+    return [
+        "base = 0",
+        "\n".join(
+            "lit%d = [base, %d, (base, %d), {'k': base, 'v': [%d, %d]}]"
+            % (i, i, i, i, i + 1)
+            for i in range(n)
+        ),
+        "\n".join("lit%d[2] = (lit%d[0], %d)" % (i, i, i) for i in range(n)),
+    ]
+
+
+def _call_cells(scale: int) -> List[str]:
+    n = 20 * scale
+    return [
+        """
+        def add(x, y):
+            return x + y
+        def compose(x):
+            return add(x, add(x, 1))
+        acc = []
+        """,
+        "\n".join("r%d = compose(%d)" % (i, i) for i in range(n)),
+        "\n".join("acc.append(r%d)" % i for i in range(n)),
+        "\n".join("popped = acc.pop()" for _ in range(n // 2)),
+    ]
+
+
+def _stmt_cells(scale: int) -> List[str]:
+    n = 50 * scale
+    return [
+        "\n".join("s%d = %d" % (i, i) for i in range(n)),
+        "\n".join(
+            "s%d = s%d + s%d" % (i, max(i - 1, 0), max(i - 2, 0)) for i in range(n)
+        ),
+        """
+        count = 0
+        for i in range(%d):
+            count += i
+        """
+        % (n * 10),
+    ]
+
+
+def _update_protocol_cells(scale: int) -> List[str]:
+    n = 10 * scale
+    return [
+        "nested = [[[j for j in range(5)] for _ in range(5)] for _ in range(%d)]" % n,
+        "\n".join("view%d = nested[%d][0]" % (i, i) for i in range(n)),
+        "\n".join("nested[%d][0].append(%d)" % (i, i) for i in range(n)),
+        "\n".join("nested[%d] = nested[%d]" % (i, (i + 1) % n) for i in range(n)),
+    ]
+
+
+SCENARIOS = [
+    Scenario(
+        "attrsub",
+        "attribute and subscript loads / stores (attrsub_tracer)",
+        _attrsub_cells,
+    ),
+    Scenario(
+        "literals",
+        "nested list / tuple / dict literals (before_literal / after_literal)",
+        _literal_cells,
+    ),
+    Scenario(
+        "calls",
+        "user-defined and external calls (before_call / after_call / argument)",
+        _call_cells,
+    ),
+    Scenario(
+        "stmts",
+        "many small statements and a hot loop (before_stmt / after_stmt)",
+        _stmt_cells,
+    ),
+    Scenario(
+        "update_protocol",
+        "mutations propagating through nested namespaces (UpdateProtocol)",
+        _update_protocol_cells,
+    ),
+]
+
+
+def main(argv: List[str]) -> None:
+    args = make_parser(
+        __doc__.strip(), default_output="tracing-overhead.json"
+    ).parse_args(argv)
+    flow_context, run_cell = make_flow_harness()
+    results = []
+    for scenario in SCENARIOS:
+        if args.filter is not None and args.filter not in scenario.name:
+            continue
+        results.append(
+            run_scenario(
+                scenario,
+                flow_context,
+                run_cell,
+                scale=args.scale,
+                repeat=args.repeat,
+                measure_memory=not args.no_memory,
+            )
+        )
+    write_results(
+        {
+            "benchmark": "tracing_overhead",
+            "metadata": make_metadata(scale=args.scale, repeat=args.repeat),
+            "scenarios": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
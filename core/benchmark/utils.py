@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Shared machinery for running synthetic notebooks headlessly and recording
+machine-readable measurements that can be diffed between releases.
+"""
+import argparse
+import datetime
+import gc
+import json
+import platform
+import statistics
+import sys
+import textwrap
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Optional, Union
+
+from IPython import get_ipython
+from pyccolo import TraceEvent
+
+from ipyflow.tracing.ipyflow_tracer import DataflowTracer
+
+
+class Scenario(NamedTuple):
+    name: str
+    description: str
+    make_cells: Callable[[int], List[str]]
+
+    def cells(self, scale: int) -> List[str]:
+        return [textwrap.dedent(cell) for cell in self.make_cells(scale)]
+
+
+@contextmanager
+def count_trace_events() -> Generator[Counter, None, None]:
+    counts: Counter = Counter()
+    original_emit_event = DataflowTracer._emit_event
+
+    def _counting_emit_event(
+        self, evt: Union[str, TraceEvent], node_id: int, frame: FrameType, **kwargs
+    ):
+        counts[evt.value if isinstance(evt, TraceEvent) else evt] += 1
+        return original_emit_event(self, evt, node_id, frame, **kwargs)
+
+    DataflowTracer._emit_event = _counting_emit_event  # type: ignore
+    try:
+        yield counts
+    finally:
+        DataflowTracer._emit_event = original_emit_event  # type: ignore
+
+
+@contextmanager
+def measure_peak_memory() -> Generator[Dict[str, int], None, None]:
+    result: Dict[str, int] = {}
+    gc.collect()
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _, result["peak_bytes"] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+
+def run_vanilla_cells(cells: List[str]) -> List[float]:
+    shell = get_ipython()
+    timings = []
+    for cell in cells:
+        start = time.perf_counter()
+        shell.run_cell(cell, store_history=False, silent=True)
+        timings.append(time.perf_counter() - start)
+    shell.reset()
+    return timings
+
+
+def run_traced_cells(
+    flow_context: Any, run_cell: Callable[[str], Any], cells: List[str]
+) -> List[float]:
+    timings = []
+    with flow_context():
+        for cell in cells:
+            start = time.perf_counter()
+            run_cell(cell)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _median_per_cell(runs: List[List[float]]) -> List[float]:
+    return [statistics.median(cell_timings) for cell_timings in zip(*runs)]
+
+
+def run_scenario(
+    scenario: Scenario,
+    flow_context: Any,
+    run_cell: Callable[[str], Any],
+    scale: int,
+    repeat: int,
+    measure_memory: bool = True,
+) -> Dict[str, Any]:
+    cells = scenario.cells(scale)
+    vanilla_runs = [run_vanilla_cells(cells) for _ in range(repeat)]
+    traced_runs = []
+    events: Counter = Counter()
+    for _ in range(repeat):
+        with count_trace_events() as counts:
+            traced_runs.append(run_traced_cells(flow_context, run_cell, cells))
+        # event counts are deterministic, so keep those of the last run
+        events = counts
+    vanilla_per_cell = _median_per_cell(vanilla_runs)
+    traced_per_cell = _median_per_cell(traced_runs)
+    vanilla_total = sum(vanilla_per_cell)
+    traced_total = sum(traced_per_cell)
+    num_events = sum(events.values())
+    result: Dict[str, Any] = {
+        "name": scenario.name,
+        "description": scenario.description,
+        "num_cells": len(cells),
+        "vanilla_cell_seconds": vanilla_per_cell,
+        "traced_cell_seconds": traced_per_cell,
+        "vanilla_total_seconds": vanilla_total,
+        "traced_total_seconds": traced_total,
+        "slowdown": traced_total / vanilla_total if vanilla_total > 0 else None,
+        "num_events": num_events,
+        "events_per_second": num_events / traced_total if traced_total > 0 else None,
+        "events": dict(sorted(events.items())),
+    }
+    if measure_memory:
+        with measure_peak_memory() as vanilla_mem:
+            run_vanilla_cells(cells)
+        with measure_peak_memory() as traced_mem:
+            run_traced_cells(flow_context, run_cell, cells)
+        result["vanilla_peak_memory_bytes"] = vanilla_mem["peak_bytes"]
+        result["traced_peak_memory_bytes"] = traced_mem["peak_bytes"]
+    return result
+
+
+def latency_percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """
+    Nearest-rank percentiles (in seconds) of the given latency samples.
+    """
+    if len(samples) == 0:
+        return {"p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(samples)
+
+    def _percentile(pct: int) -> float:
+        rank = max(1, -(-pct * len(ordered) // 100))
+        return ordered[rank - 1]
+
+    return {
+        "p50": _percentile(50),
+        "p90": _percentile(90),
+        "p99": _percentile(99),
+        "max": ordered[-1],
+        "mean": statistics.mean(ordered),
+    }
+
+
+def make_metadata(**kwargs: Any) -> Dict[str, Any]:
+    try:
+        import ipyflow
+
+        version = ipyflow.__version__
+    except Exception:
+        version = None
+    return {
+        "ipyflow_version": version,
+        "python_version": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        **kwargs,
+    }
+
+
+def make_parser(description: str, default_output: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-o", "--output", default=default_output, help="where to write json results"
+    )
+    parser.add_argument("-s", "--scale", type=int, default=1)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument(
+        "-k", "--filter", default=None, help="only run scenarios containing this"
+    )
+    parser.add_argument("--no-memory", action="store_true")
+    return parser
+
+
+def write_results(results: Dict[str, Any], output: Optional[str]) -> None:
+    serialized = json.dumps(results, indent=2)
+    if output is None or output == "-":
+        sys.stdout.write(serialized + "\n")
+    else:
+        with open(output, "w") as f:
+            f.write(serialized + "\n")
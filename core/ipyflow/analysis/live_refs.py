@@ -1,10 +1,22 @@
 # -*- coding: utf-8 -*-
 import ast
 import builtins
+import copy
 import logging
 import sys
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Iterable, List, Optional, Set, Tuple, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from ipyflow.analysis.mixins import (
     SaveOffAttributesMixin,
@@ -27,6 +39,11 @@ logger.setLevel(logging.ERROR)
 
 _RESOLVER_EXCEPTIONS = ("get_ipython", "run_line_magic", "run_cell_magic")
 
+# max number of (live, dead) ref results kept by compute_live_dead_symbol_refs_cached
+LIVE_DEAD_REFS_CACHE_SIZE = 1024
+_LiveDeadRefs = Tuple[Set[LiveSymbolRef], Set[SymbolRef]]
+_live_dead_refs_cache: "OrderedDict[Hashable, _LiveDeadRefs]" = OrderedDict()
+
 
 # TODO: have the logger warnings additionally raise exceptions for tests
 class ComputeLiveSymbolRefs(
@@ -355,7 +372,12 @@ def get_live_symbols_and_cells_for_references(
     cell_ctr: int,
     update_liveness_time_versions: bool = False,
     add_data_dep_only_if_parent_new: bool = False,
+    resolved_dsyms: Optional[Set["DataSymbol"]] = None,
 ) -> Tuple[Set[ResolvedDataSymbol], Set[int], Set[LiveSymbolRef]]:
+    """
+    If `resolved_dsyms` is given, every symbol that some reference resolved
+    through gets added to it, including ones left out of the live set.
+    """
     live_symbols: Set[ResolvedDataSymbol] = set()
     unresolved_live_refs: Set[LiveSymbolRef] = set()
     called_syms: Set[Tuple[ResolvedDataSymbol, int]] = set()
@@ -375,6 +397,8 @@ def get_live_symbols_and_cells_for_references(
             cell_ctr=cell_ctr,
         ):
             did_resolve = True
+            if resolved_dsyms is not None:
+                resolved_dsyms.add(resolved.dsym)
             if update_liveness_time_versions:
                 liveness_time = resolved.liveness_timestamp
                 resolved.update_usage_info(
@@ -394,7 +418,7 @@ def get_live_symbols_and_cells_for_references(
         live_cells,
         unresolved_from_calls,
     ) = _compute_call_chain_live_symbols_and_cells(
-        called_syms, cell_ctr, update_liveness_time_versions
+        called_syms, cell_ctr, update_liveness_time_versions, resolved_dsyms
     )
     live_symbols |= live_from_calls
     unresolved_live_refs |= unresolved_from_calls
@@ -405,6 +429,7 @@ def _compute_call_chain_live_symbols_and_cells(
     live_with_stmt_ctr: Set[Tuple[ResolvedDataSymbol, int]],
     cell_ctr: int,
     update_liveness_time_versions: bool,
+    resolved_dsyms: Optional[Set["DataSymbol"]] = None,
 ) -> Tuple[Set[ResolvedDataSymbol], Set[int], Set[LiveSymbolRef]]:
     seen: Set[Tuple[ResolvedDataSymbol, int]] = set()
     worklist: List[Tuple[ResolvedDataSymbol, int]] = list(live_with_stmt_ctr)
@@ -420,8 +445,11 @@ def _compute_call_chain_live_symbols_and_cells(
             continue
         seen.add(workitem)
         init_killed = {arg.arg for arg in called_sym.dsym.get_definition_args()}
-        live_refs, _ = compute_live_dead_symbol_refs(
-            cast(ast.FunctionDef, called_sym.dsym.func_def_stmt).body,
+        func_def_stmt = cast(ast.FunctionDef, called_sym.dsym.func_def_stmt)
+        live_refs, _ = compute_live_dead_symbol_refs_cached(
+            func_def_stmt.body,
+            # the key holds onto the node, so its id cannot get reused
+            cache_key=func_def_stmt,
             init_killed=init_killed,
         )
         used_time = Timestamp(cell_ctr, stmt_ctr)
@@ -440,6 +468,8 @@ def _compute_call_chain_live_symbols_and_cells(
                 called_sym.dsym.call_scope, only_yield_final_symbol=False
             ):
                 # FIXME: kind of hacky
+                # (copy first since the refs for the function body are cached)
+                resolved.atom = copy.copy(resolved.atom)
                 resolved.atom.is_cascading_reactive = (
                     resolved.atom.is_cascading_reactive
                     or called_sym.is_cascading_reactive
@@ -448,6 +478,8 @@ def _compute_call_chain_live_symbols_and_cells(
                     resolved.atom.is_reactive or called_sym.is_reactive
                 )
                 did_resolve = True
+                if resolved_dsyms is not None:
+                    resolved_dsyms.add(resolved.dsym)
                 if resolved.is_called:
                     worklist.append((resolved, stmt_ctr))
                 if resolved.dsym.is_anonymous:
@@ -480,6 +512,35 @@ def compute_live_dead_symbol_refs(
     return ComputeLiveSymbolRefs(scope=scope, init_killed=init_killed)(code)
 
 
+def compute_live_dead_symbol_refs_cached(
+    code: Union[ast.AST, List[ast.stmt], str],
+    cache_key: Hashable,
+    scope: "Scope" = None,
+    init_killed: Optional[Set[str]] = None,
+) -> Tuple[Set[LiveSymbolRef], Set[SymbolRef]]:
+    """
+    Same as `compute_live_dead_symbol_refs`, but results are kept in an LRU
+    cache shared across cells. The caller is responsible for ensuring that
+    `cache_key` determines `code` (e.g., its source, or the node itself).
+    """
+    if scope is not None and flow().mut_settings.flow_order == FlowDirection.ANY_ORDER:
+        # in this case, some refs are pruned based on symbols in scope
+        return compute_live_dead_symbol_refs(code, scope=scope, init_killed=init_killed)
+    key = (cache_key, None if init_killed is None else frozenset(init_killed))
+    cached = _live_dead_refs_cache.get(key)
+    if cached is None:
+        cached = compute_live_dead_symbol_refs(
+            code, scope=scope, init_killed=init_killed
+        )
+        _live_dead_refs_cache[key] = cached
+        if len(_live_dead_refs_cache) > LIVE_DEAD_REFS_CACHE_SIZE:
+            _live_dead_refs_cache.popitem(last=False)
+    else:
+        _live_dead_refs_cache.move_to_end(key)
+    live, dead = cached
+    return set(live), set(dead)
+
+
 def static_resolve_rvals(
     code: Union[ast.AST, str], cell_ctr: int = -1, scope: Optional["Scope"] = None
 ) -> Set[ResolvedDataSymbol]:
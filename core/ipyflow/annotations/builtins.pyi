@@ -3,6 +3,7 @@ from ipyflow.annotations import (
     MutatingMethodEventNotYetImplemented,
     NamespaceClear,
     NoopCallHandler,
+    handler_for,
 )
 from ipyflow.tracing.external_calls.list_handlers import (
     ListAppend,
@@ -38,3 +39,31 @@ class set:
     def remove(self) -> MutatingMethodEventNotYetImplemented: ...
     def symmetric_difference_update(self) -> MutatingMethodEventNotYetImplemented: ...
     def update(self) -> MutatingMethodEventNotYetImplemented: ...
+
+@handler_for(
+    "abs",
+    "all",
+    "any",
+    "ascii",
+    "bin",
+    "callable",
+    "chr",
+    "divmod",
+    "format",
+    "hash",
+    "hex",
+    "id",
+    "isinstance",
+    "issubclass",
+    "len",
+    "max",
+    "min",
+    "oct",
+    "ord",
+    "pow",
+    "repr",
+    "round",
+    "sorted",
+    "sum",
+)
+def pure_function() -> NoopCallHandler: ...
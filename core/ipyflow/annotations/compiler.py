@@ -11,6 +11,7 @@ from types import ModuleType
 from typing import Dict, List, Optional, Set, Tuple, Type, Union
 
 from ipyflow.annotations.annotations import Mutate, UpsertSymbol
+from ipyflow.tracing.external_calls import clear_external_call_resolution_cache
 from ipyflow.tracing.external_calls.base_handlers import (
     REGISTERED_HANDLER_BY_FUNCTION,
     REGISTERED_HANDLER_BY_METHOD,
@@ -326,6 +327,7 @@ def compile_and_register_handlers_for_module(module: ModuleType) -> None:
         function = getattr(module, function_name, None)
         if function is not None:
             REGISTERED_HANDLER_BY_FUNCTION[function] = handler
+    clear_external_call_resolution_cache()
 
 
 def register_annotations_directory(dirname: str) -> Set[str]:
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from ipyflow.annotations import Mutate, NoopCallHandler, handler_for
+
+# fake symbols to reduce lint errors
+out = None
+
+@handler_for(
+    "absolute",
+    "arccos",
+    "arccosh",
+    "arcsin",
+    "arcsinh",
+    "arctan",
+    "arctanh",
+    "cbrt",
+    "ceil",
+    "conjugate",
+    "cos",
+    "cosh",
+    "deg2rad",
+    "degrees",
+    "exp",
+    "exp2",
+    "expm1",
+    "fabs",
+    "floor",
+    "invert",
+    "isfinite",
+    "isinf",
+    "isnan",
+    "logical_not",
+    "log",
+    "log10",
+    "log1p",
+    "log2",
+    "negative",
+    "positive",
+    "rad2deg",
+    "radians",
+    "reciprocal",
+    "rint",
+    "sign",
+    "signbit",
+    "sin",
+    "sinh",
+    "sqrt",
+    "square",
+    "tan",
+    "tanh",
+    "trunc",
+)
+def unary_ufunc(x, out) -> Mutate[out]: ...
+
+#
+@handler_for(
+    "add",
+    "arctan2",
+    "bitwise_and",
+    "bitwise_or",
+    "bitwise_xor",
+    "copysign",
+    "divide",
+    "equal",
+    "float_power",
+    "floor_divide",
+    "fmax",
+    "fmin",
+    "fmod",
+    "gcd",
+    "greater",
+    "greater_equal",
+    "hypot",
+    "lcm",
+    "ldexp",
+    "left_shift",
+    "less",
+    "less_equal",
+    "logaddexp",
+    "logaddexp2",
+    "logical_and",
+    "logical_or",
+    "logical_xor",
+    "matmul",
+    "maximum",
+    "minimum",
+    "mod",
+    "multiply",
+    "nextafter",
+    "not_equal",
+    "power",
+    "remainder",
+    "right_shift",
+    "subtract",
+    "true_divide",
+)
+def binary_ufunc(x1, x2, out) -> Mutate[out]: ...
+
+#
+@handler_for("amax", "amin", "argmax", "argmin", "max", "min")
+def reduce_with_out(a, axis, out) -> Mutate[out]: ...
+
+#
+@handler_for("cumprod", "cumsum", "mean", "nanmean", "nansum", "prod", "std", "sum", "var")
+def reduce_with_dtype_and_out(a, axis, dtype, out) -> Mutate[out]: ...
+
+#
+def around(a, decimals, out) -> Mutate[out]: ...
+
+#
+def clip(a, a_min, a_max, out) -> Mutate[out]: ...
+
+#
+def concatenate(arrays, axis, out) -> Mutate[out]: ...
+
+#
+def dot(a, b, out) -> Mutate[out]: ...
+
+#
+def round(a, decimals, out) -> Mutate[out]: ...
+
+#
+@handler_for(
+    "allclose",
+    "arange",
+    "argsort",
+    "argwhere",
+    "array",
+    "array_equal",
+    "asarray",
+    "copy",
+    "count_nonzero",
+    "diff",
+    "empty_like",
+    "expand_dims",
+    "eye",
+    "full",
+    "full_like",
+    "hstack",
+    "identity",
+    "isclose",
+    "linspace",
+    "meshgrid",
+    "ndim",
+    "nonzero",
+    "ones",
+    "ones_like",
+    "ravel",
+    "repeat",
+    "reshape",
+    "shape",
+    "size",
+    "sort",
+    "squeeze",
+    "tile",
+    "transpose",
+    "unique",
+    "vstack",
+    "where",
+    "zeros",
+    "zeros_like",
+)
+def pure_function() -> NoopCallHandler: ...
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from ipyflow.annotations import NoopCallHandler, handler_for, module
+
+@module("pandas")
+class DataFrame:
+    @handler_for(
+        "all",
+        "any",
+        "corr",
+        "count",
+        "cov",
+        "describe",
+        "duplicated",
+        "equals",
+        "filter",
+        "groupby",
+        "head",
+        "idxmax",
+        "idxmin",
+        "info",
+        "isin",
+        "isna",
+        "isnull",
+        "max",
+        "mean",
+        "median",
+        "memory_usage",
+        "min",
+        "nlargest",
+        "notna",
+        "notnull",
+        "nsmallest",
+        "nunique",
+        "pivot_table",
+        "prod",
+        "quantile",
+        "rank",
+        "sample",
+        "select_dtypes",
+        "std",
+        "sum",
+        "tail",
+        "to_dict",
+        "to_numpy",
+        "transpose",
+        "value_counts",
+        "var",
+    )
+    def pure_method(self) -> NoopCallHandler: ...
+
+@module("pandas")
+class Series:
+    @handler_for(
+        "all",
+        "any",
+        "between",
+        "count",
+        "describe",
+        "duplicated",
+        "equals",
+        "head",
+        "idxmax",
+        "idxmin",
+        "isin",
+        "isna",
+        "isnull",
+        "max",
+        "mean",
+        "median",
+        "min",
+        "nlargest",
+        "notna",
+        "notnull",
+        "nsmallest",
+        "nunique",
+        "prod",
+        "quantile",
+        "rank",
+        "sample",
+        "std",
+        "sum",
+        "tail",
+        "to_dict",
+        "to_list",
+        "to_numpy",
+        "tolist",
+        "unique",
+        "value_counts",
+        "var",
+    )
+    def pure_method(self) -> NoopCallHandler: ...
+
+@module("pandas.core.strings.accessor")
+class StringMethods:
+    @handler_for(
+        "capitalize",
+        "cat",
+        "contains",
+        "count",
+        "endswith",
+        "extract",
+        "find",
+        "findall",
+        "get",
+        "len",
+        "lower",
+        "lstrip",
+        "match",
+        "pad",
+        "replace",
+        "rstrip",
+        "slice",
+        "split",
+        "startswith",
+        "strip",
+        "title",
+        "upper",
+        "zfill",
+    )
+    def pure_method(self) -> NoopCallHandler: ...
+
+@module("pandas.core.indexes.accessors")
+class DatetimeProperties:
+    @handler_for(
+        "ceil",
+        "day_name",
+        "floor",
+        "month_name",
+        "normalize",
+        "round",
+        "strftime",
+        "to_period",
+        "tz_convert",
+        "tz_localize",
+    )
+    def pure_method(self) -> NoopCallHandler: ...
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from ipyflow.api.cells import stderr, stdout
+from ipyflow.api.cells import stderr, stdout, updated_symbols
 from ipyflow.api.lift import (
     code,
     deps,
@@ -13,12 +13,14 @@ from ipyflow.api.lift import (
     users,
     watchpoints,
 )
+from ipyflow.api.memory import memory_usage
 
 __all__ = [
     "code",
     "deps",
     "has_tag",
     "lift",
+    "memory_usage",
     "rdeps",
     "rusers",
     "set_tag",
@@ -26,6 +28,7 @@ __all__ = [
     "stdout",
     "timestamp",
     "unset_tag",
+    "updated_symbols",
     "users",
     "watchpoints",
 ]
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from ipyflow.data_model.code_cell import cells
+from ipyflow.data_model.data_symbol import DataSymbol
 from ipyflow.data_model.timestamp import Timestamp
+from ipyflow.singletons import flow
 
 
 def _to_cell_num(ts_or_cell_num: Union[int, Timestamp]) -> int:
@@ -31,3 +33,11 @@ def stderr(ts_or_cell_num: Union[int, Timestamp]) -> Optional[str]:
         return None if captured is None else str(captured.stderr)
     except KeyError:
         raise ValueError("cell with counter %d has not yet executed" % cell_num)
+
+
+def updated_symbols(ts_or_cell_num: Union[int, Timestamp]) -> List[DataSymbol]:
+    cell_num = _to_cell_num(ts_or_cell_num)
+    return sorted(
+        (sym for sym in flow().symbols_updated_at(cell_num) if not sym.is_anonymous),
+        key=lambda sym: sym.readable_name,
+    )
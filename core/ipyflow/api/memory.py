@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Dict
+
+from ipyflow.data_model.utils.memory_utils import (
+    DEFAULT_SAMPLE_SIZE,
+    DEFAULT_TOP_K,
+    MemoryReport,
+)
+
+
+def memory_usage(
+    sample_size: int = DEFAULT_SAMPLE_SIZE, top_k: int = DEFAULT_TOP_K
+) -> Dict[str, Any]:
+    """
+    Estimate how much memory ipyflow's own dataflow state retains,
+    broken down by component, excluding user data.
+    """
+    return MemoryReport.compute(sample_size=sample_size, top_k=top_k).to_json()
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from dataclasses import dataclass
 from enum import Enum
-from typing import Generator, List, NamedTuple
+from typing import Generator, List, NamedTuple, Optional
 
 from ipyflow.slicing.context import SlicingContext, iter_slicing_contexts
 
@@ -18,6 +18,12 @@ class ExecutionSchedule(Enum):
     STRICT = "strict"
 
 
+class FingerprintMode(Enum):
+    OFF = "off"
+    FULL = "full"
+    SAMPLED = "sampled"
+
+
 class FlowDirection(Enum):
     ANY_ORDER = "any_order"
     IN_ORDER = "in_order"
@@ -53,6 +59,14 @@ class DataflowSettings(NamedTuple):
     mark_waiting_symbol_usages_unsafe: bool
     mark_typecheck_failures_unsafe: bool
     mark_phantom_cell_usages_unsafe: bool
+    # hold user objects via weak references where possible so tracking them
+    # does not keep them alive
+    use_weak_refs: bool
+    # max bytes of captured cell output kept in memory before spilling to disk
+    captured_output_budget_bytes: Optional[int]
+    # reuse a cell's last checker result until its content or the
+    # symbols it resolved through change
+    incremental_checker: bool
 
 
 @dataclass
@@ -71,6 +85,12 @@ class MutableDataflowSettings:
     syntax_transforms_enabled: bool
     syntax_transforms_only: bool
     max_external_call_depth_for_tracing: int
+    loop_summarization_threshold: int
+    fingerprint_mode: FingerprintMode
+    # history retention; executions of a cell beyond these limits get compacted
+    history_max_versions_per_cell: Optional[int]
+    history_window: Optional[int]
+    history_compaction_interval: int
     is_dev_mode: bool
 
     def slicing_contexts(self) -> List[SlicingContext]:
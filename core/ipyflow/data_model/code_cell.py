@@ -7,6 +7,7 @@ from collections import defaultdict
 from contextlib import contextmanager
 from typing import (
     TYPE_CHECKING,
+    Any,
     Dict,
     FrozenSet,
     Generator,
@@ -27,6 +28,7 @@ from ipyflow.analysis.live_refs import (
     LiveSymbolRef,
     SymbolRef,
     compute_live_dead_symbol_refs,
+    compute_live_dead_symbol_refs_cached,
     get_live_symbols_and_cells_for_references,
     get_symbols_for_references,
 )
@@ -40,6 +42,7 @@ from ipyflow.slicing.mixin import SlicingMixin
 from ipyflow.types import IdType, TimestampOrCounter
 from ipyflow.utils.ipython_utils import _IPY, CapturedIO
 from ipyflow.utils.ipython_utils import cell_counter as ipy_cell_counter
+from ipyflow.utils.output_store import captured_output_store
 
 if TYPE_CHECKING:
     from ipyflow.data_model.data_symbol import DataSymbol
@@ -63,9 +66,17 @@ class CheckerResult(NamedTuple):
     typechecks: bool  # whether the cell typechecks successfully
 
 
+class _CachedCheckerResult(NamedTuple):
+    key: Tuple[Any, ...]  # non-symbol inputs the result was computed from
+    timestamp_by_symbol: Dict["DataSymbol", Timestamp]  # symbols resolved through
+    result: CheckerResult
+
+
 class CodeCell(SlicingMixin):
     _current_cell_by_cell_id: Dict[IdType, "CodeCell"] = {}
     _cell_by_cell_ctr: Dict[int, "CodeCell"] = {}
+    _compacted_cell_id_by_cell_ctr: Dict[int, IdType] = {}
+    _compacted_cell_ctrs_by_cell_id: Dict[IdType, Set[int]] = {}
     _cell_counter: int = 0
     _position_by_cell_id: Dict[IdType, int] = {}
     _cells_by_tag: Dict[str, Set["CodeCell"]] = defaultdict(set)
@@ -101,6 +112,9 @@ class CodeCell(SlicingMixin):
             "DataSymbol", Set[int]
         ] = defaultdict(set)
         self._cached_ast: Optional[ast.Module] = None
+        # everything that determines _cached_ast, unless it was overridden
+        self._cached_ast_source_key: Optional[Tuple[str, str, bool]] = None
+        self._cached_checker_result: Optional[_CachedCheckerResult] = None
         self._cached_typecheck_result: Optional[bool] = (
             None if flow().settings.mark_typecheck_failures_unsafe else True
         )
@@ -155,6 +169,9 @@ class CodeCell(SlicingMixin):
     def clear(cls):
         cls._current_cell_by_cell_id = {}
         cls._cell_by_cell_ctr = {}
+        captured_output_store().clear()
+        cls._compacted_cell_id_by_cell_ctr = {}
+        cls._compacted_cell_ctrs_by_cell_id = {}
         cls._cell_counter = 0
         cls._position_by_cell_id = {}
         cls._cells_by_tag.clear()
@@ -195,6 +212,13 @@ class CodeCell(SlicingMixin):
         if current_cell is not None:
             assert current_cell is self
             self._current_cell_by_cell_id[new_id] = current_cell
+        compacted_ctrs = self._compacted_cell_ctrs_by_cell_id.pop(old_id, set())
+        for ctr in compacted_ctrs:
+            self._compacted_cell_id_by_cell_ctr[ctr] = new_id
+        if len(compacted_ctrs) > 0:
+            self._compacted_cell_ctrs_by_cell_id.setdefault(new_id, set()).update(
+                compacted_ctrs
+            )
         for reactive_cells in self._reactive_cells_by_tag.values():
             if old_id in reactive_cells:
                 reactive_cells.discard(old_id)
@@ -292,6 +316,60 @@ class CodeCell(SlicingMixin):
             cls._current_cell_by_cell_id[cell_id] = cell
         return cell
 
+    @classmethod
+    def compact_history(
+        cls,
+        max_versions_per_cell: Optional[int] = None,
+        min_cell_ctr: Optional[int] = None,
+    ) -> Set[int]:
+        """
+        Drop superseded executions of each cell, keeping the most recent one along
+        with the last `max_versions_per_cell` and any at or after `min_cell_ctr`.
+        Returns the counters of the dropped executions.
+        """
+        dropped_ctrs: Set[int] = set()
+        if max_versions_per_cell is None and min_cell_ctr is None:
+            return dropped_ctrs
+        for cell in list(cls._current_cell_by_cell_id.values()):
+            versions: List["CodeCell"] = []
+            version: Optional["CodeCell"] = cell
+            while version is not None:
+                versions.append(version)
+                version = version.prev_cell
+            num_retained = 1
+            while num_retained < len(versions) and (
+                (
+                    max_versions_per_cell is not None
+                    and num_retained < max_versions_per_cell
+                )
+                or (
+                    min_cell_ctr is not None
+                    and versions[num_retained].cell_ctr >= min_cell_ctr
+                )
+            ):
+                num_retained += 1
+            if num_retained == len(versions):
+                continue
+            # slicing only follows edges of current cells, and only the immediately
+            # preceding execution is consulted for inherited edges, so dropped
+            # executions need no summary beyond the cell id for their counter
+            versions[num_retained - 1].prev_cell = None
+            for dropped in versions[num_retained:]:
+                if dropped.captured_output is not None:
+                    captured_output_store().discard(dropped.captured_output)
+                    dropped.captured_output = None
+                cls._cell_by_cell_ctr.pop(dropped.cell_ctr, None)
+                cls._compacted_cell_id_by_cell_ctr[dropped.cell_ctr] = dropped.cell_id
+                cls._compacted_cell_ctrs_by_cell_id.setdefault(
+                    dropped.cell_id, set()
+                ).add(dropped.cell_ctr)
+                dropped_ctrs.add(dropped.cell_ctr)
+            for retained in versions[:num_retained]:
+                retained.history = [
+                    ctr for ctr in retained.history if ctr not in dropped_ctrs
+                ]
+        return dropped_ctrs
+
     @classmethod
     def set_cell_positions(cls, order_index_by_cell_id: Dict[IdType, int]):
         cls._position_by_cell_id = order_index_by_cell_id
@@ -336,9 +414,17 @@ class CodeCell(SlicingMixin):
     ) -> Generator["CodeCell", None, None]:
         yield from cls._current_cell_by_cell_id.values()
 
+    @classmethod
+    def all_run_cells(cls) -> Generator["CodeCell", None, None]:
+        yield from cls._cell_by_cell_ctr.values()
+
     @classmethod
     def at_counter(cls, ctr: int) -> "CodeCell":
-        return cls._cell_by_cell_ctr[ctr]
+        cell = cls._cell_by_cell_ctr.get(ctr)
+        if cell is None:
+            # executions dropped by compaction are represented by the current cell for their id
+            return cls.from_id(cls._compacted_cell_id_by_cell_ctr[ctr])
+        return cell
 
     @classmethod
     def at_timestamp(
@@ -390,6 +476,7 @@ class CodeCell(SlicingMixin):
     def to_ast(self, override: Optional[ast.Module] = None) -> ast.Module:
         if override is not None:
             self._cached_ast = override
+            self._cached_ast_source_key = None
             return self._cached_ast
         if (
             self._cached_ast is None
@@ -399,6 +486,11 @@ class CodeCell(SlicingMixin):
             rewriter, content = self._rewriter_and_sanitized_content()
             self._cached_ast = ast.parse(content)
             self.last_ast_content = self.current_content
+            self._cached_ast_source_key = (
+                self.current_content,
+                content,
+                rewriter is not None,
+            )
             if rewriter is not None:
                 with self.override_current_cell():
                     rewriter.visit(self._cached_ast)
@@ -479,9 +571,20 @@ class CodeCell(SlicingMixin):
         live_symbol_refs: Set[LiveSymbolRef] = set()
         dead_symbol_refs: Set[SymbolRef] = set()
         if self.override_live_refs is None and self.override_dead_refs is None:
-            live_symbol_refs, dead_symbol_refs = compute_live_dead_symbol_refs(
-                self.to_ast(), scope=flow().global_scope
-            )
+            module = self.to_ast()
+            if self._cached_ast_source_key is None:
+                live_symbol_refs, dead_symbol_refs = compute_live_dead_symbol_refs(
+                    module, scope=flow().global_scope
+                )
+            else:
+                (
+                    live_symbol_refs,
+                    dead_symbol_refs,
+                ) = compute_live_dead_symbol_refs_cached(
+                    module,
+                    cache_key=self._cached_ast_source_key,
+                    scope=flow().global_scope,
+                )
         else:
             if self.override_live_refs is not None:
                 live_symbol_refs = {
@@ -494,16 +597,72 @@ class CodeCell(SlicingMixin):
             update_liveness_time_versions = False
         return live_symbol_refs, dead_symbol_refs, update_liveness_time_versions
 
+    def _checker_result_cache_key(self) -> Tuple[Any, ...]:
+        return (
+            self.cell_ctr,
+            self.current_content,
+            None if self.override_live_refs is None else tuple(self.override_live_refs),
+            None if self.override_dead_refs is None else tuple(self.override_dead_refs),
+            flow().mut_settings.exec_mode,
+        )
+
+    def _get_cached_checker_result(self) -> Optional[CheckerResult]:
+        cached = self._cached_checker_result
+        if cached is None or cached.key != self._checker_result_cache_key():
+            return None
+        for dsym, timestamp in cached.timestamp_by_symbol.items():
+            if dsym.is_garbage or dsym.timestamp != timestamp:
+                return None
+        result = cached.result
+        # typecheck results get invalidated separately
+        return result._replace(
+            typechecks=self._typechecks(result.live_cells, result.live)
+        )
+
+    def _cache_checker_result(
+        self, result: CheckerResult, resolved_dsyms: Set["DataSymbol"]
+    ) -> None:
+        # killed attrsubs are only resolved via their top-level symbol's namespace
+        resolved_dsyms.update(dsym.get_top_level() or dsym for dsym in result.dead)
+        self._cached_checker_result = _CachedCheckerResult(
+            key=self._checker_result_cache_key(),
+            timestamp_by_symbol={dsym: dsym.timestamp for dsym in resolved_dsyms},
+            result=result,
+        )
+
+    def _register_live_symbols(
+        self, live_resolved_symbols: Set[ResolvedDataSymbol]
+    ) -> None:
+        for resolved in live_resolved_symbols:
+            if resolved.is_deep:
+                resolved.dsym.cells_where_deep_live.add(self)
+            else:
+                resolved.dsym.cells_where_shallow_live.add(self)
+            self.add_used_cell_counter(resolved.dsym, resolved.timestamp.cell_num)
+
     def check_and_resolve_symbols(
         self,
         update_liveness_time_versions: bool = False,
         add_data_dep_only_if_parent_new: bool = False,
     ) -> CheckerResult:
+        # in any-order mode, liveness analysis prunes refs based on symbols that
+        # it never reports back to us, so results can't be checked for staleness
+        use_cache = (
+            flow().settings.incremental_checker
+            and flow().mut_settings.flow_order == FlowDirection.IN_ORDER
+        )
+        if use_cache and not update_liveness_time_versions:
+            cached_result = self._get_cached_checker_result()
+            if cached_result is not None:
+                # reassignments clear these even when the timestamp is preserved
+                self._register_live_symbols(cached_result.live)
+                return cached_result
         (
             live_symbol_refs,
             dead_symbol_refs,
             update_liveness_time_versions,
         ) = self._get_live_dead_symbol_refs(update_liveness_time_versions)
+        resolved_dsyms: Set["DataSymbol"] = set()
         (
             live_resolved_symbols,
             live_cells,
@@ -514,19 +673,15 @@ class CodeCell(SlicingMixin):
             self.cell_ctr,
             update_liveness_time_versions=update_liveness_time_versions,
             add_data_dep_only_if_parent_new=add_data_dep_only_if_parent_new,
+            resolved_dsyms=resolved_dsyms,
         )
         # only mark dead attrsubs as killed if we can traverse the entire chain
-        dead_symbols, _ = get_symbols_for_references(
+        dead_symbols, called_dead_symbols = get_symbols_for_references(
             dead_symbol_refs, flow().global_scope
         )
-        for resolved in live_resolved_symbols:
-            if resolved.is_deep:
-                resolved.dsym.cells_where_deep_live.add(self)
-            else:
-                resolved.dsym.cells_where_shallow_live.add(self)
-            self.add_used_cell_counter(resolved.dsym, resolved.timestamp.cell_num)
+        self._register_live_symbols(live_resolved_symbols)
         used_cells = {resolved.timestamp.cell_num for resolved in live_resolved_symbols}
-        return CheckerResult(
+        result = CheckerResult(
             live=live_resolved_symbols,
             unresolved_live_refs=unresolved_live_refs,
             used_cells=used_cells,
@@ -534,6 +689,15 @@ class CodeCell(SlicingMixin):
             dead=dead_symbols,
             typechecks=self._typechecks(live_cells, live_resolved_symbols),
         )
+        # refs that failed to resolve may start resolving once any new symbol
+        # gets created, which no symbol timestamp can tell us about
+        if (
+            use_cache
+            and len(unresolved_live_refs) == 0
+            and len(dead_symbols) + len(called_dead_symbols) == len(dead_symbol_refs)
+        ):
+            self._cache_checker_result(result, resolved_dsyms | called_dead_symbols)
+        return result
 
     def compute_phantom_cell_info(self, used_cells: Set[int]) -> Dict[IdType, Set[int]]:
         used_cell_counters_by_cell_id = defaultdict(set)
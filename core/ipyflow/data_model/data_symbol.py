@@ -9,6 +9,7 @@ from typing import (
     Any,
     Dict,
     Generator,
+    Iterable,
     List,
     Optional,
     Set,
@@ -25,6 +26,7 @@ from ipyflow.data_model.utils.annotation_utils import (
     get_type_annotation,
     make_annotation_string,
 )
+from ipyflow.data_model.utils.fingerprint_utils import fingerprint
 from ipyflow.data_model.utils.update_protocol import UpdateProtocol
 from ipyflow.models import _SymbolContainer, statements, symbols
 from ipyflow.singletons import flow, tracer
@@ -32,7 +34,12 @@ from ipyflow.slicing.context import dynamic_slicing_context, static_slicing_cont
 from ipyflow.slicing.mixin import FormatType
 from ipyflow.tracing.watchpoint import Watchpoints
 from ipyflow.types import IMMUTABLE_PRIMITIVE_TYPES, IdType, SupportedIndexType
-from ipyflow.utils.misc_utils import cleanup_discard, debounce
+from ipyflow.utils.misc_utils import (
+    cleanup_discard,
+    debounce,
+    lazy_container,
+    maybe_weak_ref,
+)
 
 if TYPE_CHECKING:
     # avoid circular imports
@@ -47,6 +54,23 @@ logger.setLevel(logging.ERROR)
 _override_unused_warning_symbols = symbols
 
 
+def _fold_compacted_timestamps(
+    timestamps: Iterable[Timestamp], dropped_cell_ctrs: Set[int], keep_latest: bool
+) -> List[Timestamp]:
+    # keep one timestamp (the latest or the earliest) per cell id among dropped executions
+    retained: List[Timestamp] = []
+    folded: Dict[IdType, Timestamp] = {}
+    for ts in timestamps:
+        if ts.cell_num not in dropped_cell_ctrs:
+            retained.append(ts)
+            continue
+        cell_id = cells().at_timestamp(ts).cell_id
+        prev_ts = folded.get(cell_id)
+        if prev_ts is None or (ts > prev_ts if keep_latest else ts < prev_ts):
+            folded[cell_id] = ts
+    return sorted(retained + list(folded.values()))
+
+
 @debounce(0.1)
 def _debounced_exec_schedule(executed_cell_id: IdType) -> None:
     flow_ = flow()
@@ -71,6 +95,50 @@ class DataSymbolType(Enum):
 
 
 class DataSymbol:
+    __slots__ = (
+        "name",
+        "symbol_type",
+        "_obj",
+        "_tags",
+        "_extra_metadata",
+        "_tombstone",
+        "_cached_out_of_sync",
+        "_fingerprint",
+        "cached_obj_id",
+        "cached_obj_type",
+        "containing_scope",
+        "call_scope",
+        "func_def_stmt",
+        "stmt_node",
+        "symbol_node",
+        "_funcall_live_symbols",
+        "parents",
+        "children",
+        "_timestamp",
+        "_last_refreshed_timestamp",
+        "_version",
+        "_defined_cell_num",
+        "_cascading_reactive_cell_num",
+        "_override_ready_liveness_cell_num",
+        "_override_timestamp",
+        "_watchpoints",
+        "required_timestamp",
+        "_timestamp_by_used_time",
+        "_used_node_by_used_time",
+        "_timestamp_by_liveness_time",
+        "_updated_timestamps",
+        "_updated_cell_nums",
+        "_fresher_ancestors",
+        "_fresher_ancestor_timestamps",
+        "_cells_where_deep_live",
+        "_cells_where_shallow_live",
+        "_last_computed_ready_or_waiting_cache_ts",
+        "_is_ready_or_waiting_at_position_cache",
+        "_implicit",
+        "disable_warnings",
+        "_temp_disable_warnings",
+    )
+
     NULL = object()
 
     # object for virtual display symbol
@@ -78,6 +146,29 @@ class DataSymbol:
 
     IMMUTABLE_TYPES = set(IMMUTABLE_PRIMITIVE_TYPES)
 
+    # only weakly referenced when DataflowSettings.use_weak_refs is enabled
+    obj = maybe_weak_ref(
+        lambda: flow().settings.use_weak_refs,
+        lambda owner, obj_id: flow().freed_obj_refs.append((owner, obj_id)),
+    )
+
+    # most (especially implicit and anonymous) symbols never use these,
+    # so they are only allocated on first access
+    extra_metadata = lazy_container(dict)
+    watchpoints = lazy_container(Watchpoints)
+    # for each usage of this dsym, the version that was used, if different from the timestamp of usage
+    timestamp_by_used_time = lazy_container(dict)
+    used_node_by_used_time = lazy_container(dict)
+    # History of definitions at time of liveness
+    timestamp_by_liveness_time = lazy_container(dict)
+    # All timestamps associated with this symbol
+    updated_timestamps = lazy_container(set)
+    fresher_ancestors = lazy_container(set)
+    fresher_ancestor_timestamps = lazy_container(set)
+    # cells where this symbol was live
+    cells_where_deep_live = lazy_container(set)
+    cells_where_shallow_live = lazy_container(set)
+
     def __init__(
         self,
         name: SupportedIndexType,
@@ -98,11 +189,13 @@ class DataSymbol:
         self.obj = obj
 
         # additional user-specific metadata
-        self._tags: Set[str] = set()
-        self.extra_metadata: Dict[str, Any] = {}
+        self._tags: Optional[Set[str]] = None
+        self._extra_metadata: Optional[Dict[str, Any]] = None
 
         self._tombstone = False
         self._cached_out_of_sync = True
+        # (timestamp, obj id, digest) of the last large obj we fingerprinted
+        self._fingerprint: Optional[Tuple[Timestamp, IdType, bytes]] = None
         self.cached_obj_id: Optional[int] = None
         self.cached_obj_type: Optional[Type[object]] = None
         if refresh_cached_obj:
@@ -129,31 +222,32 @@ class DataSymbol:
         # The version is a simple counter not associated with cells that is bumped whenever the timestamp is updated
         self._version: int = 0
         self._defined_cell_num = cells().exec_counter()
+        flow().symbols_by_defined_cell_num.setdefault(
+            self._defined_cell_num, set()
+        ).add(self)
         self._cascading_reactive_cell_num = -1
         self._override_ready_liveness_cell_num = -1
         self._override_timestamp: Optional[Timestamp] = None
-        self.watchpoints = Watchpoints()
+        self._watchpoints: Optional[Watchpoints] = None
 
         # The necessary last-updated timestamp / cell counter for this symbol to not be waiting
         self.required_timestamp: Timestamp = self.timestamp
 
-        # for each usage of this dsym, the version that was used, if different from the timestamp of usage
-        self.timestamp_by_used_time: Dict[Timestamp, Timestamp] = {}
-        self.used_node_by_used_time: Dict[Timestamp, ast.AST] = {}
-        # History of definitions at time of liveness
-        self.timestamp_by_liveness_time: Dict[Timestamp, Timestamp] = {}
-        # All timestamps associated with this symbol
-        self.updated_timestamps: Set[Timestamp] = set()
-
-        self.fresher_ancestors: Set["DataSymbol"] = set()
-        self.fresher_ancestor_timestamps: Set[Timestamp] = set()
-
-        # cells where this symbol was live
-        self.cells_where_deep_live: Set[CodeCell] = set()
-        self.cells_where_shallow_live: Set[CodeCell] = set()
+        self._timestamp_by_used_time: Optional[Dict[Timestamp, Timestamp]] = None
+        self._used_node_by_used_time: Optional[Dict[Timestamp, ast.AST]] = None
+        self._timestamp_by_liveness_time: Optional[Dict[Timestamp, Timestamp]] = None
+        self._updated_timestamps: Optional[Set[Timestamp]] = None
+        # counters this symbol is indexed under in flow().updated_symbols_by_cell_num
+        self._updated_cell_nums: Optional[Set[int]] = None
+        self._fresher_ancestors: Optional[Set["DataSymbol"]] = None
+        self._fresher_ancestor_timestamps: Optional[Set[Timestamp]] = None
+        self._cells_where_deep_live: Optional[Set[CodeCell]] = None
+        self._cells_where_shallow_live: Optional[Set[CodeCell]] = None
 
         self._last_computed_ready_or_waiting_cache_ts: int = -1
-        self._is_ready_or_waiting_at_position_cache: Dict[Tuple[int, bool], bool] = {}
+        self._is_ready_or_waiting_at_position_cache: Optional[
+            Dict[Tuple[int, bool], bool]
+        ] = None
 
         # if implicitly created when tracing non-store-context ast nodes
         self._implicit = implicit
@@ -181,7 +275,13 @@ class DataSymbol:
 
     @property
     def cells_where_live(self) -> Set[CodeCell]:
-        return self.cells_where_deep_live | self.cells_where_shallow_live
+        return set(self._cells_where_deep_live or ()) | set(
+            self._cells_where_shallow_live or ()
+        )
+
+    @property
+    def has_watchpoints(self) -> bool:
+        return self._watchpoints is not None and len(self._watchpoints) > 0
 
     def __repr__(self) -> str:
         return f"<{self.readable_name}>"
@@ -193,28 +293,33 @@ class DataSymbol:
         return hash(id(self))
 
     def add_tag(self, tag_value: str) -> None:
+        if self._tags is None:
+            self._tags = set()
         self._tags.add(tag_value)
 
     def remove_tag(self, tag_value: str) -> None:
-        self._tags.discard(tag_value)
+        if self._tags is not None:
+            self._tags.discard(tag_value)
 
     def has_tag(self, tag_value: str) -> bool:
-        return tag_value in self._tags
+        return self._tags is not None and tag_value in self._tags
 
     def temporary_disable_warnings(self) -> None:
         self._temp_disable_warnings = True
 
     @property
     def last_used_timestamp(self) -> Timestamp:
-        if len(self.timestamp_by_used_time) == 0:
+        if not self._timestamp_by_used_time:
             return Timestamp.uninitialized()
         else:
-            return max(self.timestamp_by_used_time.keys())
+            return max(self._timestamp_by_used_time.keys())
 
     @property
     def namespace_waiting_symbols(self) -> Set["DataSymbol"]:
         ns = self.namespace
-        return set() if ns is None else ns.namespace_waiting_symbols
+        if ns is None or ns._namespace_waiting_symbols is None:
+            return set()
+        return ns._namespace_waiting_symbols
 
     @property
     def timestamp_excluding_ns_descendents(self) -> Timestamp:
@@ -503,6 +608,7 @@ class DataSymbol:
         if self.is_garbage:
             return
         self._tombstone = True
+        flow().garbage_candidate_symbols.add(self)
         ns = self.namespace
         if ns is not None and all(alias.is_garbage for alias in self.aliases):
             ns.mark_garbage()
@@ -511,6 +617,16 @@ class DataSymbol:
         assert self.is_garbage
         flow().blocked_reactive_timestamps_by_symbol.pop(self, None)
         self._remove_self_from_aliases()
+        cleanup_discard(flow().symbols_by_defined_cell_num, self.defined_cell_num, self)
+        for cell_num in self._updated_cell_nums or ():
+            cleanup_discard(flow().updated_symbols_by_cell_num, cell_num, self)
+        self._updated_cell_nums = None
+        for used_ts in self._timestamp_by_used_time or ():
+            cleanup_discard(
+                flow().dynamic_usages_by_cell_num, used_ts.cell_num, (self, used_ts)
+            )
+        for used_ts in self._timestamp_by_liveness_time or ():
+            cleanup_discard(flow().static_usages_by_cell_num, used_ts.cell_num, self)
         for parent in self.parents:
             parent.children.pop(self, None)
         for child in self.children:
@@ -528,6 +644,42 @@ class DataSymbol:
         # need to keep this around for readable_name to work
         # self.containing_scope = None
 
+    def compact_history(self, dropped_cell_ctrs: Set[int]) -> None:
+        """
+        Fold history from dropped cell executions into summary entries that keep
+        answering the same questions: the last usage, the latest update per cell,
+        and the earliest edge introduced per cell.
+        """
+        if self._timestamp_by_used_time:
+            last_used = max(self._timestamp_by_used_time.keys())
+            for used_time in [
+                used_time
+                for used_time in self._timestamp_by_used_time
+                if used_time.cell_num in dropped_cell_ctrs and used_time != last_used
+            ]:
+                del self._timestamp_by_used_time[used_time]
+        for history in (self._used_node_by_used_time, self._timestamp_by_liveness_time):
+            if not history:
+                continue
+            for used_time in [
+                used_time
+                for used_time in history
+                if used_time.cell_num in dropped_cell_ctrs
+            ]:
+                del history[used_time]
+        if self._updated_timestamps:
+            self._updated_timestamps = set(
+                _fold_compacted_timestamps(
+                    self._updated_timestamps, dropped_cell_ctrs, keep_latest=True
+                )
+            )
+        for edges in (self.parents, self.children):
+            for sym, timestamps in edges.items():
+                if any(ts.cell_num in dropped_cell_ctrs for ts in timestamps):
+                    edges[sym] = _fold_compacted_timestamps(
+                        timestamps, dropped_cell_ctrs, keep_latest=False
+                    )
+
     # def update_type(self, new_type):
     #     self.symbol_type = new_type
     #     if self.is_function:
@@ -544,8 +696,8 @@ class DataSymbol:
         ):
             for cell in self.cells_where_live:
                 cell.invalidate_typecheck_result()
-        self.cells_where_shallow_live.clear()
-        self.cells_where_deep_live.clear()
+        self._cells_where_shallow_live = None
+        self._cells_where_deep_live = None
         self.obj = obj
         if self.cached_obj_id is not None and self.cached_obj_id != self.obj_id:
             new_ns = flow().namespaces.get(self.obj_id, None)
@@ -576,13 +728,26 @@ class DataSymbol:
         self.cached_obj_id = None
         self.cached_obj_type = None
 
+    @property
+    def holds_obj_weakly(self) -> bool:
+        return DataSymbol.obj.is_weak_for(self)
+
     def get_ref_count(self) -> int:
         if self.obj is None or self.obj is DataSymbol.NULL:
             return -1
         total = sys.getrefcount(self.obj) - 1
-        total -= len(flow().aliases.get(self.obj_id, []))
+        # only strong references held by symbols and namespaces count against the total
+        total -= sum(
+            not alias.holds_obj_weakly
+            for alias in flow().aliases.get(self.obj_id, [])
+        )
         ns = flow().namespaces.get(self.obj_id, None)
-        if ns is not None and ns.obj is not None and ns.obj is not DataSymbol.NULL:
+        if (
+            ns is not None
+            and not ns.holds_obj_weakly
+            and ns.obj is not None
+            and ns.obj is not DataSymbol.NULL
+        ):
             total -= 1
         return total
 
@@ -612,13 +777,31 @@ class DataSymbol:
         if obj_type != prev_type:
             return False
         obj_size_ubound = sizing.sizeof(self.obj)
-        if obj_size_ubound > sizing.MAX_SIZE:
-            return False
         cached_obj_size_ubound = sizing.sizeof(prev_obj)
-        if cached_obj_size_ubound > sizing.MAX_SIZE:
-            return False
+        if max(obj_size_ubound, cached_obj_size_ubound) > sizing.MAX_SIZE:
+            # too big for a pairwise comparison, so compare digests instead
+            return self._has_same_fingerprint(prev_obj)
         return (obj_size_ubound == cached_obj_size_ubound) and self.obj == prev_obj
 
+    def _has_same_fingerprint(self, prev_obj: Any) -> bool:
+        mode = flow().mut_settings.fingerprint_mode
+        if (
+            self._fingerprint is not None
+            and self._fingerprint[0] == self.timestamp
+            and self._fingerprint[1] == id(prev_obj)
+        ):
+            prev_fingerprint: Optional[bytes] = self._fingerprint[2]
+        else:
+            prev_fingerprint = fingerprint(prev_obj, mode)
+        if prev_fingerprint is None:
+            return False
+        obj_fingerprint = fingerprint(self.obj, mode)
+        if obj_fingerprint is None:
+            return False
+        # the timestamp gets filled in once update_deps has (maybe) bumped it
+        self._fingerprint = (Timestamp.uninitialized(), self.obj_id, obj_fingerprint)
+        return prev_fingerprint == obj_fingerprint
+
     def _handle_aliases(self):
         cleanup_discard(flow().aliases, self.cached_obj_id, self)
         flow().aliases.setdefault(self.obj_id, set()).add(self)
@@ -784,7 +967,7 @@ class DataSymbol:
                 dep_introduced_pos = cells().at_timestamp(ts).position
                 if dep_introduced_pos > pos:
                     continue
-                for updated_ts in par.updated_timestamps:
+                for updated_ts in par._updated_timestamps or ():
                     if cells().at_timestamp(updated_ts).position > dep_introduced_pos:
                         continue
                     if updated_ts.cell_num > ts.cell_num or par.is_waiting_at_position(
@@ -813,8 +996,11 @@ class DataSymbol:
                 return False
         if flow().mut_settings.flow_order == FlowDirection.ANY_ORDER:
             return True
-        if cells().exec_counter() > self._last_computed_ready_or_waiting_cache_ts:
-            self._is_ready_or_waiting_at_position_cache.clear()
+        if (
+            self._is_ready_or_waiting_at_position_cache is None
+            or cells().exec_counter() > self._last_computed_ready_or_waiting_cache_ts
+        ):
+            self._is_ready_or_waiting_at_position_cache = {}
             self._last_computed_ready_or_waiting_cache_ts = cells().exec_counter()
         if (pos, deep) in self._is_ready_or_waiting_at_position_cache:
             return self._is_ready_or_waiting_at_position_cache[pos, deep]
@@ -860,9 +1046,14 @@ class DataSymbol:
             # just bump the version if it's newly created
             if mutated or not self._timestamp.is_initialized:
                 self._timestamp = Timestamp.current()
+                flow().record_updated_symbols([self], self._timestamp.cell_num)
             return
-        if overwrite and not self.is_globally_accessible:
-            self.watchpoints.clear()
+        if (
+            overwrite
+            and self._watchpoints is not None
+            and not self.is_globally_accessible
+        ):
+            self._watchpoints.clear()
         if mutated and self.obj_type in self.IMMUTABLE_TYPES:
             return
         # if we get here, no longer implicit
@@ -886,10 +1077,12 @@ class DataSymbol:
             new_parent.children.setdefault(self, []).append(Timestamp.current())
             self.parents.setdefault(new_parent, []).append(Timestamp.current())
         self.required_timestamp = Timestamp.uninitialized()
-        self.fresher_ancestors.clear()
-        self.fresher_ancestor_timestamps.clear()
+        self._fresher_ancestors = None
+        self._fresher_ancestor_timestamps = None
         if mutated or isinstance(self.stmt_node, ast.AugAssign):
             self.update_usage_info()
+        if mutated:
+            self._fingerprint = None
         should_preserve_timestamp = not mutated and self.should_preserve_timestamp(
             prev_obj
         )
@@ -931,6 +1124,8 @@ class DataSymbol:
                 new_deps, mutated, propagate_to_namespace_descendents, refresh
             )
         self._refresh_cached_obj()
+        if self._fingerprint is not None and not self._fingerprint[0].is_initialized:
+            self._fingerprint = (self.timestamp, *self._fingerprint[1:])
         if self.is_class:
             # pop pending class defs and update obj ref
             pending_class_ns = tracer().pending_class_namespaces.pop()
@@ -1020,11 +1215,6 @@ class DataSymbol:
         ts_to_use = self._timestamp  # if exclude_ns else self.timestamp
         if ts_to_use.is_initialized:
             ts_to_use = max(ts_to_use, self._last_refreshed_timestamp)
-        timestamp_by_used_time = (
-            self.timestamp_by_liveness_time
-            if is_static
-            else self.timestamp_by_used_time
-        )
         if ts_to_use.is_initialized and not is_blocking:
             is_usage = False
             if is_static:
@@ -1050,6 +1240,16 @@ class DataSymbol:
                         add_only_if_parent_new=add_data_dep_only_if_parent_new,
                     )
             if is_usage:
+                if is_static:
+                    timestamp_by_used_time = self.timestamp_by_liveness_time
+                    flow().static_usages_by_cell_num.setdefault(
+                        used_time.cell_num, set()
+                    ).add(self)
+                else:
+                    timestamp_by_used_time = self.timestamp_by_used_time
+                    flow().dynamic_usages_by_cell_num.setdefault(
+                        used_time.cell_num, set()
+                    ).add((self, used_time))
                 timestamp_by_used_time[used_time] = ts_to_use
                 if used_node is not None:
                     self.used_node_by_used_time[used_time] = used_node
@@ -1083,14 +1283,18 @@ class DataSymbol:
         if bump_version:
             self._timestamp = Timestamp.current() if timestamp is None else timestamp
             self._override_timestamp = None
+            flow().record_updated_symbols([self], self._timestamp.cell_num)
             for cell in self.cells_where_live:
                 cell.add_used_cell_counter(self, self._timestamp.cell_num)
             ns = self.containing_namespace
             if ns is not None:
                 # logger.error("bump version of %s due to %s (value %s)", ns.full_path, self.full_path, self.obj)
                 ns.max_descendent_timestamp = self.timestamp_excluding_ns_descendents
+                flow().record_updated_symbols(
+                    flow().aliases.get(ns.obj_id, []), self._timestamp.cell_num
+                )
                 for alias in flow().aliases.get(ns.obj_id, []):
-                    for cell in alias.cells_where_deep_live:
+                    for cell in alias._cells_where_deep_live or ():
                         cell.add_used_cell_counter(alias, self._timestamp.cell_num)
             self.updated_timestamps.add(self._timestamp)
             self._version += 1
@@ -21,6 +21,7 @@ from ipyflow.data_model.timestamp import Timestamp
 from ipyflow.models import _NamespaceContainer, namespaces
 from ipyflow.singletons import flow
 from ipyflow.types import SupportedIndexType
+from ipyflow.utils.misc_utils import lazy_container, maybe_weak_ref
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -31,6 +32,17 @@ _override_unused_warning_namespaces = namespaces
 
 
 class Namespace(Scope):
+    __slots__ = (
+        "cloned_from",
+        "_child_clones",
+        "_obj",
+        "cached_obj_id",
+        "_tombstone",
+        "max_descendent_timestamp",
+        "_subscript_data_symbol_by_name",
+        "_namespace_waiting_symbols",
+    )
+
     ANONYMOUS = "<anonymous_namespace>"
 
     PENDING_CLASS_PLACEHOLDER = object()
@@ -38,12 +50,20 @@ class Namespace(Scope):
     # special object for virtually representing the file system
     FILE_SYSTEM: Dict[str, None] = dict()
 
+    child_clones = lazy_container(list)
+    namespace_waiting_symbols = lazy_container(set)
+    # only weakly referenced when DataflowSettings.use_weak_refs is enabled
+    obj = maybe_weak_ref(
+        lambda: flow().settings.use_weak_refs,
+        lambda owner, obj_id: flow().freed_obj_refs.append((owner, obj_id)),
+    )
+
     # TODO: support (multiple) inheritance by allowing
     #  Namespaces from classes to clone their parent class's Namespaces
     def __init__(self, obj: Any, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.cloned_from: Optional["Namespace"] = None
-        self.child_clones: List["Namespace"] = []
+        self._child_clones: Optional[List["Namespace"]] = None
         self.obj = obj
         self.cached_obj_id = id(obj)
         if (
@@ -62,7 +82,7 @@ class Namespace(Scope):
         # this timestamp needs to be bumped in DataSymbol refresh()
         self.max_descendent_timestamp: Timestamp = Timestamp.uninitialized()
         self._subscript_data_symbol_by_name: Dict[SupportedIndexType, DataSymbol] = {}
-        self.namespace_waiting_symbols: Set[DataSymbol] = set()
+        self._namespace_waiting_symbols: Optional[Set[DataSymbol]] = None
 
     @property
     def is_namespace_scope(self):
@@ -127,6 +147,10 @@ class Namespace(Scope):
         else:
             return False
 
+    @property
+    def holds_obj_weakly(self) -> bool:
+        return Namespace.obj.is_weak_for(self)
+
     @property
     def is_garbage(self) -> bool:
         return self._tombstone
@@ -135,6 +159,7 @@ class Namespace(Scope):
         if self.is_garbage:
             return
         self._tombstone = True
+        flow().garbage_candidate_namespaces.add(self)
         for sym in self.all_data_symbols_this_indentation(exclude_class=True):
             sym.mark_garbage()
 
@@ -264,13 +289,25 @@ class Namespace(Scope):
         )
         self._subscript_data_symbol_by_name[to_idx] = subsym
 
+    def _materialized_indices_between(self, lo: int, hi: int) -> List[int]:
+        # only indices that actually have symbols need remapping; everything
+        # else gets a symbol lazily if and when it is stored to or mutated
+        return sorted(
+            idx
+            for idx in self._subscript_data_symbol_by_name
+            if isinstance(idx, int) and lo <= idx <= hi
+        )
+
     def shuffle_symbols_upward_from(self, pos: int) -> None:
-        for idx in range(len(self.obj) - 1, pos, -1):
+        for from_idx in reversed(
+            self._materialized_indices_between(pos, len(self.obj) - 2)
+        ):
+            idx = from_idx + 1
             prev_obj = self.obj[idx + 1] if idx < len(self.obj) - 1 else None
-            self._remap_sym(idx - 1, idx, prev_obj)
+            self._remap_sym(from_idx, idx, prev_obj)
 
     def _shuffle_symbols_downward_to(self, pos: int) -> None:
-        for idx in range(pos + 1, len(self.obj) + 1):
+        for idx in self._materialized_indices_between(pos + 1, len(self.obj)):
             prev_obj = self.obj[idx - 2] if idx > pos + 1 else None
             self._remap_sym(idx, idx - 1, prev_obj)
 
@@ -320,6 +357,7 @@ class Namespace(Scope):
 
     def refresh(self) -> None:
         self.max_descendent_timestamp = Timestamp.current()
+        flow().record_updated_symbols(flow().aliases.get(self.obj_id, []))
 
     def get_earliest_ancestor_containing(
         self, obj_id: int, is_subscript: bool
@@ -33,6 +33,8 @@ _override_unused_warning_scopes = scopes
 
 
 class Scope:
+    __slots__ = ("scope_name", "parent_scope", "symtab", "_data_symbol_by_name")
+
     GLOBAL_SCOPE_NAME = "<module>"
 
     def __init__(
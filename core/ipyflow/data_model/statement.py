@@ -4,7 +4,17 @@ import builtins
 import logging
 import sys
 from types import FrameType
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+    cast,
+)
 
 from ipyflow.analysis.live_refs import stmt_contains_cascading_reactive_rval
 from ipyflow.analysis.symbol_edges import get_symbol_edges
@@ -19,6 +29,7 @@ from ipyflow.models import _StatementContainer, cells, statements
 from ipyflow.singletons import flow, tracer
 from ipyflow.slicing.context import SlicingContext, static_slicing_context
 from ipyflow.slicing.mixin import SlicingMixin
+from ipyflow.tracing.external_calls import clear_external_call_resolution_cache
 from ipyflow.tracing.symbol_resolver import resolve_rval_symbols
 from ipyflow.tracing.utils import match_container_obj_or_namespace_with_literal_nodes
 from ipyflow.types import IdType, TimestampOrCounter
@@ -46,6 +57,9 @@ class Statement(SlicingMixin):
     _TEXT_REPR_MAX_LENGTH: int = 70
     _stmts_by_ts: Dict[Timestamp, List["Statement"]] = {}
     _stmts_by_id: Dict[IdType, List["Statement"]] = {}
+    _timestamps_by_cell_num: Dict[int, Set[Timestamp]] = {}
+    # counters of dropped cell executions that still have statements kept around
+    _compacted_cell_nums: Set[int] = set()
 
     def __init__(
         self,
@@ -132,6 +146,9 @@ class Statement(SlicingMixin):
         else:
             cls._stmts_by_ts.setdefault(stmt.timestamp, []).append(stmt)
             cls._stmts_by_id.setdefault(stmt.stmt_id, []).append(stmt)
+            cls._timestamps_by_cell_num.setdefault(stmt.timestamp.cell_num, set()).add(
+                stmt.timestamp
+            )
         with static_slicing_context():
             for parent, syms in (
                 flow().stmt_deferred_static_parents.get(stmt.timestamp, {}).items()
@@ -143,6 +160,96 @@ class Statement(SlicingMixin):
     @classmethod
     def clear(cls):
         cls._stmts_by_ts = {}
+        cls._timestamps_by_cell_num = {}
+        cls._compacted_cell_nums = set()
+
+    @classmethod
+    def compacted_cell_nums(cls) -> Set[int]:
+        return cls._compacted_cell_nums
+
+    @classmethod
+    def compact_history(
+        cls, dropped_cell_ctrs: Set[int], pinned_timestamps: Iterable[Timestamp]
+    ) -> int:
+        """
+        Forget statements from dropped cell executions unless they are pinned or
+        reachable via parent edges from a statement that is kept, so that slices
+        of retained statements are unaffected. Every statement outside of dropped
+        executions is kept, so only statements from dropped executions (including
+        ones kept by earlier compactions) get visited. Returns the number forgotten.
+        """
+        cell_nums = dropped_cell_ctrs | cls._compacted_cell_nums
+        dropped_timestamps: Set[Timestamp] = set()
+        for cell_num in cell_nums:
+            dropped_timestamps |= cls._timestamps_by_cell_num.pop(cell_num, set())
+        if len(dropped_timestamps) == 0:
+            return 0
+        dropped_ids: Set[IdType] = {
+            stmt.stmt_id
+            for ts in dropped_timestamps
+            for stmt in cls._stmts_by_ts.get(ts, [])
+        }
+        kept_ids = cls._get_kept_stmt_ids(
+            dropped_timestamps, dropped_ids, pinned_timestamps
+        )
+        return cls._forget_stmts(dropped_timestamps, dropped_ids, kept_ids)
+
+    @classmethod
+    def _get_kept_stmt_ids(
+        cls,
+        dropped_timestamps: Set[Timestamp],
+        dropped_ids: Set[IdType],
+        pinned_timestamps: Iterable[Timestamp],
+    ) -> Set[IdType]:
+        frontier: List[IdType] = [
+            stmt.stmt_id
+            for ts in pinned_timestamps
+            if ts in dropped_timestamps
+            for stmt in cls._stmts_by_ts.get(ts, [])
+        ]
+        for stmt_id in dropped_ids:
+            for stmt in cls._stmts_by_id.get(stmt_id, []):
+                if stmt.timestamp not in dropped_timestamps:
+                    # this statement also ran in some retained execution
+                    frontier.append(stmt_id)
+                for _ in SlicingContext.iter_slicing_contexts():
+                    if not stmt.children.keys() <= dropped_ids:
+                        frontier.append(stmt_id)
+        kept_ids: Set[IdType] = set()
+        while len(frontier) > 0:
+            stmt_id = frontier.pop()
+            if stmt_id in kept_ids:
+                continue
+            kept_ids.add(stmt_id)
+            for stmt in cls._stmts_by_id.get(stmt_id, []):
+                for _ in SlicingContext.iter_slicing_contexts():
+                    frontier.extend(pid for pid in stmt.parents if pid in dropped_ids)
+        return kept_ids
+
+    @classmethod
+    def _forget_stmts(
+        cls,
+        dropped_timestamps: Set[Timestamp],
+        dropped_ids: Set[IdType],
+        kept_ids: Set[IdType],
+    ) -> int:
+        num_forgotten = 0
+        cls._compacted_cell_nums = set()
+        for ts in dropped_timestamps:
+            stmts = cls._stmts_by_ts.pop(ts, [])
+            kept = [stmt for stmt in stmts if stmt.stmt_id in kept_ids]
+            num_forgotten += len(stmts) - len(kept)
+            if len(kept) > 0:
+                cls._stmts_by_ts[ts] = kept
+                cls._timestamps_by_cell_num.setdefault(ts.cell_num, set()).add(ts)
+                cls._compacted_cell_nums.add(ts.cell_num)
+        for stmt_id in dropped_ids - kept_ids:
+            for stmt in cls._stmts_by_id.pop(stmt_id, []):
+                for _ in SlicingContext.iter_slicing_contexts():
+                    for pid in stmt.parents:
+                        for parent in cls._stmts_by_id.get(pid, []):
+                            parent.children.pop(stmt_id, None)
+        return num_forgotten
 
     @classmethod
     def at_timestamp(
@@ -171,6 +278,11 @@ class Statement(SlicingMixin):
     def all_at_timestamp(cls, ts: Timestamp) -> List["Statement"]:
         return cls._stmts_by_ts.get(ts, [])
 
+    @classmethod
+    def all_tracked(cls) -> Generator["Statement", None, None]:
+        for stmts in cls._stmts_by_ts.values():
+            yield from stmts
+
     @property
     def containing_cell(self) -> "CodeCell":
         return cells().at_timestamp(self.timestamp)
@@ -525,9 +637,15 @@ class Statement(SlicingMixin):
             logger.info("create edges from %s to %s", rval_deps, target)
             if is_class_def:
                 assert self.class_scope is not None
-                class_ref = self.frame.f_locals[cast(ast.ClassDef, self.stmt_node).name]
-                self.class_scope.obj = class_ref
-                flow().namespaces[id(class_ref)] = self.class_scope
+                # for one-line class bodies, we can end up with the enclosing
+                # scope here instead of the class namespace
+                if isinstance(self.class_scope, Namespace):
+                    class_ref = self.frame.f_locals[
+                        cast(ast.ClassDef, self.stmt_node).name
+                    ]
+                    self.class_scope.obj = class_ref
+                    flow().namespaces[id(class_ref)] = self.class_scope
+                    clear_external_call_resolution_cache()
             try:
                 (
                     scope,
@@ -598,12 +716,19 @@ class Statement(SlicingMixin):
         # avoid keeping dangling references to stack frames once we're done with them
         self.frame = None
 
+    def mark_unfinished(self, frame: FrameType) -> None:
+        # lets statements in traced loop bodies get traced again in later iterations
+        self._finished = False
+        self.frame = frame
+
     def finished_execution_hook(self) -> None:
         if self._finished:
             return
         self.handle_dependencies()
         with tracer().dataflow_tracing_disabled():
             for sym in list(tracer().this_stmt_updated_symbols):
+                if not sym.has_watchpoints:
+                    continue
                 passing_watchpoints = sym.watchpoints(
                     sym.obj,
                     position=(
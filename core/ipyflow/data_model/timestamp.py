@@ -2,7 +2,7 @@
 import ast
 import logging
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Generator, Iterable, NamedTuple, Optional, Union
+from typing import TYPE_CHECKING, Generator, Iterable, Optional, Union
 
 from ipyflow.models import _TimestampContainer, cells, timestamps
 from ipyflow.singletons import flow, tracer
@@ -25,18 +25,58 @@ _cell_offset = 0
 _stmt_offset = 0
 
 
-class Timestamp(NamedTuple):
-    cell_num: int
-    stmt_num: int
+# stmt_num lives in the low bits, biased so that it is never negative and
+# so that packed values order the same way as (cell_num, stmt_num) tuples
+_STMT_BITS = 32
+_STMT_BIAS = 1 << (_STMT_BITS - 1)
+_STMT_MASK = (1 << _STMT_BITS) - 1
+
+
+def _pack(cell_num: int, stmt_num: int) -> int:
+    return (cell_num << _STMT_BITS) + stmt_num + _STMT_BIAS
+
+
+_UNINITIALIZED_PACKED = _pack(-1, -1)
+
+
+class Timestamp(int):
+    """
+    A (cell_num, stmt_num) pair packed into a single int, so that comparing
+    and hashing timestamps does not need to allocate or go through Python.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, cell_num: int, stmt_num: int) -> "Timestamp":
+        return int.__new__(cls, _pack(cell_num, stmt_num))
+
+    @property
+    def cell_num(self) -> int:
+        return self >> _STMT_BITS
+
+    @property
+    def stmt_num(self) -> int:
+        return (self & _STMT_MASK) - _STMT_BIAS
+
+    def __repr__(self) -> str:
+        return "Timestamp(cell_num=%d, stmt_num=%d)" % (self.cell_num, self.stmt_num)
+
+    def __reduce__(self):
+        return self.__class__, (self.cell_num, self.stmt_num)
 
     @classmethod
     def current(cls) -> "Timestamp":
+        global _last_current
         # TODO: shouldn't have to go through flow() singleton to get the cell counter,
         #  but the dependency structure prevents us from importing from ipyflow.data_model.code_cell
-        return cls(
+        packed = _pack(
             flow().cell_counter() + _cell_offset,
             tracer().module_stmt_counter() + _stmt_offset,
         )
+        # intern the most recent value, as it is requested many times per statement
+        if _last_current != packed:
+            _last_current = int.__new__(cls, packed)
+        return _last_current
 
     @property
     def positional(self) -> "Timestamp":
@@ -44,11 +84,11 @@ class Timestamp(NamedTuple):
 
     @classmethod
     def uninitialized(cls) -> "Timestamp":
-        return cls(-1, -1)
+        return _UNINITIALIZED
 
     @property
     def is_initialized(self) -> bool:
-        return self > Timestamp.uninitialized()
+        return self > _UNINITIALIZED_PACKED
 
     def plus(self, cell_num_delta: int, stmt_num_delta: int) -> "Timestamp":
         return self.__class__(
@@ -70,14 +110,6 @@ class Timestamp(NamedTuple):
             _cell_offset -= cell_offset
             _stmt_offset -= stmt_offset
 
-    def __eq__(self, other) -> bool:
-        if not isinstance(other, Timestamp):
-            raise TypeError(
-                "cannot compare non-timestamp value %s with timestamp %s"
-                % (other, self)
-            )
-        return tuple(self._asdict().values()) == tuple(other._asdict().values())
-
     @classmethod
     def update_usage_info(
         cls,
@@ -104,6 +136,10 @@ class Timestamp(NamedTuple):
                 )
 
 
+_UNINITIALIZED = Timestamp(-1, -1)
+_last_current = _UNINITIALIZED
+
+
 if len(_TimestampContainer) == 0:
     _TimestampContainer.append(Timestamp)
 else:
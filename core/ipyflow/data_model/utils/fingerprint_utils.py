@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import sys
+from typing import Any, List, Optional, Set
+
+from ipyflow.config import FingerprintMode
+
+"""
+This module computes content fingerprints: short digests that let us tell
+whether a reassigned value actually changed without keeping the old value
+around for a pairwise equality check. Buffers (numpy arrays, pandas objects,
+bytes and str) are fed to blake2b directly; small containers of supported
+values are hashed structurally. Unsupported objects (and self-referential
+containers) get no fingerprint.
+
+In SAMPLED mode, buffers over SAMPLING_THRESHOLD bytes only have a fixed
+number of evenly spaced chunks hashed (along with their total length), which
+trades exactness for bounded cost on very large arrays.
+"""
+
+DIGEST_SIZE = 16
+
+# in sampled mode, only some chunks of buffers larger than this get hashed
+SAMPLING_THRESHOLD = 1 << 26
+_SAMPLED_CHUNK_SIZE = 1 << 20
+_NUM_SAMPLED_CHUNKS = 32
+
+# max number of container elements to hash structurally, across all nesting levels
+MAX_CONTAINER_ELEMENTS = 10**4
+
+_LEAF_TYPES = (type(None), bool, int, float, complex)
+
+
+class _Fingerprinter:
+    def __init__(self, mode: FingerprintMode) -> None:
+        self.mode = mode
+        self.hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        self.remaining_elements = MAX_CONTAINER_ELEMENTS
+        # ids of the containers currently being hashed, to detect cycles
+        self.active_container_ids: Set[int] = set()
+
+    def _update_tag(self, tag: str) -> None:
+        self.hasher.update(tag.encode("utf-8"))
+        self.hasher.update(b"\0")
+
+    def _update_buffer(self, buf: memoryview) -> None:
+        nbytes = buf.nbytes
+        self.hasher.update(nbytes.to_bytes(8, "little"))
+        if self.mode != FingerprintMode.SAMPLED or nbytes <= SAMPLING_THRESHOLD:
+            self.hasher.update(buf)
+            return
+        num_chunks = (nbytes + _SAMPLED_CHUNK_SIZE - 1) // _SAMPLED_CHUNK_SIZE
+        sampled_chunks = {
+            (idx * (num_chunks - 1)) // (_NUM_SAMPLED_CHUNKS - 1)
+            for idx in range(_NUM_SAMPLED_CHUNKS)
+        }
+        for chunk in sorted(sampled_chunks):
+            start = chunk * _SAMPLED_CHUNK_SIZE
+            end = start + _SAMPLED_CHUNK_SIZE
+            self.hasher.update(buf[start:end])
+
+    def _update_ndarray(self, arr: Any) -> bool:
+        if arr.dtype.hasobject:
+            return False
+        numpy = sys.modules["numpy"]
+        self._update_tag(arr.dtype.str)
+        self._update_tag(repr(arr.shape))
+        flat = numpy.ascontiguousarray(arr).reshape(-1).view(numpy.uint8)
+        self._update_buffer(memoryview(flat))
+        return True
+
+    def _update_pandas(self, obj: Any) -> bool:
+        pandas = sys.modules["pandas"]
+        try:
+            hashed_rows = pandas.util.hash_pandas_object(obj, index=True)
+        except TypeError:
+            # e.g. unhashable values in object columns
+            return False
+        if isinstance(obj, pandas.DataFrame):
+            self._update_tag(repr(list(obj.columns)))
+            self._update_tag(repr(list(obj.dtypes)))
+        else:
+            self._update_tag(repr(getattr(obj, "name", None)))
+            self._update_tag(repr(obj.dtype))
+        return self._update_ndarray(hashed_rows.to_numpy())
+
+    def _update_container(self, obj: Any, elts: List[Any], ordered: bool) -> bool:
+        obj_id = id(obj)
+        if obj_id in self.active_container_ids:
+            return False
+        self.active_container_ids.add(obj_id)
+        try:
+            return self._update_elements(elts, ordered)
+        finally:
+            self.active_container_ids.discard(obj_id)
+
+    def _update_elements(self, elts: List[Any], ordered: bool) -> bool:
+        self.remaining_elements -= len(elts)
+        if self.remaining_elements < 0:
+            return False
+        if ordered:
+            self._update_tag(str(len(elts)))
+            return all(self.update(elt) for elt in elts)
+        # equal sets / dicts can iterate in different orders, so combine
+        # per-element digests in sorted order
+        digests = []
+        for elt in elts:
+            sub = _Fingerprinter(self.mode)
+            sub.remaining_elements = self.remaining_elements
+            sub.active_container_ids = self.active_container_ids
+            if not sub.update(elt):
+                return False
+            self.remaining_elements = sub.remaining_elements
+            digests.append(sub.hasher.digest())
+        self._update_tag(str(len(digests)))
+        for digest in sorted(digests):
+            self.hasher.update(digest)
+        return True
+
+    def update(self, obj: Any) -> bool:
+        obj_type = type(obj)
+        self._update_tag(f"{obj_type.__module__}.{obj_type.__qualname__}")
+        if obj_type in _LEAF_TYPES:
+            self._update_tag(repr(obj))
+            return True
+        if isinstance(obj, str):
+            self._update_buffer(memoryview(obj.encode("utf-8", "surrogatepass")))
+            return True
+        if isinstance(obj, (bytes, bytearray)):
+            self._update_buffer(memoryview(obj))
+            return True
+        numpy = sys.modules.get("numpy", None)
+        if numpy is not None and isinstance(obj, numpy.ndarray):
+            return self._update_ndarray(obj)
+        pandas = sys.modules.get("pandas", None)
+        if pandas is not None and isinstance(
+            obj, (pandas.DataFrame, pandas.Series, pandas.Index)
+        ):
+            return self._update_pandas(obj)
+        if isinstance(obj, (list, tuple)):
+            return self._update_container(obj, list(obj), ordered=True)
+        if isinstance(obj, (set, frozenset)):
+            return self._update_container(obj, list(obj), ordered=False)
+        if isinstance(obj, dict):
+            return self._update_container(obj, list(obj.items()), ordered=False)
+        return False
+
+
+def fingerprint(obj: Any, mode: FingerprintMode) -> Optional[bytes]:
+    """
+    Returns a digest of the contents of `obj`, or None if fingerprinting
+    is disabled or not supported for some part of `obj`.
+    """
+    if mode == FingerprintMode.OFF:
+        return None
+    fingerprinter = _Fingerprinter(mode)
+    try:
+        if not fingerprinter.update(obj):
+            return None
+    except (TypeError, ValueError, BufferError, RecursionError):
+        return None
+    return fingerprinter.hasher.digest()
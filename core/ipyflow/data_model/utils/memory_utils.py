@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+import ast
+import random
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from ipyflow.models import cells, statements
+from ipyflow.singletons import flow, tracer
+from ipyflow.utils.output_store import StoredCapturedIO
+
+if TYPE_CHECKING:
+    from IPython.utils.capture import CapturedIO
+
+    from ipyflow.data_model.code_cell import CodeCell
+    from ipyflow.data_model.data_symbol import DataSymbol
+    from ipyflow.data_model.namespace import Namespace
+    from ipyflow.data_model.statement import Statement
+
+
+"""
+This module estimates how much memory ipyflow's own bookkeeping retains,
+as opposed to user data. Sizes are shallow `sys.getsizeof` estimates of the
+metadata objects and the containers they own; user objects referenced by
+symbols and namespaces are never counted. Collections with more than
+`sample_size` entries are estimated by extrapolating from a random sample,
+in which case the top entries are drawn from the sample only.
+"""
+
+T = TypeVar("T")
+
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_TOP_K = 10
+
+_SYMBOL_CONTAINER_SLOTS = (
+    "parents",
+    "children",
+    "_tags",
+    "_extra_metadata",
+    "_timestamp_by_used_time",
+    "_used_node_by_used_time",
+    "_timestamp_by_liveness_time",
+    "_updated_timestamps",
+    "_updated_cell_nums",
+    "_fresher_ancestors",
+    "_fresher_ancestor_timestamps",
+    "_cells_where_deep_live",
+    "_cells_where_shallow_live",
+    "_is_ready_or_waiting_at_position_cache",
+)
+
+_EDGE_CONTAINER_ATTRS = (
+    "_dynamic_parents",
+    "_dynamic_children",
+    "_static_parents",
+    "_static_children",
+)
+
+
+def _container_size(container: Any) -> int:
+    if container is None:
+        return 0
+    size = sys.getsizeof(container)
+    if isinstance(container, dict):
+        for val in container.values():
+            if isinstance(val, (dict, list, set)):
+                size += sys.getsizeof(val)
+    return size
+
+
+def _ast_size(node: Optional[ast.AST], seen: Set[int]) -> int:
+    if node is None:
+        return 0
+    size = 0
+    for child in ast.walk(node):
+        if id(child) in seen:
+            continue
+        seen.add(id(child))
+        size += sys.getsizeof(child) + sys.getsizeof(child.__dict__)
+    return size
+
+
+def _captured_output_size(captured: Optional["CapturedIO"]) -> int:
+    if captured is None:
+        return 0
+    if isinstance(captured, StoredCapturedIO):
+        # only count what is resident in memory rather than paging spilled data in
+        return captured.mem_size
+    size = sys.getsizeof(captured.stdout) + sys.getsizeof(captured.stderr)
+    for output in captured._outputs:
+        for val in output.get("data", {}).values():
+            size += sys.getsizeof(val)
+    return size
+
+
+def symbol_size(sym: "DataSymbol") -> int:
+    return sys.getsizeof(sym) + sum(
+        _container_size(getattr(sym, slot)) for slot in _SYMBOL_CONTAINER_SLOTS
+    )
+
+
+def namespace_size(ns: "Namespace") -> int:
+    return (
+        sys.getsizeof(ns)
+        + _container_size(ns._data_symbol_by_name)
+        + _container_size(ns._subscript_data_symbol_by_name)
+        + _container_size(ns._namespace_waiting_symbols)
+    )
+
+
+def statement_size(stmt: "Statement", seen_ast_nodes: Set[int]) -> int:
+    return (
+        sys.getsizeof(stmt)
+        + sys.getsizeof(stmt.__dict__)
+        + sum(_container_size(getattr(stmt, attr)) for attr in _EDGE_CONTAINER_ATTRS)
+        + _ast_size(stmt.stmt_node, seen_ast_nodes)
+    )
+
+
+def cell_size(cell: "CodeCell", seen_ast_nodes: Set[int]) -> int:
+    return (
+        sys.getsizeof(cell)
+        + sys.getsizeof(cell.__dict__)
+        + sys.getsizeof(cell.executed_content)
+        + sum(_container_size(getattr(cell, attr)) for attr in _EDGE_CONTAINER_ATTRS)
+        + _ast_size(cell._cached_ast, seen_ast_nodes)
+    )
+
+
+class ComponentStats:
+    __slots__ = ("count", "sampled", "estimated_bytes")
+
+    def __init__(self, count: int, sampled: int, estimated_bytes: int) -> None:
+        self.count = count
+        self.sampled = sampled
+        self.estimated_bytes = estimated_bytes
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sampled": self.sampled,
+            "estimated_bytes": self.estimated_bytes,
+        }
+
+
+def _estimate(
+    items: Sequence[T], size_fn: Callable[[T], int], sample_size: int
+) -> Tuple[ComponentStats, List[Tuple[T, int]]]:
+    if len(items) > sample_size:
+        sample = random.sample(items, sample_size)
+    else:
+        sample = list(items)
+    sized = [(item, size_fn(item)) for item in sample]
+    total = sum(size for _, size in sized)
+    if len(sample) > 0:
+        total = total * len(items) // len(sample)
+    return ComponentStats(len(items), len(sample), total), sized
+
+
+def _top_k(sized: List[Tuple[T, int]], k: int) -> List[Tuple[T, int]]:
+    return sorted(sized, key=lambda item: item[1], reverse=True)[:k]
+
+
+class MemoryReport:
+    """
+    Estimated memory retained by ipyflow's dataflow state, broken down by
+    component, along with the symbols and cells that retain the most.
+    """
+
+    def __init__(
+        self,
+        components: Dict[str, ComponentStats],
+        top_symbols: List[Tuple[str, int]],
+        top_cells: List[Tuple[int, int]],
+    ) -> None:
+        self.components = components
+        self.top_symbols = top_symbols
+        self.top_cells = top_cells
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(stats.estimated_bytes for stats in self.components.values())
+
+    @classmethod
+    def compute(
+        cls, sample_size: int = DEFAULT_SAMPLE_SIZE, top_k: int = DEFAULT_TOP_K
+    ) -> "MemoryReport":
+        flow_ = flow()
+        components: Dict[str, ComponentStats] = {}
+        components["symbols"], sized_symbols = _estimate(
+            list(flow_.all_data_symbols()), symbol_size, sample_size
+        )
+        components["namespaces"], _ = _estimate(
+            list(flow_.namespaces.values()), namespace_size, sample_size
+        )
+        # statements are sized first so that cells only count AST nodes
+        # that were not already attributed to some statement
+        seen_ast_nodes: Set[int] = set()
+        components["statements"], _ = _estimate(
+            list(statements().all_tracked()),
+            lambda stmt: statement_size(stmt, seen_ast_nodes),
+            sample_size,
+        )
+        all_cells = list(cells().all_run_cells())
+        components["cells"], sized_cells = _estimate(
+            all_cells,
+            lambda cell: cell_size(cell, seen_ast_nodes),
+            sample_size,
+        )
+        # outputs are cheap to size exactly, so never sample them
+        output_size_by_cell = {
+            cell: _captured_output_size(cell.captured_output) for cell in all_cells
+        }
+        components["captured_outputs"] = ComponentStats(
+            len(all_cells), len(all_cells), sum(output_size_by_cell.values())
+        )
+        # the nodes themselves are owned by cell / statement ASTs
+        ast_node_by_id = getattr(tracer(), "ast_node_by_id", {})
+        components["ast_node_by_id"] = ComponentStats(
+            len(ast_node_by_id), len(ast_node_by_id), sys.getsizeof(ast_node_by_id)
+        )
+        return cls(
+            components,
+            [(sym.readable_name, size) for sym, size in _top_k(sized_symbols, top_k)],
+            [
+                (cell.cell_ctr, size)
+                for cell, size in _top_k(
+                    [
+                        (cell, size + output_size_by_cell[cell])
+                        for cell, size in sized_cells
+                    ],
+                    top_k,
+                )
+            ],
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "components": {
+                name: stats.to_json() for name, stats in self.components.items()
+            },
+            "total_bytes": self.total_bytes,
+            "top_symbols": [
+                {"symbol": name, "estimated_bytes": size}
+                for name, size in self.top_symbols
+            ],
+            "top_cells": [
+                {"cell_num": cell_num, "estimated_bytes": size}
+                for cell_num, size in self.top_cells
+            ],
+        }
+
+    def format_report(self) -> str:
+        name_width = max(len("component"), max(len(name) for name in self.components))
+        lines = [f"{'component':<{name_width}}  {'count':>10}  {'est. KiB':>10}"]
+        for name, stats in self.components.items():
+            lines.append(
+                f"{name:<{name_width}}  {stats.count:>10}  "
+                f"{stats.estimated_bytes / 1024:>10.1f}"
+            )
+        lines.append(
+            f"{'total':<{name_width}}  {'':>10}  {self.total_bytes / 1024:>10.1f}"
+        )
+        if len(self.top_symbols) > 0:
+            lines.append("")
+            lines.append("top symbols by retained size:")
+            for name, size in self.top_symbols:
+                lines.append(f"  {name}: {size / 1024:.1f} KiB")
+        if len(self.top_cells) > 0:
+            lines.append("")
+            lines.append("top cells by retained size:")
+            for cell_num, size in self.top_cells:
+                lines.append(f"  [{cell_num}]: {size / 1024:.1f} KiB")
+        return "\n".join(lines)
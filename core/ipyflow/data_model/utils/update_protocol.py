@@ -104,7 +104,7 @@ class UpdateProtocol:
                 continue
             dsym.updated_timestamps.add(Timestamp.current())
             self.seen.add(dsym)
-            for cell in dsym.cells_where_deep_live:
+            for cell in dsym._cells_where_deep_live or ():
                 cell.add_used_cell_counter(dsym, flow().cell_counter())
             containing_ns = None if dsym.is_module else dsym.containing_namespace
             if containing_ns is not None:
@@ -115,7 +115,8 @@ class UpdateProtocol:
                     dsym.obj_id,
                     containing_ns.obj_id,
                 )
-                containing_ns.namespace_waiting_symbols.discard(dsym)
+                if containing_ns._namespace_waiting_symbols is not None:
+                    containing_ns._namespace_waiting_symbols.discard(dsym)
                 containing_ns.max_descendent_timestamp = Timestamp.current()
                 self._collect_updated_symbols_and_refresh_namespaces(
                     flow().aliases.get(containing_ns.obj_id, set()),
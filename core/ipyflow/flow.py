@@ -5,6 +5,7 @@ import logging
 import os
 import sys
 import textwrap
+import weakref
 from types import FrameType
 from typing import (
     Any,
@@ -12,6 +13,7 @@ from typing import (
     Dict,
     Iterable,
     List,
+    MutableMapping,
     Optional,
     Set,
     Tuple,
@@ -30,6 +32,7 @@ from ipyflow.config import (
     DataflowSettings,
     ExecutionMode,
     ExecutionSchedule,
+    FingerprintMode,
     FlowDirection,
     Highlights,
     Interface,
@@ -41,7 +44,7 @@ from ipyflow.data_model.namespace import Namespace
 from ipyflow.data_model.scope import Scope
 from ipyflow.data_model.statement import statements
 from ipyflow.data_model.timestamp import Timestamp
-from ipyflow.frontend import FrontendCheckerResult
+from ipyflow.frontend import ExecScheduleResponsePatcher, FrontendCheckerResult
 from ipyflow.line_magics import make_line_magic
 from ipyflow.slicing.context import (
     SlicingContext,
@@ -49,15 +52,22 @@ from ipyflow.slicing.context import (
     slicing_ctx_var,
     static_slicing_context,
 )
+from ipyflow.tracing.external_calls import clear_external_call_resolution_cache
+from ipyflow.tracing.handler_profiler import HandlerProfiler
 from ipyflow.tracing.ipyflow_tracer import DataflowTracer
 from ipyflow.tracing.watchpoint import Watchpoint
 from ipyflow.types import IdType, SupportedIndexType
 from ipyflow.utils.misc_utils import cleanup_discard
+from ipyflow.utils.output_store import DEFAULT_BUDGET_BYTES, captured_output_store
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 
+# number of cell executions between full gc sweeps over all symbols and namespaces
+_GC_FULL_SWEEP_INTERVAL = 100
+
+
 class NotebookFlow(singletons.NotebookFlow):
     """Holds all the state necessary to capture dataflow in Jupyter notebooks."""
 
@@ -86,6 +96,21 @@ class NotebookFlow(singletons.NotebookFlow):
                 "mark_phantom_cell_usages_unsafe",
                 getattr(config, "mark_phantom_cell_usages_unsafe", False),
             ),
+            use_weak_refs=kwargs.pop(
+                "use_weak_refs",
+                getattr(config, "use_weak_refs", False),
+            ),
+            captured_output_budget_bytes=kwargs.pop(
+                "captured_output_budget_bytes",
+                getattr(config, "captured_output_budget_bytes", DEFAULT_BUDGET_BYTES),
+            ),
+            incremental_checker=kwargs.pop(
+                "incremental_checker",
+                getattr(config, "incremental_checker", True),
+            ),
+        )
+        captured_output_store().budget_bytes = (
+            self.settings.captured_output_budget_bytes
         )
         self.mut_settings: MutableDataflowSettings = MutableDataflowSettings(
             dataflow_enabled=kwargs.pop("dataflow_enabled", True),
@@ -146,6 +171,30 @@ class NotebookFlow(singletons.NotebookFlow):
                 "max_external_call_depth_for_tracing",
                 getattr(config, "max_external_call_depth_for_tracing", 3),
             ),
+            loop_summarization_threshold=kwargs.pop(
+                "loop_summarization_threshold",
+                getattr(config, "loop_summarization_threshold", 1),
+            ),
+            fingerprint_mode=FingerprintMode(
+                kwargs.pop(
+                    "fingerprint_mode",
+                    FingerprintMode(
+                        getattr(config, "fingerprint_mode", FingerprintMode.FULL)
+                    ),
+                )
+            ),
+            history_max_versions_per_cell=kwargs.pop(
+                "history_max_versions_per_cell",
+                getattr(config, "history_max_versions_per_cell", None),
+            ),
+            history_window=kwargs.pop(
+                "history_window",
+                getattr(config, "history_window", None),
+            ),
+            history_compaction_interval=kwargs.pop(
+                "history_compaction_interval",
+                getattr(config, "history_compaction_interval", 1),
+            ),
             is_dev_mode=kwargs.pop(
                 "is_dev_mode",
                 getattr(
@@ -162,6 +211,12 @@ class NotebookFlow(singletons.NotebookFlow):
         # Note: explicitly adding the types helps PyCharm intellisense
         self.namespaces: Dict[int, Namespace] = {}
         self.aliases: Dict[int, Set[DataSymbol]] = {}
+        # bookkeeping for incremental gc; see NotebookFlow.gc
+        self.symbols_by_defined_cell_num: Dict[int, Set[DataSymbol]] = {}
+        self.garbage_candidate_symbols: Set[DataSymbol] = set()
+        self.garbage_candidate_namespaces: Set[Namespace] = set()
+        # (owner, id) pairs for weakly referenced objects that have since been freed
+        self.freed_obj_refs: List[Tuple[Union[DataSymbol, Namespace], int]] = []
         self.stmt_deferred_static_parents: Dict[
             Timestamp, Dict[Timestamp, Set[DataSymbol]]
         ] = {}
@@ -169,6 +224,13 @@ class NotebookFlow(singletons.NotebookFlow):
         self.virtual_symbols: Scope = Scope()
         self._virtual_symbols_inited: bool = False
         self.updated_symbols: Set[DataSymbol] = set()
+        self.updated_symbols_by_cell_num: Dict[int, Set[DataSymbol]] = {}
+        # (symbol, used time) for every traced usage, indexed by the using cell
+        self.dynamic_usages_by_cell_num: Dict[
+            int, Set[Tuple[DataSymbol, Timestamp]]
+        ] = {}
+        # symbols with static (liveness-based) usages, indexed by the using cell
+        self.static_usages_by_cell_num: Dict[int, Set[DataSymbol]] = {}
         self.updated_reactive_symbols: Set[DataSymbol] = set()
         self.updated_deep_reactive_symbols: Set[DataSymbol] = set()
         self.updated_reactive_symbols_last_cell: Set[DataSymbol] = set()
@@ -196,6 +258,7 @@ class NotebookFlow(singletons.NotebookFlow):
         self._tags: Tuple[str, ...] = ()
         self.last_executed_content: Optional[str] = None
         self.last_executed_cell_id: Optional[IdType] = None
+        self.handler_profiler = HandlerProfiler()
         self._comm_handlers: Dict[
             str, Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
         ] = {}
@@ -209,6 +272,9 @@ class NotebookFlow(singletons.NotebookFlow):
         self.register_comm_handler("reactivity_cleanup", self.handle_reactivity_cleanup)
         self.register_comm_handler("refresh_symbols", self.handle_refresh_symbols)
         self.register_comm_handler("upsert_symbol", self.handle_upsert_symbol)
+        self.register_comm_handler(
+            "get_handler_profile", self.handle_get_handler_profile
+        )
         self.register_comm_handler(
             "register_dynamic_comm_handler", self.handle_register_dynamic_comm_handler
         )
@@ -216,6 +282,15 @@ class NotebookFlow(singletons.NotebookFlow):
         self.display_sym: DataSymbol = None
         self._comm: Optional[Comm] = None
         self._prev_cell_metadata_by_id: Optional[Dict[IdType, Dict[str, Any]]] = None
+        # version of the above as numbered by the frontend; deltas must be based on it
+        self._cell_metadata_version: Optional[int] = None
+        # cells whose content changed while analysis was skipped during reactive exec
+        self._cell_ids_pending_analysis: Set[IdType] = set()
+        self._last_content_analysis_cell_counter: Optional[int] = None
+        # last exec schedule sent over each comm, for sending patches against it
+        self._exec_schedule_patcher_by_comm: MutableMapping[
+            Any, ExecScheduleResponsePatcher
+        ] = weakref.WeakKeyDictionary()
         if use_comm:
             get_ipython().kernel.comm_manager.register_target(
                 __package__, self._comm_target
@@ -280,6 +355,45 @@ class NotebookFlow(singletons.NotebookFlow):
                 self.mut_settings.max_external_call_depth_for_tracing,
             ),
         )
+        self.mut_settings.loop_summarization_threshold = getattr(
+            config,
+            "loop_summarization_threshold",
+            kwargs.get(
+                "loop_summarization_threshold",
+                self.mut_settings.loop_summarization_threshold,
+            ),
+        )
+        self.mut_settings.fingerprint_mode = FingerprintMode(
+            getattr(
+                config,
+                "fingerprint_mode",
+                kwargs.get("fingerprint_mode", self.mut_settings.fingerprint_mode),
+            )
+        )
+        self.mut_settings.history_max_versions_per_cell = getattr(
+            config,
+            "history_max_versions_per_cell",
+            kwargs.get(
+                "history_max_versions_per_cell",
+                self.mut_settings.history_max_versions_per_cell,
+            ),
+        )
+        self.mut_settings.history_window = getattr(
+            config,
+            "history_window",
+            kwargs.get(
+                "history_window",
+                self.mut_settings.history_window,
+            ),
+        )
+        self.mut_settings.history_compaction_interval = getattr(
+            config,
+            "history_compaction_interval",
+            kwargs.get(
+                "history_compaction_interval",
+                self.mut_settings.history_compaction_interval,
+            ),
+        )
         self.mut_settings.is_dev_mode = getattr(
             config,
             "is_dev_mode",
@@ -357,11 +471,12 @@ class NotebookFlow(singletons.NotebookFlow):
         # only called in test context
         assert not singletons.kernel().settings.store_history
         for sym in self.all_data_symbols():
-            sym._timestamp = (
-                sym._max_inner_timestamp
-            ) = sym.required_timestamp = Timestamp.uninitialized()
-            sym.timestamp_by_used_time.clear()
-            sym.timestamp_by_liveness_time.clear()
+            sym._timestamp = sym.required_timestamp = Timestamp.uninitialized()
+            sym._timestamp_by_used_time = None
+            sym._timestamp_by_liveness_time = None
+        self.updated_symbols_by_cell_num.clear()
+        self.dynamic_usages_by_cell_num.clear()
+        self.static_usages_by_cell_num.clear()
         cells().clear()
         statements().clear()
 
@@ -496,6 +611,10 @@ class NotebookFlow(singletons.NotebookFlow):
             response = {}
         response["type"] = response.get("type", request_type)
         response["success"] = response.get("success", True)
+        if response["type"] == "compute_exec_schedule" and response["success"]:
+            response = self._maybe_patch_exec_schedule_response(
+                request, response, comm
+            )
         try:
             comm.send(response)
         except TypeError as e:
@@ -503,22 +622,86 @@ class NotebookFlow(singletons.NotebookFlow):
                 "unable to serialize response for request of type %s" % request_type
             ) from e
 
+    def _maybe_patch_exec_schedule_response(
+        self, request: Dict[str, Any], response: Dict[str, Any], comm: Any
+    ) -> Dict[str, Any]:
+        patcher = self._exec_schedule_patcher_by_comm.get(comm)
+        if patcher is None:
+            if not request.get("accepts_exec_schedule_patch", False):
+                return response
+            patcher = ExecScheduleResponsePatcher()
+            self._exec_schedule_patcher_by_comm[comm] = patcher
+        # once a comm has opted in, everything sent on it (including pushes
+        # initiated by the kernel) goes through its patcher, so that the
+        # frontend's version always matches the patcher's
+        return patcher.make_response(
+            response, full_snapshot=request.get("full_snapshot", False)
+        )
+
     def handle_change_active_cell(
         self, request: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
         self.set_active_cell(request["active_cell_id"])
         return None
 
+    def _apply_cell_metadata_delta(
+        self, request: Dict[str, Any]
+    ) -> Optional[Set[IdType]]:
+        """
+        Applies the cells added, removed, moved, or edited since the version
+        the delta is based on. Returns the ids of cells whose content was sent,
+        or None if the delta does not apply cleanly, in which case the frontend
+        needs to send the full metadata again.
+        """
+        prev_metadata_by_id = self._prev_cell_metadata_by_id
+        if (
+            prev_metadata_by_id is None
+            or self._cell_metadata_version is None
+            or request.get("cell_metadata_base_version") != self._cell_metadata_version
+        ):
+            return None
+        delta = request["cell_metadata_delta"]
+        metadata_by_id = dict(prev_metadata_by_id)
+        for cell_id in delta.get("removed", []):
+            metadata_by_id.pop(cell_id, None)
+        changed_content_ids: Set[IdType] = set()
+        for cell_id, metadata in delta.get("changed", {}).items():
+            if "content" in metadata:
+                changed_content_ids.add(cell_id)
+            else:
+                # moved cells are sent without content, so make sure that what
+                # we have is what the frontend thinks we have
+                prev_metadata = metadata_by_id.get(cell_id)
+                if prev_metadata is None or prev_metadata.get(
+                    "content_hash"
+                ) != metadata.get("content_hash"):
+                    return None
+                metadata = dict(metadata, content=prev_metadata["content"])
+            metadata_by_id[cell_id] = metadata
+        self._prev_cell_metadata_by_id = metadata_by_id
+        return changed_content_ids
+
     def handle_notify_content_changed(
         self, request: Dict[str, Any], is_reactively_executing: bool = False
     ) -> Optional[Dict[str, Any]]:
-        cell_metadata_by_id = request.get(
-            "cell_metadata_by_id", self._prev_cell_metadata_by_id
-        )
+        changed_content_ids: Optional[Set[IdType]] = None
+        if "cell_metadata_delta" in request:
+            changed_content_ids = self._apply_cell_metadata_delta(request)
+            if changed_content_ids is None:
+                return {
+                    "success": False,
+                    "error": "cell metadata delta does not apply to version %s"
+                    % self._cell_metadata_version,
+                    "needs_full_resync": True,
+                }
+            self._cell_metadata_version = request.get("cell_metadata_version")
+        elif "cell_metadata_by_id" in request:
+            self._prev_cell_metadata_by_id = request["cell_metadata_by_id"]
+            self._cell_metadata_version = request.get("cell_metadata_version")
+        cell_metadata_by_id = self._prev_cell_metadata_by_id
         if cell_metadata_by_id is None:
             # bail if we don't have this
             return {"success": False, "error": "null value for cell metadata"}
-        self._prev_cell_metadata_by_id = cell_metadata_by_id
         cell_metadata_by_id = {
             cell_id: metadata
             for cell_id, metadata in cell_metadata_by_id.items()
@@ -530,9 +713,20 @@ class NotebookFlow(singletons.NotebookFlow):
             cell_id: metadata["index"]
             for cell_id, metadata in cell_metadata_by_id.items()
         }
+        if (
+            changed_content_ids is None
+            or self._last_content_analysis_cell_counter != self.cell_counter()
+        ):
+            # full syncs and the first sync after an execution re-analyze every
+            # cell, so that static data deps of unedited cells get refreshed
+            cell_ids_to_analyze = set(cell_metadata_by_id.keys())
+        else:
+            cell_ids_to_analyze = (
+                changed_content_ids | self._cell_ids_pending_analysis
+            ) & cell_metadata_by_id.keys()
         content_by_cell_id = {
-            cell_id: metadata["content"]
-            for cell_id, metadata in cell_metadata_by_id.items()
+            cell_id: cell_metadata_by_id[cell_id]["content"]
+            for cell_id in cell_ids_to_analyze
         }
         override_live_refs_by_cell_id = {
             cell_id: metadata["override_live_refs"]
@@ -548,16 +742,10 @@ class NotebookFlow(singletons.NotebookFlow):
         cells().set_override_refs(
             override_live_refs_by_cell_id, override_dead_refs_by_cell_id
         )
-        if is_reactively_executing:
-            should_recompute_exec_schedule = False
-        else:
-            should_recompute_exec_schedule = self._recompute_ast_for_cells(
-                content_by_cell_id
-            )
         placeholder_cells = cells().with_placeholder_ids()
         if len(placeholder_cells) > 0:
             for _, cell_id in sorted(
-                (idx, cell_id) for cell_id, idx in order_index_by_id.items()
+                (order_index_by_id[cell_id], cell_id) for cell_id in content_by_cell_id
             ):
                 if cells().has_id(cell_id):
                     continue
@@ -568,6 +756,23 @@ class NotebookFlow(singletons.NotebookFlow):
                         placeholder_cells.remove(candidate)
                         break
         self._create_untracked_cells_for_content(content_by_cell_id)
+        if is_reactively_executing:
+            self._cell_ids_pending_analysis.update(content_by_cell_id.keys())
+            should_recompute_exec_schedule = False
+        else:
+            should_recompute_exec_schedule = self._recompute_ast_for_cells(
+                content_by_cell_id
+            )
+            self._cell_ids_pending_analysis.clear()
+            self._last_content_analysis_cell_counter = self.cell_counter()
+        if changed_content_ids is not None:
+            delta = request["cell_metadata_delta"]
+            # moved or removed cells can change the schedule without any parsing
+            should_recompute_exec_schedule = (
+                should_recompute_exec_schedule
+                or len(delta.get("changed", {})) > 0
+                or len(delta.get("removed", [])) > 0
+            )
         if should_recompute_exec_schedule:
             return self.handle_compute_exec_schedule(
                 request, notify_content_changed=False
@@ -582,14 +787,16 @@ class NotebookFlow(singletons.NotebookFlow):
         if self._active_cell_id is None:
             self.set_active_cell(request.get("executed_cell_id"))
         if notify_content_changed:
-            self.handle_notify_content_changed(
+            notify_response = self.handle_notify_content_changed(
                 request, is_reactively_executing=is_reactively_executing
             )
+            if notify_response is not None and notify_response.get(
+                "needs_full_resync", False
+            ):
+                return notify_response
         self._add_parents_for_override_live_refs()
         last_cell_id = request.get("executed_cell_id", self.last_executed_cell_id)
-        cell_metadata_by_id = request.get(
-            "cell_metadata_by_id", self._prev_cell_metadata_by_id
-        )
+        cell_metadata_by_id = self._prev_cell_metadata_by_id
         if last_cell_id is None or cell_metadata_by_id is None:
             # bail if we don't have either of these
             null_vals = []
@@ -669,6 +876,9 @@ class NotebookFlow(singletons.NotebookFlow):
             )
         return None
 
+    def handle_get_handler_profile(self, _request=None) -> Dict[str, Any]:
+        return {"profile": self.handler_profiler.to_json()}
+
     def handle_register_dynamic_comm_handler(self, request) -> Optional[Dict[str, Any]]:
         handler_msg_type = request.get("msg_type", None)
         handler_str = request.get("handler", None)
@@ -802,6 +1012,27 @@ class NotebookFlow(singletons.NotebookFlow):
         for alias_set in self.aliases.values():
             yield from alias_set
 
+    def record_updated_symbols(
+        self, symbols: Iterable[DataSymbol], cell_num: Optional[int] = None
+    ) -> None:
+        if cell_num is None:
+            cell_num = self.cell_counter()
+        updated_symbols = self.updated_symbols_by_cell_num.setdefault(cell_num, set())
+        for sym in symbols:
+            updated_symbols.add(sym)
+            # symbols can get indexed under counters that no timestamp of theirs
+            # refers to (e.g. aliases of a refreshed namespace), so remember them
+            if sym._updated_cell_nums is None:
+                sym._updated_cell_nums = set()
+            sym._updated_cell_nums.add(cell_num)
+
+    def symbols_updated_at(self, cell_num: int) -> Set[DataSymbol]:
+        """
+        Returns the symbols that were updated (assigned, mutated, or had some
+        namespace descendent updated) when the cell with counter `cell_num` ran.
+        """
+        return self.updated_symbols_by_cell_num.get(cell_num, set())
+
     def test_and_clear_waiter_usage_detected(self):
         ret = self.waiter_usage_detected
         self.waiter_usage_detected = False
@@ -812,25 +1043,116 @@ class NotebookFlow(singletons.NotebookFlow):
         self.out_of_order_usage_detected_counter = None
         return ret
 
+    def handle_freed_obj_refs(self) -> None:
+        # weakly referenced objects can get freed at arbitrary points, so cleanup of
+        # aliases / namespaces is deferred until it is safe to mutate them
+        while len(self.freed_obj_refs) > 0:
+            owner, obj_id = self.freed_obj_refs.pop()
+            if owner.obj is not None:
+                # some other object was assigned after the freed one
+                continue
+            if isinstance(owner, DataSymbol):
+                cleanup_discard(self.aliases, obj_id, owner)
+                if owner.is_anonymous:
+                    owner.mark_garbage()
+            elif self.namespaces.get(obj_id, None) is owner:
+                del self.namespaces[obj_id]
+
     def gc(self):
+        self.handle_freed_obj_refs()
         # Need to do the garbage marking and the collection separately
         prev_cell = cells().at_counter(self.cell_counter()).prev_cell
         prev_cell_ctr = -1 if prev_cell is None else prev_cell.cell_ctr
         if prev_cell_ctr > 0:
-            for sym in self.all_data_symbols():
-                if sym.defined_cell_num != prev_cell_ctr:
+            # only symbols defined by the previous execution of this cell are candidates
+            for sym in self.symbols_by_defined_cell_num.pop(prev_cell_ctr, ()):
+                if sym.is_garbage or sym not in self.aliases.get(sym.obj_id, ()):
                     continue
                 if sym.is_anonymous or sym.is_new_garbage():
                     sym.mark_garbage()
-        garbage_syms = [sym for sym in self.all_data_symbols() if sym.is_garbage]
+        if self.cell_counter() % _GC_FULL_SWEEP_INTERVAL == 0:
+            # periodically fall back to a full sweep in case anything was
+            # tombstoned without going through mark_garbage()
+            self.garbage_candidate_symbols.update(
+                sym for sym in self.all_data_symbols() if sym.is_garbage
+            )
+            self.garbage_candidate_namespaces.update(
+                ns for ns in self.namespaces.values() if ns.is_garbage
+            )
+        garbage_syms = [sym for sym in self.garbage_candidate_symbols if sym.is_garbage]
+        self.garbage_candidate_symbols.clear()
         for sym in garbage_syms:
             sym.collect_self_garbage()
-        garbage_namespaces = [ns for ns in self.namespaces.values() if ns.is_garbage]
+        if any(sym.is_class for sym in garbage_syms):
+            # cached class lookups may refer to the collected class symbols
+            clear_external_call_resolution_cache()
+        garbage_namespaces = [
+            ns for ns in self.garbage_candidate_namespaces if ns.is_garbage
+        ]
+        self.garbage_candidate_namespaces.clear()
         for ns in garbage_namespaces:
             if ns.size == 0:
                 ns.collect_self_garbage()
             else:
                 ns.unmark_garbage()
+        self._maybe_compact_history()
+
+    def _maybe_compact_history(self) -> None:
+        max_versions_per_cell = self.mut_settings.history_max_versions_per_cell
+        window = self.mut_settings.history_window
+        if max_versions_per_cell is None and window is None:
+            return
+        if self.cell_counter() % max(self.mut_settings.history_compaction_interval, 1):
+            return
+        self.compact_history(
+            max_versions_per_cell=max_versions_per_cell,
+            min_cell_ctr=None if window is None else self.cell_counter() - window + 1,
+        )
+
+    def compact_history(
+        self,
+        max_versions_per_cell: Optional[int] = None,
+        min_cell_ctr: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Compact dependency history from superseded cell executions so that memory
+        stays bounded for long-running kernels; see CodeCell.compact_history.
+        Returns the number of cell executions and statements that were dropped.
+        """
+        dropped_ctrs = cells().compact_history(
+            max_versions_per_cell=max_versions_per_cell, min_cell_ctr=min_cell_ctr
+        )
+        if len(dropped_ctrs) == 0:
+            return 0, 0
+        # only symbols indexed under some dropped counter have history to fold
+        symbols: Set[DataSymbol] = set()
+        for ctr in dropped_ctrs:
+            for sym in self.updated_symbols_by_cell_num.get(ctr, ()):
+                symbols.add(sym)
+                # edges are added when the child updates, but live on both ends
+                symbols.update(sym.parents.keys())
+            for sym, _ in self.dynamic_usages_by_cell_num.pop(ctr, ()):
+                symbols.add(sym)
+            symbols.update(self.static_usages_by_cell_num.pop(ctr, ()))
+        # a symbol's timestamp always has it indexed under that timestamp's counter
+        stmt_ctrs = dropped_ctrs | statements().compacted_cell_nums()
+        pinned_timestamps = set()
+        for ctr in stmt_ctrs:
+            for sym in self.updated_symbols_by_cell_num.get(ctr, ()):
+                pinned_timestamps.add(sym.timestamp)
+                pinned_timestamps.add(sym.timestamp_excluding_ns_descendents)
+        num_stmts_dropped = statements().compact_history(
+            dropped_ctrs, pinned_timestamps
+        )
+        for sym in symbols:
+            sym.compact_history(dropped_ctrs)
+        # keep the updated symbols for counters whose statements are still around
+        # so that they keep pinning them during later compactions
+        for ctr in stmt_ctrs - statements().compacted_cell_nums():
+            for sym in self.updated_symbols_by_cell_num.pop(ctr, ()):
+                if sym._updated_cell_nums is not None:
+                    sym._updated_cell_nums.discard(ctr)
+        return len(dropped_ctrs), num_stmts_dropped
 
     def retrieve_namespace_attr_or_sub(
         self, obj: Any, attr_or_sub: SupportedIndexType, is_subscript: bool
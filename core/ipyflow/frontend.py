@@ -9,6 +9,7 @@ from ipyflow.data_model.code_cell import CheckerResult, CodeCell, cells
 from ipyflow.data_model.data_symbol import DataSymbol
 from ipyflow.singletons import flow
 from ipyflow.types import IdType
+from ipyflow.utils.graph_utils import iter_bits, union_over_reachable
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -78,24 +79,39 @@ class FrontendCheckerResult(NamedTuple):
         }
 
     def _compute_waiter_and_ready_maker_links(self) -> None:
-        waiter_link_changes = True
-        # transitive closure up until we hit non-waiting ready-making cells
-        while waiter_link_changes:
-            waiter_link_changes = False
-            for waiting_cell_id in self.waiting_cells:
-                new_waiter_links = set(self.waiter_links[waiting_cell_id])
-                original_length = len(new_waiter_links)
-                for ready_making_cell_id in self.waiter_links[waiting_cell_id]:
-                    if ready_making_cell_id not in self.waiting_cells:
-                        continue
-                    new_waiter_links |= self.waiter_links[ready_making_cell_id]
-                new_waiter_links.discard(waiting_cell_id)
-                waiter_link_changes = waiter_link_changes or original_length != len(
-                    new_waiter_links
-                )
-                self.waiter_links[waiting_cell_id] = new_waiter_links
-        for waiting_cell_id in self.waiting_cells:
-            self.waiter_links[waiting_cell_id] -= self.waiting_cells
+        # transitive closure up until we hit non-waiting ready-making cells:
+        # waiting cells are graph nodes, and the non-waiting cells they link
+        # to directly are bits that get unioned over everything reachable
+        waiting_cell_ids = list(self.waiting_cells)
+        node_by_waiting_cell_id = {
+            cell_id: node for node, cell_id in enumerate(waiting_cell_ids)
+        }
+        ready_making_cell_ids: List[IdType] = []
+        bit_by_ready_making_cell_id: Dict[IdType, int] = {}
+        successors: List[List[int]] = []
+        direct_bits: List[int] = []
+        for waiting_cell_id in waiting_cell_ids:
+            waiting_successors = []
+            bits = 0
+            for linked_cell_id in self.waiter_links[waiting_cell_id]:
+                node = node_by_waiting_cell_id.get(linked_cell_id, None)
+                if node is not None:
+                    waiting_successors.append(node)
+                    continue
+                bit = bit_by_ready_making_cell_id.get(linked_cell_id, None)
+                if bit is None:
+                    bit = len(ready_making_cell_ids)
+                    bit_by_ready_making_cell_id[linked_cell_id] = bit
+                    ready_making_cell_ids.append(linked_cell_id)
+                bits |= 1 << bit
+            successors.append(waiting_successors)
+            direct_bits.append(bits)
+        for waiting_cell_id, bits in zip(
+            waiting_cell_ids, union_over_reachable(successors, direct_bits)
+        ):
+            self.waiter_links[waiting_cell_id] = {
+                ready_making_cell_ids[bit] for bit in iter_bits(bits)
+            }
             for ready_making_cell_id in self.waiter_links[waiting_cell_id]:
                 self.ready_maker_links[ready_making_cell_id].add(waiting_cell_id)
 
@@ -170,20 +186,21 @@ class FrontendCheckerResult(NamedTuple):
             ExecutionSchedule.HYBRID_DAG_LIVENESS_BASED,
         ):
             return
-        prev_waiting_cells: Set[IdType] = set()
-        while True:
-            for cell in cells_to_check:
-                if cell.cell_id in self.waiting_cells:
-                    continue
-                for _ in flow_.mut_settings.iter_slicing_contexts():
-                    if cell.directional_parents.keys() & (
-                        self.ready_cells | self.waiting_cells
-                    ):
-                        self.waiting_cells.add(cell.cell_id)
-                        continue
-            if prev_waiting_cells == self.waiting_cells:
-                break
-            prev_waiting_cells = set(self.waiting_cells)
+        # everything downstream of a ready or waiting cell is waiting
+        child_cell_ids_by_parent_id: Dict[IdType, List[IdType]] = defaultdict(list)
+        for cell in cells_to_check:
+            if cell.cell_id in self.waiting_cells:
+                continue
+            for _ in flow_.mut_settings.iter_slicing_contexts():
+                for pid in cell.directional_parents.keys():
+                    child_cell_ids_by_parent_id[pid].append(cell.cell_id)
+        worklist = list(self.ready_cells | self.waiting_cells)
+        while len(worklist) > 0:
+            parent_id = worklist.pop()
+            for child_id in child_cell_ids_by_parent_id.pop(parent_id, []):
+                if child_id not in self.waiting_cells:
+                    self.waiting_cells.add(child_id)
+                    worklist.append(child_id)
         self.ready_cells.difference_update(self.waiting_cells)
         self.new_ready_cells.difference_update(self.waiting_cells)
         for cell_id in self.waiting_cells:
@@ -335,17 +352,16 @@ class FrontendCheckerResult(NamedTuple):
         return last_executed_cell.position
 
     def _compute_unsafe_order_usages(self, cells_to_check: List[CodeCell]) -> None:
-        # FIXME: this will be slow for large notebooks; speed it up
-        #  or make it optional
-        cell_by_ctr: Dict[int, CodeCell] = {
-            cell.cell_ctr: cell for cell in cells_to_check
-        }
-        for sym in flow().all_data_symbols():
-            if sym.is_anonymous:
+        flow_ = flow()
+        for cell in cells_to_check:
+            usages = flow_.dynamic_usages_by_cell_num.get(cell.cell_ctr, None)
+            if not usages:
                 continue
-            for used_ts, ts_when_used in sym.timestamp_by_used_time.items():
-                cell = cell_by_ctr.get(used_ts.cell_num, None)
-                if cell is None:
+            for sym, used_ts in sorted(usages, key=lambda usage: usage[1]):
+                if sym.is_anonymous or not sym._timestamp_by_used_time:
+                    continue
+                ts_when_used = sym.timestamp_by_used_time.get(used_ts, None)
+                if ts_when_used is None:
                     continue
                 if cells().at_timestamp(ts_when_used).position <= cell.position:
                     continue
@@ -421,3 +437,72 @@ class FrontendCheckerResult(NamedTuple):
         if flow_.mut_settings.lint_out_of_order_usages:
             self._compute_unsafe_order_usages(cells_to_check)
         return self
+
+
+# cell id lists in checker result json, sent as ids added / removed
+_PATCHED_CELL_ID_KEYS = ("waiting_cells", "ready_cells")
+# maps keyed by cell id in checker result json, sent as changed / removed entries
+_PATCHED_LINK_KEYS = ("unsafe_order_cells", "waiter_links", "ready_maker_links")
+_PATCHED_MAP_KEYS = _PATCHED_LINK_KEYS + ("unsafe_order_symbol_usage",)
+
+
+class ExecScheduleResponsePatcher:
+    """
+    Remembers the last compute_exec_schedule response sent over a comm, so
+    that later responses only need to carry what changed since then. The
+    per-execution fields (new_ready_cells, forced_reactive_cells, and the
+    settings) are always sent as-is.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.prev_response: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _map_entry_changed(key: str, prev_value: Any, value: Any) -> bool:
+        if prev_value is None:
+            return True
+        if key in _PATCHED_LINK_KEYS:
+            # these lists come from sets, so their order is arbitrary
+            return set(prev_value) != set(value)
+        return prev_value != value
+
+    @classmethod
+    def compute_patch(
+        cls, prev_response: Dict[str, Any], response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        patch: Dict[str, Any] = {}
+        for key in _PATCHED_CELL_ID_KEYS:
+            prev_ids = set(prev_response[key])
+            ids = set(response[key])
+            patch[key] = {
+                "added": list(ids - prev_ids),
+                "removed": list(prev_ids - ids),
+            }
+        for key in _PATCHED_MAP_KEYS:
+            prev_map = prev_response[key]
+            cur_map = response[key]
+            patch[key] = {
+                "changed": {
+                    cell_id: value
+                    for cell_id, value in cur_map.items()
+                    if cls._map_entry_changed(key, prev_map.get(cell_id), value)
+                },
+                "removed": [cell_id for cell_id in prev_map if cell_id not in cur_map],
+            }
+        return patch
+
+    def make_response(
+        self, response: Dict[str, Any], full_snapshot: bool = False
+    ) -> Dict[str, Any]:
+        prev_response = self.prev_response
+        self.prev_response = response
+        self.version += 1
+        response = dict(response, exec_schedule_version=self.version)
+        if prev_response is None or full_snapshot:
+            return response
+        response["patch"] = self.compute_patch(prev_response, response)
+        for key in _PATCHED_CELL_ID_KEYS + _PATCHED_MAP_KEYS:
+            del response[key]
+        response["exec_schedule_base_version"] = self.version - 1
+        return response
@@ -20,6 +20,7 @@ import pyccolo as pyc
 from ipykernel.ipkernel import IPythonKernel
 from IPython import get_ipython
 from IPython.core.magic import register_cell_magic
+from IPython.utils.capture import CapturedIO
 from pyccolo.import_hooks import TraceFinder
 
 from ipyflow import singletons
@@ -39,12 +40,27 @@ from ipyflow.utils.ipython_utils import (
     run_cell,
     save_number_of_currently_executing_cell,
 )
+from ipyflow.utils.output_store import StoredCapturedIO, captured_output_store
 from ipyflow.version import __version__
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 
+def _captured_output_size(captured: CapturedIO) -> int:
+    if isinstance(captured, StoredCapturedIO):
+        # avoid paging spilled contents back in just to measure them
+        return captured.total_size()
+    return (
+        sum(
+            sum(len(datum) for datum in output.data.values())
+            for output in captured.outputs
+        )
+        + len(captured.stdout)
+        + len(captured.stderr)
+    )
+
+
 class PyccoloKernelSettings(NamedTuple):
     store_history: bool
 
@@ -610,16 +626,9 @@ class IPyflowKernelBase(singletons.IPyflowKernel, PyccoloKernelMixin):
             prev_cell.captured_output.show()
         if prev_cell is not None:
             captured = prev_cell.captured_output
-            if captured is not None and (
-                sum(
-                    sum(len(datum) for datum in output.data.values())
-                    for output in captured.outputs
-                )
-                + len(captured.stdout)
-                + len(captured.stderr)
-                > 256
-            ):
+            if captured is not None and _captured_output_size(captured) > 256:
                 # don't save potentially large outputs for previous versions
+                captured_output_store().discard(captured)
                 prev_cell.captured_output = None
         cell.captured_output = self.tee_output_tracer.capture_output
 
@@ -630,12 +639,12 @@ class IPyflowKernelBase(singletons.IPyflowKernel, PyccoloKernelMixin):
         flow_ = singletons.flow()
         if not flow_.mut_settings.dataflow_enabled:
             return
+        cell_num = CodeCell.exec_counter()
         flow_._resync_symbols(
             [
-                # TODO: avoid bad performance by only iterating over symbols updated in this cell
                 sym
-                for sym in flow_.all_data_symbols()
-                if sym.timestamp.cell_num == CodeCell.exec_counter()
+                for sym in flow_.symbols_updated_at(cell_num)
+                if sym.timestamp.cell_num == cell_num
             ]
         )
         flow_._add_applicable_prev_cell_parents_to_current()
@@ -13,6 +13,7 @@ import pyccolo as pyc
 from IPython import get_ipython
 from IPython.core.magic import register_line_magic
 
+from ipyflow import singletons
 from ipyflow.analysis.symbol_ref import SymbolRef
 from ipyflow.annotations.compiler import (
     register_annotations_directory,
@@ -21,6 +22,11 @@ from ipyflow.annotations.compiler import (
 from ipyflow.config import ExecutionMode, ExecutionSchedule, FlowDirection, Highlights
 from ipyflow.data_model.code_cell import cells
 from ipyflow.data_model.data_symbol import DataSymbol
+from ipyflow.data_model.utils.memory_utils import (
+    DEFAULT_SAMPLE_SIZE,
+    DEFAULT_TOP_K,
+    MemoryReport,
+)
 from ipyflow.experimental.dag import create_dag_metadata
 from ipyflow.singletons import flow, kernel
 from ipyflow.slicing.mixin import SlicingMixin, format_slice
@@ -59,6 +65,19 @@ show_tags:
     
 register_annotations <directory_or_file>:
     - This will register the annotations in the given directory or file.
+
+profile [on|off|show [<cell_num>]|clear]:
+    - This will toggle per-handler timers for the dataflow tracer, or display
+      the time spent in each handler (overall or for the given cell).
+
+memory [--sample-size <n>] [--top <k>]:
+    - This will estimate how much memory ipyflow's own bookkeeping retains
+      (excluding user data), along with the symbols and cells retaining the most.
+
+compact [--per-cell <n>] [--window <n>] [--auto|--no-auto]:
+    - This will compact dependency history from older executions of each cell,
+      keeping the last <n> executions per cell and / or those from the last <n>
+      cell counters. With --auto, these limits are also applied periodically.
 """.strip()
 
 
@@ -133,6 +152,12 @@ def make_line_magic(flow_: "NotebookFlow"):
             return None
         elif cmd.startswith("register_annotation"):
             return register_annotations(line)
+        elif cmd in ("profile", "profile_handlers"):
+            return profile_handlers(line)
+        elif cmd in ("compact", "compact_history"):
+            return compact_history(line)
+        elif cmd in ("memory", "memory_usage"):
+            return memory_usage(line)
         elif cmd == "toggle_reactivity_until_next_reset":
             return toggle_reactivity_until_next_reset()
         elif cmd in line_magic_names:
@@ -520,5 +545,84 @@ def register_annotations(line_: str) -> None:
     print_("Registered annotations for modules:", modules)
 
 
+def profile_handlers(line_: str) -> Optional[str]:
+    usage = "Usage: %flow profile [on|off|show [<cell_num>]|clear]"
+    line = line_.split()
+    profiler = flow().handler_profiler
+    if len(line) == 0:
+        warn(usage)
+        return None
+    setting = line[0].lower()
+    if setting == "on" or setting.startswith("enable"):
+        profiler.enable(singletons.tracer())
+    elif setting == "off" or setting.startswith("disable"):
+        profiler.disable()
+    elif setting in ("clear", "reset"):
+        profiler.clear()
+    elif setting == "show":
+        if len(line) == 1:
+            return profiler.format_report()
+        try:
+            return profiler.format_report(int(line[1]))
+        except ValueError:
+            warn(usage)
+    else:
+        warn(usage)
+    return None
+
+
+_COMPACT_PARSER = argparse.ArgumentParser("compact")
+_COMPACT_PARSER.add_argument("--per-cell", type=int, default=None)
+_COMPACT_PARSER.add_argument("--window", type=int, default=None)
+_COMPACT_PARSER.add_argument("--auto", action="store_true")
+_COMPACT_PARSER.add_argument("--no-auto", action="store_true")
+
+
+def compact_history(line: str) -> Optional[str]:
+    usage = "Usage: %flow compact [--per-cell <n>] [--window <n>] [--auto|--no-auto]"
+    try:
+        args = _COMPACT_PARSER.parse_args(shlex.split(line))
+    except SystemExit:
+        warn(usage)
+        return None
+    flow_ = flow()
+    settings = flow_.mut_settings
+    if args.no_auto:
+        settings.history_max_versions_per_cell = None
+        settings.history_window = None
+        return None
+    per_cell, window = args.per_cell, args.window
+    if per_cell is None and window is None:
+        per_cell = settings.history_max_versions_per_cell
+        window = settings.history_window
+    if per_cell is None and window is None:
+        per_cell = 1
+    if args.auto:
+        settings.history_max_versions_per_cell = per_cell
+        settings.history_window = window
+    num_cells, num_stmts = flow_.compact_history(
+        max_versions_per_cell=per_cell,
+        min_cell_ctr=None if window is None else flow_.cell_counter() - window + 1,
+    )
+    return f"Compacted {num_cells} cell executions and {num_stmts} statements"
+
+
+_MEMORY_PARSER = argparse.ArgumentParser("memory")
+_MEMORY_PARSER.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE)
+_MEMORY_PARSER.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+
+
+def memory_usage(line: str) -> Optional[str]:
+    usage = "Usage: %flow memory [--sample-size <n>] [--top <k>]"
+    try:
+        args = _MEMORY_PARSER.parse_args(shlex.split(line))
+    except SystemExit:
+        warn(usage)
+        return None
+    return MemoryReport.compute(
+        sample_size=args.sample_size, top_k=args.top
+    ).format_report()
+
+
 def toggle_reactivity_until_next_reset():
     flow().toggle_reactivity()
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import ast
 import logging
+import weakref
 from types import ModuleType
-from typing import Any, Optional
+from typing import Any, Dict, MutableMapping, Optional, Tuple, Type
 
 # force handler registration by exec()ing the handler modules here
 import ipyflow.tracing.external_calls.base_handlers
@@ -17,6 +18,45 @@ from ipyflow.tracing.external_calls.base_handlers import (
     StandardMutation,
 )
 
+_MethodHandlerType = Tuple[Optional[Type[ExternalCallHandler]], Optional[type]]
+
+# keyed weakly by class so that entries neither keep classes alive nor get
+# served to some later class that happens to reuse the id of a collected one
+_is_notebook_class_cache: MutableMapping[type, bool] = weakref.WeakKeyDictionary()
+_method_handler_type_cache: MutableMapping[
+    type, Dict[str, _MethodHandlerType]
+] = weakref.WeakKeyDictionary()
+
+
+def _is_notebook_class(clazz: type) -> bool:
+    try:
+        return _is_notebook_class_cache[clazz]
+    except KeyError:
+        ret = any(sym.is_class for sym in flow().aliases.get(id(clazz), []))
+        _is_notebook_class_cache[clazz] = ret
+        return ret
+
+
+def _resolve_method_handler_type(clazz: type, method: str) -> _MethodHandlerType:
+    handler_type_by_method = _method_handler_type_cache.setdefault(clazz, {})
+    if method in handler_type_by_method:
+        return handler_type_by_method[method]
+    ret: _MethodHandlerType = (None, None)
+    for cls in clazz.mro():
+        external_call_type = REGISTERED_HANDLER_BY_METHOD.get((cls, method))
+        if external_call_type is not None:
+            ret = external_call_type, cls
+            break
+    handler_type_by_method[method] = ret
+    return ret
+
+
+def clear_external_call_resolution_cache() -> None:
+    # needs to be called whenever new handlers get registered or
+    # whenever a class gets (re)defined or collected in the notebook
+    _is_notebook_class_cache.clear()
+    _method_handler_type_cache.clear()
+
 
 def resolve_external_call(
     module: Optional[ModuleType],
@@ -46,9 +86,7 @@ def resolve_external_call(
         return None
     if caller_self is logging or isinstance(caller_self, logging.Logger):
         return None
-    elif caller_self is not None and any(
-        sym.is_class for sym in flow().aliases.get(id(type(caller_self)), [])
-    ):
+    elif caller_self is not None and _is_notebook_class(type(caller_self)):
         return None
     # TODO: handle case where it's a function defined in-notebook
     elif caller_self is None:
@@ -64,11 +102,11 @@ def resolve_external_call(
         and caller_self is not None
         and not isinstance(caller_self, type)
     ):
-        for cls in caller_self.__class__.mro():
-            external_call_type = REGISTERED_HANDLER_BY_METHOD.get((cls, method))
-            if external_call_type is not None:
-                module = getattr(cls, "__module__", module)
-                break
+        external_call_type, cls = _resolve_method_handler_type(
+            caller_self.__class__, method
+        )
+        if cls is not None:
+            module = getattr(cls, "__module__", module)
     if external_call_type is None:
         if use_standard_default:
             external_call_type = StandardMutation
@@ -2,7 +2,7 @@
 import ast
 import logging
 import traceback
-from typing import cast
+from typing import List, Optional, Set, Union, cast
 
 from pyccolo import AstRewriter
 
@@ -13,6 +13,11 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 
+# literals with at least this many constants in them are not
+# given per-element symbols until some element is stored to or mutated
+MIN_CONSTANT_LITERAL_SIZE = 64
+
+
 class DataflowAstRewriter(AstRewriter):
     def visit(self, node: ast.AST):
         try:
@@ -25,3 +30,58 @@ class DataflowAstRewriter(AstRewriter):
             flow().get_and_set_exception_raised_during_execution(e)
             traceback.print_exc()
             raise e
+
+
+class ConstantLiteralFinder(ast.NodeVisitor):
+    """
+    Collects the ids of (maximal) list, tuple, and dict literals made up
+    entirely of constants, along with the ids of every node inside them.
+    """
+
+    def __init__(self, min_size: int = MIN_CONSTANT_LITERAL_SIZE) -> None:
+        self.min_size = min_size
+        self.constant_literal_node_ids: Set[int] = set()
+
+    def __call__(self, node: ast.AST) -> Set[int]:
+        self.visit(node)
+        return self.constant_literal_node_ids
+
+    def _mark_if_large_literal(self, node: ast.AST, size: Optional[int]) -> None:
+        if (
+            size is not None
+            and size >= self.min_size
+            and isinstance(node, (ast.Dict, ast.List, ast.Tuple))
+        ):
+            self.constant_literal_node_ids.update(id(inner) for inner in ast.walk(node))
+
+    def generic_visit(self, node: ast.AST) -> Optional[int]:
+        for child in ast.iter_child_nodes(node):
+            self._mark_if_large_literal(child, self.visit(child))
+        return None
+
+    def visit_Constant(self, node: ast.Constant) -> Optional[int]:
+        return 1
+
+    def visit_literal(
+        self,
+        node: Union[ast.Dict, ast.List, ast.Tuple],
+        elts: List[Optional[ast.expr]],
+    ) -> Optional[int]:
+        sizes = [None if elt is None else self.visit(elt) for elt in elts]
+        if isinstance(getattr(node, "ctx", ast.Load()), ast.Load) and all(
+            size is not None for size in sizes
+        ):
+            return sum(cast(int, size) for size in sizes)
+        for elt, size in zip(elts, sizes):
+            if elt is not None:
+                self._mark_if_large_literal(elt, size)
+        return None
+
+    def visit_Dict(self, node: ast.Dict) -> Optional[int]:
+        return self.visit_literal(node, list(node.keys) + list(node.values))
+
+    def visit_List(self, node: ast.List) -> Optional[int]:
+        return self.visit_literal(node, list(node.elts))
+
+    def visit_Tuple(self, node: ast.Tuple) -> Optional[int]:
+        return self.visit_literal(node, list(node.elts))
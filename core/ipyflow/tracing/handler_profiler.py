@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import functools
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, List, Optional
+
+import pyccolo as pyc
+from pyccolo.handler import HandlerSpec
+
+from ipyflow.data_model.code_cell import cells
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class HandlerStats:
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "seconds": self.seconds}
+
+
+class HandlerProfiler:
+    """
+    Wraps the handlers registered on a tracer with timers and call counters,
+    aggregated per cell counter and per handler name.
+    """
+
+    def __init__(self) -> None:
+        self._tracer: Optional[pyc.BaseTracer] = None
+        self._original_handlers: Dict[pyc.TraceEvent, List[HandlerSpec]] = {}
+        self.stats_by_cell: DefaultDict[
+            int, DefaultDict[str, HandlerStats]
+        ] = defaultdict(lambda: defaultdict(HandlerStats))
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._tracer is not None
+
+    def _make_timed_handler(self, handler: Callable[..., Any]) -> Callable[..., Any]:
+        name = handler.__name__
+        stats_by_cell = self.stats_by_cell
+
+        @functools.wraps(handler)
+        def timed_handler(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                stats = stats_by_cell[cells().exec_counter()][name]
+                stats.seconds += time.perf_counter() - start
+                stats.calls += 1
+
+        return timed_handler
+
+    def enable(self, tracer: pyc.BaseTracer) -> None:
+        if self._tracer is tracer:
+            return
+        self.disable()
+        self._tracer = tracer
+        timed_handlers: Dict[Callable[..., Any], Callable[..., Any]] = {}
+        for evt, specs in tracer._event_handlers.items():
+            self._original_handlers[evt] = specs
+            wrapped_specs = []
+            for spec in specs:
+                timed = timed_handlers.get(spec.handler)
+                if timed is None:
+                    timed = self._make_timed_handler(spec.handler)
+                    timed_handlers[spec.handler] = timed
+                wrapped_specs.append(spec._replace(handler=timed))
+            tracer._event_handlers[evt] = wrapped_specs
+
+    def disable(self) -> None:
+        if self._tracer is None:
+            return
+        self._tracer._event_handlers.update(self._original_handlers)
+        self._original_handlers.clear()
+        self._tracer = None
+
+    def clear(self) -> None:
+        self.stats_by_cell.clear()
+
+    def totals(self, cell_num: Optional[int] = None) -> Dict[str, HandlerStats]:
+        if cell_num is not None:
+            return dict(self.stats_by_cell.get(cell_num, {}))
+        totals: DefaultDict[str, HandlerStats] = defaultdict(HandlerStats)
+        for stats_by_handler in self.stats_by_cell.values():
+            for name, stats in stats_by_handler.items():
+                totals[name].calls += stats.calls
+                totals[name].seconds += stats.seconds
+        return dict(totals)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.is_enabled,
+            "cells": {
+                str(cell_num): {
+                    name: stats.to_json() for name, stats in stats_by_handler.items()
+                }
+                for cell_num, stats_by_handler in self.stats_by_cell.items()
+            },
+            "totals": {name: stats.to_json() for name, stats in self.totals().items()},
+        }
+
+    def format_report(self, cell_num: Optional[int] = None) -> str:
+        totals = self.totals(cell_num)
+        if len(totals) == 0:
+            return "No handler profiling data collected yet."
+        name_width = max(len("handler"), max(len(name) for name in totals))
+        lines = [
+            f"{'handler':<{name_width}}  {'calls':>10}  {'total ms':>10}  {'us/call':>10}"
+        ]
+        for name, stats in sorted(
+            totals.items(), key=lambda item: item[1].seconds, reverse=True
+        ):
+            lines.append(
+                f"{name:<{name_width}}  {stats.calls:>10}  "
+                f"{stats.seconds * 1e3:>10.2f}  "
+                f"{stats.seconds * 1e6 / max(stats.calls, 1):>10.2f}"
+            )
+        return "\n".join(lines)
@@ -11,7 +11,10 @@ from typing import (
     Any,
     Callable,
     Dict,
+    FrozenSet,
     Generator,
+    Hashable,
+    Iterable,
     List,
     Optional,
     Set,
@@ -45,7 +48,10 @@ from ipyflow.data_model.timestamp import Timestamp
 from ipyflow.singletons import SingletonBaseTracer, flow
 from ipyflow.tracing.external_calls import resolve_external_call
 from ipyflow.tracing.external_calls.base_handlers import ExternalCallHandler
-from ipyflow.tracing.flow_ast_rewriter import DataflowAstRewriter
+from ipyflow.tracing.flow_ast_rewriter import (
+    ConstantLiteralFinder,
+    DataflowAstRewriter,
+)
 from ipyflow.tracing.symbol_resolver import resolve_rval_symbols
 from ipyflow.tracing.utils import match_container_obj_or_namespace_with_literal_nodes
 from ipyflow.types import SupportedIndexType
@@ -63,12 +69,33 @@ ObjId = int
 SavedStoreData = Tuple[Namespace, Any, AttrSubVal, bool]
 SavedDelData = Tuple[Namespace, Any, AttrSubVal, bool]
 SavedComplexSymbolLoadData = Tuple[Namespace, Any, AttrSubVal, bool, Optional[str]]
+LoopIterSignature = FrozenSet[Tuple[Hashable, FrozenSet[Hashable]]]
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 
 
+def _loop_iter_symbol_shape(sym: DataSymbol) -> Hashable:
+    # subscript and anonymous symbols are usually new objects in every
+    # iteration (e.g. for lst[i] = ...), so compare them by where they live
+    if sym.is_subscript:
+        return sym.containing_scope, sym.symbol_type
+    if sym.is_anonymous:
+        return sym.symbol_type
+    return sym
+
+
+def _make_loop_iter_signature(symbols: Iterable[DataSymbol]) -> LoopIterSignature:
+    return frozenset(
+        (
+            _loop_iter_symbol_shape(sym),
+            frozenset(_loop_iter_symbol_shape(par) for par in sym.parents.keys()),
+        )
+        for sym in symbols
+    )
+
+
 reactive_spec = pyc.AugmentationSpec(
     aug_type=pyc.AugmentationType.prefix, token="$", replacement=""
 )
@@ -97,6 +124,11 @@ class StackFrameManager(SingletonBaseTracer):
         super().__init__(*args, **kwargs)
         self.call_depth = 0
         self.external_call_depth = 0
+        # number of cell frames entered (while tracing was enabled) and
+        # the outermost one, so that deciding whether to reenable tracing
+        # does not require walking the stack
+        self.cell_frame_depth = 0
+        self.top_level_cell_frame: Optional[FrameType] = None
 
     @pyc.register_raw_handler((pyc.call, pyc.return_))
     def handle_first_ipython_frame(
@@ -112,18 +144,23 @@ class StackFrameManager(SingletonBaseTracer):
             return pyc.SkipAll
         # IPython quirk -- every line in outer scope apparently wrapped in lambda
         # We want to skip the outer 'call' and 'return' for these
+        is_cell_file = flow().is_cell_file(frame.f_code.co_filename)
         if event == pyc.call:
             self.call_depth += 1
-            self.external_call_depth += not flow().is_cell_file(
-                frame.f_code.co_filename
-            )
+            self.external_call_depth += not is_cell_file
+            if is_cell_file:
+                self.cell_frame_depth += 1
+                if self.cell_frame_depth == 1:
+                    self.top_level_cell_frame = frame
             if self.call_depth == 1:
                 return pyc.SkipAll
         elif event == pyc.return_:
             self.call_depth -= 1
-            self.external_call_depth -= not flow().is_cell_file(
-                frame.f_code.co_filename
-            )
+            self.external_call_depth -= not is_cell_file
+            if is_cell_file:
+                self.cell_frame_depth -= 1
+                if frame is self.top_level_cell_frame:
+                    self.top_level_cell_frame = None
             if flow().is_dev_mode:
                 assert self.call_depth >= 0
             if self.call_depth == 0:
@@ -155,6 +192,9 @@ class DataflowTracer(StackFrameManager):
             self.blocking_node_ids: Set[int] = self.augmented_node_ids_by_spec[
                 blocking_spec
             ]
+        # only for modules instrumented since the last reset; literals in code
+        # from earlier cells just get traced like any other literal
+        self.constant_literal_node_ids: Set[NodeId] = set()
         self.tracing_disabled_since_last_module_stmt = False
         self._module_stmt_counter = 0
         self._saved_stmt_ret_expr: Optional[Any] = None
@@ -163,6 +203,17 @@ class DataflowTracer(StackFrameManager):
         self.prev_event: Optional[pyc.TraceEvent] = None
         self.prev_trace_stmt: Optional[Statement] = None
         self.traced_statements: Dict[NodeId, Statement] = {}
+        self.loop_iter_marks: Dict[NodeId, int] = {}
+        self.loop_iter_signatures: Dict[NodeId, Tuple[LoopIterSignature, int]] = {}
+        self.loop_iter_updated_symbols: List[DataSymbol] = []
+        self.loop_stmt_id_by_guard: Dict[str, NodeId] = {}
+        self.loop_body_stmt_ids: Dict[NodeId, Set[NodeId]] = {}
+        self.active_loops: List[Tuple[NodeId, FrameType]] = []
+        self.summarized_loop_symbols: Dict[NodeId, Set[DataSymbol]] = {}
+        # (comprehension id, frame id, event) -> (usage mark, signature, repeats)
+        self.comprehension_iter_state: Dict[
+            Tuple[NodeId, int, pyc.TraceEvent], Tuple[int, LoopIterSignature, int]
+        ] = {}
         self.node_id_to_loaded_symbols: Dict[NodeId, List[DataSymbol]] = {}
         self.node_id_to_saved_store_data: Dict[NodeId, SavedStoreData] = {}
         self.node_id_to_saved_live_subscript_refs: Dict[NodeId, Set[DataSymbol]] = {}
@@ -209,6 +260,9 @@ class DataflowTracer(StackFrameManager):
                     # `None` means use 'cur_frame_original_scope'
                     self.active_literal_scope: Optional[Namespace] = None
 
+    def static_init_module(self, node: ast.Module) -> None:
+        self.constant_literal_node_ids |= ConstantLiteralFinder()(node)
+
     def init_symtab(self) -> None:
         try:
             self.cur_cell_symtab = symtable.symtable(
@@ -277,6 +331,11 @@ class DataflowTracer(StackFrameManager):
         self.prev_node_id_in_cur_frame = None
         self.saved_assign_rhs_obj = None
         flow().updated_symbols |= self.this_stmt_updated_symbols
+        flow().record_updated_symbols(self.this_stmt_updated_symbols)
+        if len(flow().freed_obj_refs) > 0:
+            flow().handle_freed_obj_refs()
+        if len(self.loop_iter_marks) > 0:
+            self.loop_iter_updated_symbols.extend(self.this_stmt_updated_symbols)
         self.this_stmt_updated_symbols.clear()
         self._seen_functions_ids.clear()
         self.is_external_call_pending_return = False
@@ -291,6 +350,16 @@ class DataflowTracer(StackFrameManager):
     def finish_cell_hook(self) -> None:
         for stmt in self.traced_statements.values():
             stmt.mark_finished()
+        self._reset_loop_state()
+
+    def _reset_loop_state(self) -> None:
+        self.loop_iter_marks.clear()
+        self.loop_iter_signatures.clear()
+        self.loop_iter_updated_symbols.clear()
+        self.loop_stmt_id_by_guard.clear()
+        self.active_loops.clear()
+        self.summarized_loop_symbols.clear()
+        self.comprehension_iter_state.clear()
 
     def _handle_call_transition(self, trace_stmt: Statement):
         if (
@@ -558,6 +627,17 @@ class DataflowTracer(StackFrameManager):
         else:
             return []
 
+    def resolve_literal_elt_symbols(self, node: ast.AST) -> Set[DataSymbol]:
+        if isinstance(node, (ast.Dict, ast.List, ast.Tuple)):
+            # nested literals load their own symbol once they are done, so
+            # enclosing literals do not need to resolve their elements again
+            resolved = self.resolve_loaded_symbols(node)
+            if len(resolved) > 0:
+                return set(resolved)
+        if isinstance(node, ast.Constant) or id(node) in self.constant_literal_node_ids:
+            return set()
+        return resolve_rval_symbols(node)
+
     def resolve_symbols(
         self, symbol_refs: Set[Union[str, int, DataSymbol]]
     ) -> Set[DataSymbol]:
@@ -751,8 +831,174 @@ class DataflowTracer(StackFrameManager):
             pyc.after_dict_comprehension_value,
         )
     )
-    def after_loop_iter(self, *_, guard: str, **__):
-        self.activate_guard(guard)
+    def after_loop_iter(
+        self,
+        _obj: Any,
+        loop_id: NodeId,
+        frame: FrameType,
+        event: pyc.TraceEvent,
+        *_,
+        guard: str,
+        **__,
+    ):
+        threshold = flow().mut_settings.loop_summarization_threshold
+        if threshold <= 1 or not self.is_tracing_enabled:
+            self.activate_guard(guard)
+            return
+        loop_stmt_id = None
+        if event in (pyc.after_for_loop_iter, pyc.after_while_loop_iter):
+            loop_stmt_id = self._get_loop_stmt_id(guard, frame)
+        if loop_stmt_id is None or loop_stmt_id not in self.loop_iter_marks:
+            self._after_comprehension_iter(loop_id, frame, event, guard, threshold)
+            return
+        log_start = self.loop_iter_marks[loop_stmt_id]
+        updated_symbols = set(self.loop_iter_updated_symbols[log_start:])
+        signature = _make_loop_iter_signature(updated_symbols)
+        prev_signature, num_repeats = self.loop_iter_signatures.get(
+            loop_stmt_id, (None, 0)
+        )
+        num_repeats = num_repeats + 1 if signature == prev_signature else 1
+        if num_repeats >= threshold:
+            # dataflow has stabilized; run the rest of the loop untraced
+            # and apply the summarized update once the loop exits
+            self.activate_guard(guard)
+            self.loop_iter_signatures.pop(loop_stmt_id, None)
+            self.summarized_loop_symbols[loop_stmt_id] = updated_symbols
+            return
+        self.loop_iter_signatures[loop_stmt_id] = (signature, num_repeats)
+        self._trim_loop_iter_updated_symbols(loop_stmt_id, log_start)
+        self.loop_iter_marks[loop_stmt_id] = len(self.loop_iter_updated_symbols)
+        # statements traced during this iteration get traced again during the next,
+        # as do nested loops that got summarized during this iteration
+        body_stmt_ids = self._get_loop_body_stmt_ids(loop_stmt_id)
+        for stmt_id in body_stmt_ids:
+            trace_stmt = self.traced_statements.get(stmt_id)
+            if (
+                stmt_id != loop_stmt_id
+                and trace_stmt is not None
+                and trace_stmt.finished
+            ):
+                trace_stmt.mark_unfinished(frame)
+        for nested_guard, stmt_id in self.loop_stmt_id_by_guard.items():
+            if stmt_id != loop_stmt_id and stmt_id in body_stmt_ids:
+                self.deactivate_guard(nested_guard)
+
+    def _trim_loop_iter_updated_symbols(
+        self, loop_stmt_id: NodeId, log_start: int
+    ) -> None:
+        if any(
+            mark <= log_start
+            for stmt_id, mark in self.loop_iter_marks.items()
+            if stmt_id != loop_stmt_id
+        ):
+            # enclosing loops still need the symbols for their own iteration,
+            # but each only once
+            self.loop_iter_updated_symbols[log_start:] = list(
+                dict.fromkeys(self.loop_iter_updated_symbols[log_start:])
+            )
+        else:
+            del self.loop_iter_updated_symbols[log_start:]
+
+    def _after_comprehension_iter(
+        self,
+        loop_id: NodeId,
+        frame: FrameType,
+        event: pyc.TraceEvent,
+        guard: str,
+        threshold: int,
+    ) -> None:
+        # comprehension targets are only bound once the statement finishes, so
+        # compare the symbols loaded by each iteration instead; state is kept
+        # per frame and per event so that different executions (and the key /
+        # value parts of dict comprehensions) don't get mixed up
+        key = (loop_id, id(frame), event)
+        loaded_symbols = list(self.pending_usage_updates_by_sym.keys())
+        mark, prev_signature, num_repeats = self.comprehension_iter_state.get(
+            key, (len(loaded_symbols), None, 0)
+        )
+        if mark > len(loaded_symbols):
+            # pending usages got flushed by a statement in a called function
+            mark = 0
+        signature = _make_loop_iter_signature(loaded_symbols[mark:])
+        num_repeats = num_repeats + 1 if signature == prev_signature else 1
+        if num_repeats >= threshold:
+            self.comprehension_iter_state.pop(key, None)
+            self.activate_guard(guard)
+        else:
+            self.comprehension_iter_state[key] = (
+                len(loaded_symbols),
+                signature,
+                num_repeats,
+            )
+
+    def _get_loop_stmt_id(self, guard: str, frame: FrameType) -> Optional[NodeId]:
+        loop_stmt_id = self.loop_stmt_id_by_guard.get(guard)
+        if loop_stmt_id is not None:
+            return loop_stmt_id
+        for stmt_id, loop_frame in reversed(self.active_loops):
+            if loop_frame is frame:
+                self.loop_stmt_id_by_guard[guard] = stmt_id
+                return stmt_id
+        return None
+
+    def _exit_loops_left_abnormally(
+        self, frame: FrameType, stmt_id: Optional[NodeId] = None
+    ) -> None:
+        # loops exited via an exception or a return never get their after_stmt;
+        # catch them when their frame returns or runs a stmt outside their body
+        while len(self.active_loops) > 0:
+            loop_stmt_id, loop_frame = self.active_loops[-1]
+            if loop_frame is not frame:
+                break
+            if stmt_id is not None and stmt_id in self._get_loop_body_stmt_ids(
+                loop_stmt_id
+            ):
+                break
+            self._handle_loop_exit(loop_stmt_id, frame)
+
+    def _get_loop_body_stmt_ids(self, loop_stmt_id: NodeId) -> Set[NodeId]:
+        stmt_ids = self.loop_body_stmt_ids.get(loop_stmt_id)
+        if stmt_ids is None:
+            stmt_ids = set()
+            to_visit = [self.ast_node_by_id[loop_stmt_id]]
+            while len(to_visit) > 0:
+                node = to_visit.pop()
+                if isinstance(node, ast.stmt):
+                    stmt_ids.add(id(node))
+                if isinstance(
+                    node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+                ):
+                    # these bodies run in frames of their own
+                    continue
+                to_visit.extend(ast.iter_child_nodes(node))
+            self.loop_body_stmt_ids[loop_stmt_id] = stmt_ids
+        return stmt_ids
+
+    def _handle_loop_exit(self, loop_stmt_id: NodeId, frame: FrameType) -> None:
+        for idx in range(len(self.active_loops) - 1, -1, -1):
+            if self.active_loops[idx][0] == loop_stmt_id:
+                del self.active_loops[idx]
+                break
+        self.loop_iter_marks.pop(loop_stmt_id, None)
+        self.loop_iter_signatures.pop(loop_stmt_id, None)
+        if len(self.loop_iter_marks) == 0:
+            self.loop_iter_updated_symbols.clear()
+        summarized_symbols = self.summarized_loop_symbols.pop(loop_stmt_id, None)
+        if summarized_symbols is None:
+            return
+        # the untraced iterations had the same dataflow as the last traced one,
+        # so we only need to point the summarized symbols at their final values
+        global_symbols = []
+        for sym in summarized_symbols:
+            if sym.is_anonymous or sym.containing_namespace is not None:
+                continue
+            if sym.containing_scope.is_global:
+                global_symbols.append(sym)
+                continue
+            obj = frame.f_locals.get(cast(str, sym.name), sym.obj)
+            if obj is not sym.obj:
+                sym.update_obj_ref(obj)
+        flow()._resync_symbols(global_symbols)
 
     # @pyc.register_raw_handler(pyc.after_function_execution)
     # def after_function_exec(self, _obj: Any, _loop_id: NodeId, *_, guard: str, **__):
@@ -1114,6 +1360,8 @@ class DataflowTracer(StackFrameManager):
                 # if tracing gets reenabled here instead of at the 'before_stmt' handler, then we're still
                 # at the same module stmt as when tracing was disabled, and we still have a 'return' to trace
                 self.call_depth = 1
+                self.cell_frame_depth = 1
+                self.top_level_cell_frame = frame
                 self.call_stack.clear()
                 self.lexical_call_stack.clear()
 
@@ -1134,13 +1382,19 @@ class DataflowTracer(StackFrameManager):
         if not self.is_tracing_enabled:
             self._enable_tracing()
 
+    def is_traced_literal_node(self, node_id: NodeId) -> bool:
+        # large constant literals just get one symbol for the whole literal;
+        # symbols for their elements are only created once they are used
+        return node_id not in self.constant_literal_node_ids
+
     # Note: we don't trace set literals
     @pyc.register_raw_handler(
         (
             pyc.before_dict_literal,
             pyc.before_list_literal,
             pyc.before_tuple_literal,
-        )
+        ),
+        when=pyc.Predicate(is_traced_literal_node, static=True),
     )
     @pyc.skip_when_tracing_disabled
     def before_literal(self, *_, **__):
@@ -1155,7 +1409,8 @@ class DataflowTracer(StackFrameManager):
             pyc.after_dict_literal,
             pyc.after_list_literal,
             pyc.after_tuple_literal,
-        )
+        ),
+        when=pyc.Predicate(is_traced_literal_node, static=True),
     )
     @pyc.skip_when_tracing_disabled
     def after_literal(
@@ -1173,7 +1428,6 @@ class DataflowTracer(StackFrameManager):
             ) in match_container_obj_or_namespace_with_literal_nodes(
                 literal, self.ast_node_by_id[node_id]  # type: ignore
             ):
-                # TODO: memoize symbol resolution; otherwise this will be quadratic for deeply nested literals
                 if isinstance(inner_val_node, ast.Starred):
                     inner_symbols = set()
                     starred_idx += 1
@@ -1190,9 +1444,11 @@ class DataflowTracer(StackFrameManager):
                         )
                         inner_symbols.add(starred_dep)
                 else:
-                    inner_symbols = resolve_rval_symbols(inner_val_node)
+                    inner_symbols = self.resolve_literal_elt_symbols(inner_val_node)
                     if inner_key_node is not None:
-                        outer_deps.update(resolve_rval_symbols(inner_key_node))
+                        outer_deps.update(
+                            self.resolve_literal_elt_symbols(inner_key_node)
+                        )
                 self.node_id_to_loaded_symbols.pop(id(inner_val_node), None)
                 inner_symbols.discard(None)
                 if isinstance(
@@ -1229,13 +1485,17 @@ class DataflowTracer(StackFrameManager):
         finally:
             self.lexical_literal_stack.pop()
 
-    @pyc.register_raw_handler(pyc.dict_key)
+    @pyc.register_raw_handler(
+        pyc.dict_key, when=pyc.Predicate(is_traced_literal_node, static=True)
+    )
     @pyc.skip_when_tracing_disabled
     def dict_key(self, obj: Any, key_node_id: NodeId, *_, **__):
         self.node_id_to_saved_dict_key[key_node_id] = obj
         return obj
 
-    @pyc.register_raw_handler(pyc.dict_value)
+    @pyc.register_raw_handler(
+        pyc.dict_value, when=pyc.Predicate(is_traced_literal_node, static=True)
+    )
     @pyc.skip_when_tracing_disabled
     def dict_value(
         self,
@@ -1256,7 +1516,10 @@ class DataflowTracer(StackFrameManager):
             scope.scope_name = str(key_obj)
         return obj
 
-    @pyc.register_raw_handler((pyc.list_elt, pyc.tuple_elt))
+    @pyc.register_raw_handler(
+        (pyc.list_elt, pyc.tuple_elt),
+        when=pyc.Predicate(is_traced_literal_node, static=True),
+    )
     @pyc.skip_when_tracing_disabled
     def list_or_tuple_elt(
         self,
@@ -1294,7 +1557,17 @@ class DataflowTracer(StackFrameManager):
         self.node_id_to_loaded_symbols.setdefault(lambda_node_id, []).append(sym)
 
     @pyc.register_raw_handler(pyc.after_stmt)
-    def after_stmt(self, ret_expr: Any, stmt_id: int, frame: FrameType, *_, **__):
+    def after_stmt(
+        self,
+        ret_expr: Any,
+        stmt_id: int,
+        frame: FrameType,
+        *_,
+        entering_body: bool = False,
+        **__,
+    ):
+        if not entering_body and stmt_id in self.loop_iter_marks:
+            self._handle_loop_exit(stmt_id, frame)
         if (
             stmt_id in self.traced_statements
             and self.traced_statements[stmt_id].finished
@@ -1306,6 +1579,9 @@ class DataflowTracer(StackFrameManager):
             self.handle_other_sys_events(
                 None, 0, frame, pyc.after_stmt, stmt_node=cast(ast.stmt, stmt)
             )
+        if entering_body and stmt_id in self.loop_iter_marks:
+            # the loop target only gets traced as part of the first iteration
+            self.loop_iter_marks[stmt_id] = len(self.loop_iter_updated_symbols)
         active_watchpoints = flow().active_watchpoints
         if active_watchpoints:
             if sys.version_info < (3, 7):
@@ -1344,6 +1620,7 @@ class DataflowTracer(StackFrameManager):
             )
         self._module_stmt_counter += 1
         self.tracing_disabled_since_last_module_stmt = False
+        self.comprehension_iter_state.clear()
         return ret
 
     @pyc.register_raw_handler(pyc.before_stmt)
@@ -1354,6 +1631,15 @@ class DataflowTracer(StackFrameManager):
         )
         if trace_stmt.finished:
             return
+        if len(self.active_loops) > 0:
+            self._exit_loops_left_abnormally(frame, stmt_id=stmt_id)
+        if (
+            self.is_tracing_enabled
+            and isinstance(trace_stmt.stmt_node, (ast.For, ast.AsyncFor, ast.While))
+            and flow().mut_settings.loop_summarization_threshold > 1
+        ):
+            self.loop_iter_marks[stmt_id] = len(self.loop_iter_updated_symbols)
+            self.active_loops.append((stmt_id, frame))
         # logger.warning('reenable tracing: %s', site_id)
         if self.prev_trace_stmt_in_cur_frame is not None:
             prev_trace_stmt_in_cur_frame = self.prev_trace_stmt_in_cur_frame
@@ -1361,7 +1647,12 @@ class DataflowTracer(StackFrameManager):
             if isinstance(
                 prev_trace_stmt_in_cur_frame.stmt_node, (ast.For, ast.If, ast.With)
             ):
-                self.after_stmt(None, prev_trace_stmt_in_cur_frame.stmt_id, frame)
+                self.after_stmt(
+                    None,
+                    prev_trace_stmt_in_cur_frame.stmt_id,
+                    frame,
+                    entering_body=True,
+                )
         self.prev_trace_stmt_in_cur_frame = trace_stmt
         if not self.is_tracing_enabled and self._should_attempt_to_reenable_tracing(
             frame
@@ -1372,6 +1663,8 @@ class DataflowTracer(StackFrameManager):
             # the return event (since tracing was already disabled
             # when we got to a `before_stmt` event).
             self.call_depth = 0
+            self.cell_frame_depth = 1
+            self.top_level_cell_frame = frame
             self.call_stack.clear()
             self.lexical_call_stack.clear()
             self.after_stmt_reset_hook()
@@ -1383,16 +1676,27 @@ class DataflowTracer(StackFrameManager):
             assert self.call_depth > 0, (
                 "expected managed call depth > 0, got %d" % self.call_depth
             )
-        call_depth = 0
-        while frame is not None:
-            if flow().is_cell_file(frame.f_code.co_filename):
-                call_depth += 1
-            frame = frame.f_back
-        if flow().is_dev_mode:
-            assert call_depth >= 1, "expected call depth >= 1, got %d" % call_depth
         # TODO: allow reenabling tracing beyond just at the top level
-        if call_depth != 1:
-            return False
+        if frame is not self.top_level_cell_frame:
+            if frame.f_code.co_name != "<module>":
+                # function / lambda / comprehension frames always have the
+                # top-level cell frame somewhere underneath them
+                return False
+            # a module-level frame that started while tracing was disabled
+            # (or e.g. an exec'd cell inside of a line magic); since these
+            # are entered at most once per top-level statement, it is fine
+            # to fall back to walking the stack here
+            call_depth = 0
+            top_level_frame = frame
+            while frame is not None:
+                if flow().is_cell_file(frame.f_code.co_filename):
+                    call_depth += 1
+                frame = frame.f_back
+            if flow().is_dev_mode:
+                assert call_depth >= 1, "expected call depth >= 1, got %d" % call_depth
+            if call_depth != 1:
+                return False
+            self.top_level_cell_frame = top_level_frame
         if len(self.call_stack) == 0:
             stmt_in_top_level_frame = self.prev_trace_stmt_in_cur_frame
         else:
@@ -1520,4 +1824,6 @@ class DataflowTracer(StackFrameManager):
 
         trace_stmt = self._get_or_make_trace_stmt(stmt_node, frame)
         self._maybe_log_event(event, stmt_node, trace_stmt)
+        if event == pyc.return_ and len(self.active_loops) > 0:
+            self._exit_loops_left_abnormally(frame)
         self.state_transition_hook(event, trace_stmt, ret_obj)
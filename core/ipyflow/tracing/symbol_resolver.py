@@ -85,6 +85,8 @@ class ResolveRvalSymbols(
         self.visit_List_or_Tuple(node)
 
     def visit_Dict(self, node: ast.Dict):
+        if id(node) in tracer().constant_literal_node_ids:
+            return
         resolved = tracer().resolve_loaded_symbols(node)
         if not resolved:
             # if id(node) not in tracer().node_id_to_loaded_literal_scope:
@@ -95,6 +97,8 @@ class ResolveRvalSymbols(
             self._add_to_resolved(resolved, node)
 
     def visit_List_or_Tuple(self, node: Union[ast.List, ast.Tuple]):
+        if id(node) in tracer().constant_literal_node_ids:
+            return
         resolved = tracer().resolve_loaded_symbols(node)
         if not resolved:
             # if id(node) not in tracer().node_id_to_loaded_literal_scope:
@@ -277,6 +281,8 @@ def resolve_rval_symbols(
         node = ast.parse(node).body[0]
     if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
         node = node.value
+    if id(node) in tracer().constant_literal_node_ids:
+        return set()
     rval_symbols = ResolveRvalSymbols(should_update_usage_info)(node)
     if len(rval_symbols) == 0:
         prev_cell = cells().current_cell().prev_cell
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from typing import Generator, List, Sequence, Tuple
+
+"""
+Graph helpers for schedule computation. Graphs are given as adjacency lists
+over integer node indices, and sets of nodes are represented as bitsets
+packed into Python ints.
+"""
+
+
+def iter_bits(bits: int) -> Generator[int, None, None]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def strongly_connected_components(
+    successors: Sequence[Sequence[int]],
+) -> List[List[int]]:
+    """
+    Iterative version of Tarjan's algorithm. Components are returned in
+    reverse topological order, i.e., each component comes after every
+    component reachable from it.
+    """
+    num_nodes = len(successors)
+    index = [-1] * num_nodes
+    lowlink = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack: List[int] = []
+    components: List[List[int]] = []
+    next_index = 0
+    for root in range(num_nodes):
+        if index[root] >= 0:
+            continue
+        index[root] = lowlink[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack[root] = True
+        work: List[Tuple[int, int]] = [(root, 0)]
+        while len(work) > 0:
+            node, succ_pos = work[-1]
+            node_succs = successors[node]
+            if succ_pos < len(node_succs):
+                work[-1] = (node, succ_pos + 1)
+                succ = node_succs[succ_pos]
+                if index[succ] < 0:
+                    index[succ] = lowlink[succ] = next_index
+                    next_index += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    work.append((succ, 0))
+                elif on_stack[succ]:
+                    lowlink[node] = min(lowlink[node], index[succ])
+                continue
+            work.pop()
+            if len(work) > 0:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] != index[node]:
+                continue
+            component: List[int] = []
+            while True:
+                member = stack.pop()
+                on_stack[member] = False
+                component.append(member)
+                if member == node:
+                    break
+            components.append(component)
+    return components
+
+
+def union_over_reachable(
+    successors: Sequence[Sequence[int]], bits: Sequence[int]
+) -> List[int]:
+    """
+    For each node, returns the union of `bits` over every node reachable
+    from it, including itself. Each strongly connected component is
+    visited once, sinks first, so the total work is linear in the size of
+    the graph (plus the cost of the bitset unions).
+    """
+    components = strongly_connected_components(successors)
+    component_by_node = [0] * len(successors)
+    for comp_idx, component in enumerate(components):
+        for node in component:
+            component_by_node[node] = comp_idx
+    component_bits = [0] * len(components)
+    for comp_idx, component in enumerate(components):
+        acc = 0
+        for node in component:
+            acc |= bits[node]
+            for succ in successors[node]:
+                # components reachable from this one were already computed
+                acc |= component_bits[component_by_node[succ]]
+        component_bits[comp_idx] = acc
+    return [component_bits[component_by_node[node]] for node in range(len(bits))]
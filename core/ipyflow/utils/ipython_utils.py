@@ -3,7 +3,6 @@ import ast
 import logging
 import sys
 from contextlib import contextmanager
-from io import StringIO
 from typing import Any, Callable, Generator, List, Optional
 
 from IPython import get_ipython
@@ -12,6 +11,8 @@ from IPython.core.displaypub import CapturingDisplayPublisher, DisplayPublisher
 from IPython.core.interactiveshell import ExecutionResult, InteractiveShell
 from IPython.utils.capture import CapturedIO
 
+from ipyflow.utils.output_store import StoredCapturedIO, captured_output_store
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
@@ -160,6 +161,7 @@ class capture_output_tee:
         self.stderr = stderr
         self.display = display
         self.shell = None
+        self.captured: Optional[StoredCapturedIO] = None
 
     def __enter__(self) -> CapturedIO:
         self.sys_stdout = sys.stdout
@@ -171,14 +173,7 @@ class capture_output_tee:
                 self.save_display_pub = None
                 self.display = False
 
-        stdout = stderr = None
         capture_display_pub = None
-        if self.stdout:
-            stdout = StringIO()
-            sys.stdout = Tee(sys.stdout, stdout)  # type: ignore
-        if self.stderr:
-            stderr = StringIO()
-            sys.stderr = Tee(sys.stderr, stderr)  # type: ignore
         if self.display and self.shell is not None:
             self.save_display_pub = self.shell.display_pub
             capture_display_pub = CapturingDisplayPublisher()
@@ -199,11 +194,21 @@ class capture_output_tee:
             outputs = None
         else:
             outputs = capture_display_pub.outputs
-        return CapturedIO(stdout, stderr, outputs)
+        # stream into the captured output store rather than unbounded StringIOs
+        captured = captured_output_store().new_entry(self.stdout, self.stderr, outputs)
+        if self.stdout:
+            sys.stdout = Tee(sys.stdout, captured._stdout)  # type: ignore
+        if self.stderr:
+            sys.stderr = Tee(sys.stderr, captured._stderr)  # type: ignore
+        self.captured = captured
+        return captured
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         sys.stdout = self.sys_stdout
         sys.stderr = self.sys_stderr
+        if self.captured is not None:
+            self.captured.finish()
+            self.captured = None
         if self.display and self.shell:
             self.shell.display_pub = self.save_display_pub
             # sys.displayhook = self.save_display_hook
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
+import weakref
 from threading import Timer
-from typing import Callable
+from typing import Any, Callable, Optional, Set
 
 
 class KeyDict(dict):
@@ -22,6 +23,90 @@ def cleanup_pop(d, key, val):
         d.pop(key, None)
 
 
+class lazy_container:
+    """
+    Descriptor for a container attribute that is only allocated on first
+    access. The container lives in a slot of the same name prefixed with
+    an underscore, which should be initialized to None.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self.factory = factory
+        self.slot: Any = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = owner.__dict__["_" + name]
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        container = self.slot.__get__(obj, objtype)
+        if container is None:
+            container = self.factory()
+            self.slot.__set__(obj, container)
+        return container
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        self.slot.__set__(obj, value)
+
+
+class _WeakObjRef(weakref.ref):
+    __slots__ = ()
+
+
+def is_weak_obj_ref(val: Any) -> bool:
+    return type(val) is _WeakObjRef
+
+
+class maybe_weak_ref:
+    """
+    Descriptor for an attribute that refers to some user object. When
+    `use_weak_ref()` is true and the object's type supports it, only a weak
+    reference is kept, and `on_freed(owner, obj_id)` is called once the object
+    gets freed, after which the attribute reads as None. Otherwise, the object
+    is referenced strongly. The reference lives in a slot of the same name
+    prefixed with an underscore.
+    """
+
+    _non_weakrefable_types: Set[type] = set()
+
+    def __init__(
+        self,
+        use_weak_ref: Callable[[], bool],
+        on_freed: Callable[[Any, int], None],
+    ) -> None:
+        self.use_weak_ref = use_weak_ref
+        self.on_freed = on_freed
+        self.slot: Any = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = owner.__dict__["_" + name]
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        val = self.slot.__get__(obj, objtype)
+        return val() if type(val) is _WeakObjRef else val
+
+    def is_weak_for(self, obj: Any) -> bool:
+        return is_weak_obj_ref(self.slot.__get__(obj, type(obj)))
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        value_type = type(value)
+        if value_type in self._non_weakrefable_types or not self.use_weak_ref():
+            self.slot.__set__(obj, value)
+            return
+        on_freed = self.on_freed
+        obj_id = id(value)
+        try:
+            ref = _WeakObjRef(value, lambda _: on_freed(obj, obj_id))
+        except TypeError:
+            self._non_weakrefable_types.add(value_type)
+            self.slot.__set__(obj, value)
+            return
+        self.slot.__set__(obj, ref)
+
+
 def debounce(wait: float) -> Callable[[Callable[..., None]], Callable[..., None]]:
     """Decorator that will postpone a functions
     execution until after wait seconds
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from IPython.utils.capture import CapturedIO
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+# writes to an already-spilled buffer get batched up to this size before hitting disk
+_SPILLED_WRITE_BATCH_SIZE = 64 * 1024
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class OutputBuffer:
+    """
+    Text stream for captured stdout / stderr. Contents are held in memory
+    until the owning entry gets evicted from its store, after which they
+    live in a file that gets memory-mapped whenever the contents are read.
+    Sizes are measured in characters as a cheap proxy for bytes. If the
+    contents can't be written to disk, they just stay in memory.
+    """
+
+    def __init__(self, entry: "StoredCapturedIO") -> None:
+        self._entry = entry
+        self._chunks: List[str] = []
+        self.mem_size = 0
+        # total number of chars written, whether in memory or on disk
+        self.size = 0
+        self._path: Optional[str] = None
+
+    def write(self, data: str) -> int:
+        self._chunks.append(data)
+        self.mem_size += len(data)
+        self.size += len(data)
+        if self._path is not None and self.mem_size >= _SPILLED_WRITE_BATCH_SIZE:
+            self._entry.store.adjust(self._entry, len(data) - self.spill())
+        else:
+            self._entry.store.adjust(self._entry, len(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def spill(self) -> int:
+        """Moves in-memory contents to disk and returns the number of chars freed."""
+        if len(self._chunks) == 0:
+            return 0
+        # lone surrogates can show up in printed strs, so keep them as-is
+        encoded = "".join(self._chunks).encode("utf-8", "surrogatepass")
+        try:
+            if self._path is None:
+                self._path = self._entry.store.make_spill_path()
+            with open(self._path, "ab") as f:
+                offset = f.tell()
+                try:
+                    f.write(encoded)
+                except OSError:
+                    # don't leave a partial write behind to get duplicated later
+                    f.truncate(offset)
+                    raise
+        except OSError:
+            # spilling happens inside of user prints, so never fail them
+            return 0
+        freed = self.mem_size
+        self._chunks = []
+        self.mem_size = 0
+        return freed
+
+    def getvalue(self) -> str:
+        in_mem = "".join(self._chunks)
+        if self._path is None:
+            return in_mem
+        with open(self._path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return in_mem
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:].decode("utf-8", "surrogatepass") + in_mem
+
+    def release(self) -> None:
+        self._chunks = []
+        self.mem_size = 0
+        if self._path is not None:
+            _remove_quietly(self._path)
+            self._path = None
+
+
+class StoredCapturedIO(CapturedIO):
+    """
+    CapturedIO for a single cell execution whose stdout, stderr and display
+    outputs count against the byte budget of a CapturedOutputStore.
+    """
+
+    def __init__(
+        self,
+        store: "CapturedOutputStore",
+        stdout: bool,
+        stderr: bool,
+        outputs: Optional[List[Dict[str, Any]]],
+    ) -> None:
+        self.store = store
+        self.mem_size = 0
+        self.is_finished = False
+        self._outputs_in_mem: Optional[List[Dict[str, Any]]] = None
+        self._outputs_path: Optional[str] = None
+        self._outputs_total_size = 0
+        super().__init__(
+            OutputBuffer(self) if stdout else None,
+            OutputBuffer(self) if stderr else None,
+            outputs,
+        )
+
+    @property
+    def _outputs(self) -> List[Dict[str, Any]]:
+        if self._outputs_path is None:
+            return [] if self._outputs_in_mem is None else self._outputs_in_mem
+        self.store.touch(self)
+        with open(self._outputs_path, "rb") as f:
+            return pickle.load(f)
+
+    @_outputs.setter
+    def _outputs(self, outputs: List[Dict[str, Any]]) -> None:
+        self._outputs_in_mem = outputs
+
+    def _buffers(self) -> List[OutputBuffer]:
+        return [buf for buf in (self._stdout, self._stderr) if buf is not None]
+
+    @property
+    def stdout(self) -> str:
+        self.store.touch(self)
+        return super().stdout
+
+    @property
+    def stderr(self) -> str:
+        self.store.touch(self)
+        return super().stderr
+
+    def _outputs_size(self) -> int:
+        return sum(
+            len(datum)
+            for output in self._outputs_in_mem or []
+            for datum in output.get("data", {}).values()
+        )
+
+    def finish(self) -> None:
+        # display outputs are appended to by the display publisher during
+        # execution, so they only get accounted for (and spilled) afterwards
+        if self.is_finished:
+            return
+        self.is_finished = True
+        self._outputs_total_size = self._outputs_size()
+        self.store.adjust(self, self._outputs_total_size)
+
+    def total_size(self) -> int:
+        """Size of everything captured, without paging any spilled data in."""
+        return self._outputs_total_size + sum(buf.size for buf in self._buffers())
+
+    def spill(self) -> None:
+        freed = sum(buf.spill() for buf in self._buffers())
+        if self.is_finished and self._outputs_path is None and self._outputs_in_mem:
+            path = None
+            try:
+                path = self.store.make_spill_path()
+                with open(path, "wb") as f:
+                    pickle.dump(self._outputs_in_mem, f)
+            except (OSError, pickle.PicklingError):
+                if path is not None:
+                    _remove_quietly(path)
+                path = None
+            if path is not None:
+                freed += self._outputs_size()
+                self._outputs_path = path
+                self._outputs_in_mem = None
+        self.store.adjust(self, -freed)
+
+    def release(self) -> None:
+        for buf in self._buffers():
+            buf.release()
+        if self._outputs_path is not None:
+            _remove_quietly(self._outputs_path)
+            self._outputs_path = None
+        self._outputs_in_mem = None
+
+
+class CapturedOutputStore:
+    """
+    Tracks captured outputs across cell executions, keeping at most
+    `budget_bytes` resident in memory. When over budget, whole entries
+    get spilled to a temporary directory in least-recently-used order.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = DEFAULT_BUDGET_BYTES) -> None:
+        self.budget_bytes = budget_bytes
+        self.mem_size = 0
+        self._lru: "OrderedDict[int, StoredCapturedIO]" = OrderedDict()
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def new_entry(
+        self,
+        stdout: bool,
+        stderr: bool,
+        outputs: Optional[List[Dict[str, Any]]],
+    ) -> StoredCapturedIO:
+        entry = StoredCapturedIO(self, stdout, stderr, outputs)
+        self._lru[id(entry)] = entry
+        return entry
+
+    def touch(self, entry: StoredCapturedIO) -> None:
+        if id(entry) in self._lru:
+            self._lru.move_to_end(id(entry))
+
+    def adjust(self, entry: StoredCapturedIO, delta: int) -> None:
+        entry.mem_size += delta
+        self.mem_size += delta
+        if delta > 0:
+            self.touch(entry)
+            self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        if self.budget_bytes is None:
+            return
+        for entry in list(self._lru.values()):
+            if self.mem_size <= self.budget_bytes:
+                break
+            if entry.mem_size > 0:
+                entry.spill()
+
+    def make_spill_path(self) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="ipyflow-outputs-")
+        fd, path = tempfile.mkstemp(dir=self._spill_dir.name)
+        os.close(fd)
+        return path
+
+    def discard(self, entry: CapturedIO) -> None:
+        if not isinstance(entry, StoredCapturedIO) or entry.store is not self:
+            return
+        if self._lru.pop(id(entry), None) is None:
+            return
+        self.mem_size -= entry.mem_size
+        entry.mem_size = 0
+        entry.release()
+
+    def clear(self) -> None:
+        for entry in list(self._lru.values()):
+            self.discard(entry)
+
+
+_STORE = CapturedOutputStore()
+
+
+def captured_output_store() -> CapturedOutputStore:
+    return _STORE
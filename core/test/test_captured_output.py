@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import logging
+from test.utils import make_flow_fixture
+
+from ipyflow.api.cells import stderr, stdout
+from ipyflow.utils.output_store import CapturedOutputStore, captured_output_store
+
+logging.basicConfig(level=logging.ERROR)
+
+# Reset dependency graph before each test
+_flow_fixture, run_cell = make_flow_fixture(captured_output_budget_bytes=150)
+
+
+def test_outputs_spill_to_disk_and_page_back_in():
+    run_cell('print("a" * 100)')
+    run_cell('print("b" * 100)')
+    run_cell('import sys; print("c" * 100, file=sys.stderr)')
+    assert captured_output_store().mem_size <= 150
+    assert stdout(1).strip() == "a" * 100
+    assert stdout(2).strip() == "b" * 100
+    assert stderr(3).strip() == "c" * 100
+
+
+def test_discarded_outputs_leave_store():
+    run_cell('print("a" * 500)', cell_id="a")
+    num_entries = len(captured_output_store())
+    run_cell('print("a" * 500)', cell_id="a")
+    # output of the previous execution exceeded the size threshold and got dropped
+    assert len(captured_output_store()) == num_entries
+
+
+def test_spill_failures_keep_output_in_memory():
+    store = CapturedOutputStore(budget_bytes=0)
+    entry = store.new_entry(stdout=True, stderr=False, outputs=None)
+    # lone surrogates can't be encoded as plain utf-8
+    entry._stdout.write("\udc80" * 10)
+    assert entry.stdout == "\udc80" * 10
+    assert entry.total_size() == 10
+
+    def make_spill_path():
+        raise OSError("no space left on device")
+
+    store = CapturedOutputStore(budget_bytes=0)
+    store.make_spill_path = make_spill_path
+    entry = store.new_entry(stdout=True, stderr=False, outputs=None)
+    entry._stdout.write("a" * 10)
+    assert entry.mem_size == 10
+    assert entry.stdout == "a" * 10
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import gc
 import logging
 import os
 import sys
+import weakref
 from test.utils import (
     clear_registered_annotations,
     lookup_symbol_by_name,
@@ -15,6 +17,7 @@ from ipyflow.annotations.compiler import (
     REGISTERED_FUNCTION_SPECS,
     compile_and_register_handlers_for_module,
 )
+from ipyflow.tracing.external_calls import resolve_external_call
 from ipyflow.tracing.external_calls.base_handlers import REGISTERED_HANDLER_BY_FUNCTION
 
 logging.basicConfig(level=logging.ERROR)
@@ -98,6 +101,42 @@ def _test_annotation_registration():
         assert fun in REGISTERED_HANDLER_BY_FUNCTION, "%s not in there" % fun
 
 
+def test_method_resolution_picks_up_newly_registered_handlers():
+    with clear_registered_annotations():
+        import fakelib
+
+        obj = fakelib.OnlyPresentSoThatHandlersCanBeRegistered()
+        for _ in range(2):
+            assert (
+                resolve_external_call(
+                    None, obj, None, "method_a", use_standard_default=False
+                )
+                is None
+            )
+        register_annotations_directory(os.path.dirname(__file__))
+        assert (
+            resolve_external_call(
+                None, obj, None, "method_a", use_standard_default=False
+            )
+            is not None
+        )
+
+
+def test_method_resolution_cache_does_not_keep_classes_alive():
+    class Foo:
+        def method_a(self):
+            pass
+
+    foo_ref = weakref.ref(Foo)
+    assert (
+        resolve_external_call(None, Foo(), None, "method_a", use_standard_default=False)
+        is None
+    )
+    del Foo
+    gc.collect()
+    assert foo_ref() is None
+
+
 def test_mutation_by_kwarg():
     run_cell("lst = []")
     lst_sym = lookup_symbol_by_name("lst")
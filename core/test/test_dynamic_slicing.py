@@ -3,11 +3,12 @@ import functools
 import logging
 import sys
 import textwrap
-from test.utils import make_flow_fixture
+from test.utils import lookup_symbol_by_name, make_flow_fixture
 from typing import Dict
 
 from ipyflow.config import FlowDirection
 from ipyflow.data_model.code_cell import cells
+from ipyflow.data_model.statement import statements
 from ipyflow.singletons import flow
 from ipyflow.slicing.mixin import format_slice
 
@@ -553,6 +554,47 @@ def test_namespace_contributions():
     assert slice_size == len(deps), "got %d" % slice_size
 
 
+def test_slices_unaffected_by_history_compaction():
+    run_cell("x = 0", cell_id=1)
+    run_cell("y = x + 1", cell_id=2)
+    for i in range(3):
+        run_cell(f"z = {i}", cell_id=3)
+    run_cell("w = y + z", cell_id=4)
+    run_cell("y = x + 2", cell_id=2)
+    run_cell("v = y + w", cell_id=5)
+    cell_slice_before = compute_unparsed_slice(8)
+    stmt_slice_before = compute_unparsed_slice_stmts(8)
+    code_before = str(lookup_symbol_by_name("w").code())
+    # drops the executions at counters 2, 3 and 4, along with `z = 0` and `z = 1`
+    assert flow().compact_history(max_versions_per_cell=1) == (3, 2)
+    for ctr in (2, 3, 4):
+        assert ctr not in cells()._cell_by_cell_ctr
+        assert cells().at_counter(ctr) is cells().from_id(ctr if ctr == 2 else 3)
+    assert compute_unparsed_slice(8) == cell_slice_before
+    assert compute_unparsed_slice_stmts(8) == stmt_slice_before
+    # statements from dropped executions that current symbols depend on survive
+    assert str(lookup_symbol_by_name("w").code()) == code_before
+    assert "y = x + 1" in code_before
+
+
+def test_statements_kept_by_compaction_get_revisited():
+    run_cell("x = 0", cell_id=1)
+    run_cell("y = x + 1", cell_id=2)
+    run_cell("w = y + 1", cell_id=3)
+    run_cell("y = x + 2", cell_id=2)
+    assert flow().compact_history(max_versions_per_cell=1) == (1, 0)
+    # `y = x + 1` survives since the current `w` still depends on it
+    assert statements().compacted_cell_nums() == {2}
+    run_cell("w = 0", cell_id=3)
+    assert flow().compact_history(max_versions_per_cell=1) == (1, 2)
+    assert statements().compacted_cell_nums() == set()
+    assert all(
+        stmt.timestamp.cell_num not in (2, 3) for stmt in statements().all_tracked()
+    )
+    cells().from_id(3).update_id("renamed")
+    assert cells().at_counter(3) is cells().from_id("renamed")
+
+
 if sys.version_info >= (3, 8):
 
     def test_slice_with_reactive_modifiers():
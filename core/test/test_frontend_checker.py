@@ -71,6 +71,33 @@ def test_simple():
     assert response.ready_maker_links == {1: {2}}
 
 
+def test_transitive_waiter_links():
+    cells = {
+        0: "x = 0",
+        1: "y = x + 1",
+        2: "z = y + 1",
+        3: "w = z + 1",
+        4: "x = 42",
+    }
+    run_all_cells(cells)
+    response = flow().check_and_link_multiple_cells()
+    assert response.waiting_cells == {2, 3}
+    assert response.ready_cells == {1}
+    assert response.waiter_links == {2: {1}, 3: {1}}
+    assert response.ready_maker_links == {1: {2, 3}}
+
+
+def test_lint_out_of_order_usage():
+    run_cell("x = 0", 1)
+    run_cell("y = x + 1", 0)
+    with override_settings(lint_out_of_order_usages=True):
+        response = flow().check_and_link_multiple_cells()
+    assert [usage["name"] for usage in response.unsafe_order_symbol_usage[0]] == [
+        "x"
+    ]
+    assert 1 not in response.unsafe_order_symbol_usage
+
+
 def test_refresh_after_exception_fixed():
     cells = {
         0: "x = 0",
@@ -96,6 +123,56 @@ def test_refresh_after_val_changed():
     assert response.ready_cells == {2}
 
 
+def test_checker_results_reused_until_resolved_symbols_change():
+    with override_settings(flow_order=FlowDirection.IN_ORDER):
+        run_cell("x = 0", 0)
+        run_cell("y = x + 1", 1)
+        run_cell("z = y + 1", 2)
+        cells().set_cell_positions({0: 0, 1: 1, 2: 2})
+        flow().check_and_link_multiple_cells()
+        cached_by_id = {
+            cell_id: cells().from_id(cell_id)._cached_checker_result
+            for cell_id in range(3)
+        }
+        response = flow().check_and_link_multiple_cells()
+        assert response.waiting_cells == set()
+        for cell_id, cached in cached_by_id.items():
+            assert cached is not None
+            assert cells().from_id(cell_id)._cached_checker_result is cached
+        run_cell("x = 42", 0)
+        response = flow().check_and_link_multiple_cells()
+        assert response.waiting_cells == {2}
+        assert response.ready_cells == {1}
+        assert cells().from_id(1)._cached_checker_result is not cached_by_id[1]
+        assert cells().from_id(2)._cached_checker_result is cached_by_id[2]
+
+
+def test_checker_results_not_cached_in_any_order_mode():
+    # liveness analysis for `b = a` depends on `a` and `b` without resolving them
+    run_cell("a = 0", 0)
+    run_cell("b = a", 1)
+    flow().check_and_link_multiple_cells()
+    assert cells().from_id(1)._cached_checker_result is None
+
+
+def test_cached_checker_result_reregisters_live_symbols():
+    with override_settings(flow_order=FlowDirection.IN_ORDER):
+        run_cell("buf = bytearray(200000)", 0)
+        run_cell("logging.info(buf)", 1)
+        cells().set_cell_positions({0: 0, 1: 1})
+        flow().check_and_link_multiple_cells()
+        cached = cells().from_id(1)._cached_checker_result
+        assert cached is not None
+        # same contents, so the timestamp is preserved but liveness info gets cleared
+        run_cell("buf = bytearray(200000)", 0)
+        response = flow().check_and_link_multiple_cells()
+        assert response.ready_cells == set()
+        assert cells().from_id(1)._cached_checker_result is cached
+        run_cell("buf[0] = 1", 0)
+        response = flow().check_and_link_multiple_cells()
+        assert response.ready_cells == {1}
+
+
 def test_inner_mutation_considered_fresh():
     cells = {
         0: "lst_0 = [0,1,2]",
@@ -663,3 +740,147 @@ def test_dag_edge_changes():
         response = flow().check_and_link_multiple_cells()
         assert response.ready_cells == {2}
         assert response.waiting_cells == {3}
+
+
+def test_content_changed_deltas_only_reanalyze_edited_cells():
+    cells_to_run = {0: "x = 0", 1: "y = x + 1", 2: "z = y + 1"}
+    run_all_cells(cells_to_run)
+    analyzed = []
+    orig_recompute_ast_for_cells = flow()._recompute_ast_for_cells
+
+    def recompute_ast_for_cells(content_by_cell_id):
+        analyzed.append(set(content_by_cell_id.keys()))
+        return orig_recompute_ast_for_cells(content_by_cell_id)
+
+    flow()._recompute_ast_for_cells = recompute_ast_for_cells
+    flow().handle_notify_content_changed(
+        {
+            "cell_metadata_by_id": {
+                cell_id: {
+                    "index": cell_id,
+                    "content": content,
+                    "type": "code",
+                    "content_hash": content,
+                }
+                for cell_id, content in cells_to_run.items()
+            },
+            "cell_metadata_version": 1,
+        }
+    )
+    assert analyzed.pop() == {0, 1, 2}
+    flow().handle_notify_content_changed(
+        {
+            "cell_metadata_version": 2,
+            "cell_metadata_base_version": 1,
+            "cell_metadata_delta": {
+                "changed": {
+                    1: {
+                        "index": 1,
+                        "content": "y = x + 2",
+                        "type": "code",
+                        "content_hash": "y = x + 2",
+                    }
+                },
+                "removed": [],
+            },
+        }
+    )
+    assert analyzed.pop() == {1}
+    assert cells().from_id(1).current_content == "y = x + 2"
+    # move cell 2 above cell 1 without resending its content
+    flow().handle_notify_content_changed(
+        {
+            "cell_metadata_version": 3,
+            "cell_metadata_base_version": 2,
+            "cell_metadata_delta": {
+                "changed": {
+                    1: {"index": 2, "type": "code", "content_hash": "y = x + 2"},
+                    2: {"index": 1, "type": "code", "content_hash": "z = y + 1"},
+                },
+                "removed": [],
+            },
+        }
+    )
+    assert analyzed.pop() == set()
+    assert flow()._prev_cell_metadata_by_id[2]["content"] == "z = y + 1"
+    assert cells().from_id(2).position == 1
+    # stale base version
+    response = flow().handle_notify_content_changed(
+        {
+            "cell_metadata_version": 4,
+            "cell_metadata_base_version": 2,
+            "cell_metadata_delta": {"changed": {}, "removed": [2]},
+        }
+    )
+    assert response["needs_full_resync"]
+    # hash of content we don't have
+    response = flow().handle_notify_content_changed(
+        {
+            "cell_metadata_version": 4,
+            "cell_metadata_base_version": 3,
+            "cell_metadata_delta": {
+                "changed": {0: {"index": 0, "type": "code", "content_hash": "x = 1"}},
+                "removed": [],
+            },
+        }
+    )
+    assert response["needs_full_resync"]
+    assert len(analyzed) == 0
+
+
+class _RecordingComm:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+def test_exec_schedule_responses_are_patches_after_first():
+    cells_to_run = {0: "x = 0", 1: "y = x + 1", 2: "z = y + 1"}
+    run_all_cells(cells_to_run)
+    comm = _RecordingComm()
+    cells_to_run[3] = "x = 42"
+    request = {
+        "type": "compute_exec_schedule",
+        "executed_cell_id": 2,
+        "cell_metadata_by_id": {
+            cell_id: {"index": cell_id, "content": content, "type": "code"}
+            for cell_id, content in cells_to_run.items()
+        },
+        "accepts_exec_schedule_patch": True,
+    }
+    flow().handle(request, comm=comm)
+    first = comm.sent[-1]
+    assert first["exec_schedule_version"] == 1
+    assert "patch" not in first
+    assert set(first["waiting_cells"]) == set()
+    run_cell(cells_to_run[3], 3)
+    flow().handle(dict(request, executed_cell_id=3), comm=comm)
+    second = comm.sent[-1]
+    assert second["exec_schedule_base_version"] == 1
+    assert "waiting_cells" not in second
+    assert set(second["patch"]["waiting_cells"]["added"]) == {2}
+    assert second["patch"]["waiting_cells"]["removed"] == []
+    assert set(second["patch"]["ready_cells"]["added"]) == {1}
+    assert second["patch"]["waiter_links"]["changed"] == {2: [1]}
+    flow().handle(dict(request, executed_cell_id=3), comm=comm)
+    third = comm.sent[-1]
+    assert third["patch"]["waiting_cells"] == {"added": [], "removed": []}
+    assert third["patch"]["waiter_links"] == {"changed": {}, "removed": []}
+    flow().handle(dict(request, executed_cell_id=3, full_snapshot=True), comm=comm)
+    snapshot = comm.sent[-1]
+    assert "patch" not in snapshot
+    assert set(snapshot["waiting_cells"]) == {2}
+    # kernel-initiated pushes on a comm that opted in are patched too
+    flow().handle(
+        {"type": "compute_exec_schedule", "executed_cell_id": 3}, comm=comm
+    )
+    push = comm.sent[-1]
+    assert push["exec_schedule_base_version"] == snapshot["exec_schedule_version"]
+    # comms that never asked for patches get full, unversioned responses
+    other_comm = _RecordingComm()
+    del request["accepts_exec_schedule_patch"]
+    flow().handle(dict(request, executed_cell_id=3), comm=other_comm)
+    assert "patch" not in other_comm.sent[-1]
+    assert "exec_schedule_version" not in other_comm.sent[-1]
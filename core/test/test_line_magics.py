@@ -188,6 +188,31 @@ def test_tags():
     assert cells().current_cell().captured_output.stdout.strip() == "Cell has tags: ()"
 
 
+def test_profile_handlers():
+    assert not flow().handler_profiler.is_enabled
+    run_cell("%flow profile on")
+    assert flow().handler_profiler.is_enabled
+    run_cell("x = [1, 2, 3]")
+    run_cell("y = x[0] + len(x)")
+    run_cell("%flow profile off")
+    assert not flow().handler_profiler.is_enabled
+    stats = flow().handler_profiler.totals(cell_num=3)
+    assert stats["attrsub_tracer"].calls > 0
+    assert stats["after_stmt"].calls > 0
+    assert "after_literal" in flow().handler_profiler.totals(cell_num=2)
+    run_cell("z = x[1]")
+    assert len(flow().handler_profiler.totals(cell_num=5)) == 0
+    run_cell("%flow profile show 3")
+    report = cells().current_cell().captured_output.stdout
+    assert "attrsub_tracer" in report
+    assert "after_literal" not in report
+    profile = flow().handle_get_handler_profile()["profile"]
+    assert not profile["enabled"]
+    assert profile["cells"]["3"]["after_stmt"]["calls"] > 0
+    run_cell("%flow profile clear")
+    assert len(flow().handler_profiler.totals()) == 0
+
+
 def test_warn_out_of_order():
     assert not flow().mut_settings.warn_out_of_order_usages
     run_cell("%flow warn-ooo")
@@ -232,3 +257,36 @@ def test_annotation_registration():
         run_cell(f"%flow register_annotations {os.path.dirname(__file__)}")
         assert len(REGISTERED_CLASS_SPECS) > 0
         assert len(REGISTERED_FUNCTION_SPECS) > 0
+
+
+def test_compact_history():
+    for i in range(3):
+        run_cell(f"x = {i}", cell_id="x")
+    run_cell("y = x + 1")
+    run_cell("%flow compact --per-cell 1")
+    assert cells().from_id(5).captured_output.stdout.strip() == (
+        "Compacted 2 cell executions and 2 statements"
+    )
+    assert 1 not in cells()._cell_by_cell_ctr
+    assert 2 not in cells()._cell_by_cell_ctr
+    assert cells().at_counter(1) is cells().from_id("x")
+    assert flow().mut_settings.history_max_versions_per_cell is None
+    run_cell("%flow compact --window 2 --auto")
+    assert flow().mut_settings.history_window == 2
+    run_cell("%flow compact --no-auto")
+    assert flow().mut_settings.history_window is None
+    assert flow().mut_settings.history_max_versions_per_cell is None
+
+
+def test_memory_report():
+    run_cell("x = 0")
+    run_cell("y = [x + 1, x + 2]")
+    run_cell("print(y)")
+    run_cell("%flow memory --top 2")
+    report = cells().from_id(4).captured_output.stdout
+    for component in ("symbols", "namespaces", "statements", "captured_outputs"):
+        assert component in report, "got %s" % report
+    assert "top symbols by retained size:" in report
+    assert "top cells by retained size:" in report
+    run_cell("%flow memory --top many")
+    assert "Usage: %flow memory" in cells().from_id(5).captured_output.stderr
@@ -7,6 +7,7 @@ from typing import Set, Tuple, Union
 from ipyflow.analysis.live_refs import (
     compute_live_dead_symbol_refs as compute_live_dead_symbol_refs_with_stmts,
 )
+from ipyflow.analysis.live_refs import compute_live_dead_symbol_refs_cached
 from ipyflow.analysis.symbol_ref import SymbolRef
 
 from .utils import make_flow_fixture
@@ -92,6 +93,19 @@ def test_dict_literal():
     assert live == {"bar"}
 
 
+def test_cached_refs_reused_for_same_key():
+    live, dead = compute_live_dead_symbol_refs_cached(
+        ast.parse("x = 5\nprint(foo, x)"), cache_key="test_cached_refs"
+    )
+    live.clear()
+    # the key alone determines the result, and callers get their own copies
+    live, dead = compute_live_dead_symbol_refs_cached(
+        ast.parse("y = 42"), cache_key="test_cached_refs"
+    )
+    assert _simplify_symbol_refs({ref.ref for ref in live}) == {"foo", "print"}
+    assert _simplify_symbol_refs(dead) == {"x"}
+
+
 if sys.version_info >= (3, 8):
 
     def test_walrus():
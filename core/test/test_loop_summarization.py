@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import logging
+from test.utils import make_flow_fixture
+from typing import List
+
+from ipyflow.singletons import flow
+
+logging.basicConfig(level=logging.ERROR)
+
+# Reset dependency graph before each test
+_flow_fixture, run_cell = make_flow_fixture(loop_summarization_threshold=2)
+
+
+def subscript_symbol_names(name: str) -> List[str]:
+    sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation(name)
+    ns = flow().namespaces.get(id(sym.obj))
+    if ns is None:
+        return []
+    return sorted(str(sym) for sym in ns.all_data_symbols_this_indentation())
+
+
+def test_iterations_traced_until_dataflow_stabilizes():
+    run_cell("x = 5\nlst = [0] * 4\nd = {}")
+    run_cell(
+        """
+        for i in range(4):
+            lst[i] = x + i
+            d[i] = lst[i]
+        """
+    )
+    # each iteration creates new subscript symbols, but with the same shape,
+    # so tracing stops once 2 consecutive iterations have matched
+    assert subscript_symbol_names("lst") == ["lst[0]", "lst[1]"]
+    assert subscript_symbol_names("d") == ["d[0]", "d[1]"]
+    assert flow().global_scope.lookup_data_symbol_by_name_this_indentation(
+        "d"
+    ).obj == {i: 5 + i for i in range(4)}
+
+
+def test_loop_state_cleared_when_exception_exits_loop():
+    run_cell(
+        """
+        from ipyflow.singletons import tracer
+        try:
+            for i in range(10):
+                y = i
+                if i == 3:
+                    raise ValueError()
+        except ValueError:
+            num_active_loops = len(tracer().active_loops)
+        """
+    )
+    num_active_loops_sym = (
+        flow().global_scope.lookup_data_symbol_by_name_this_indentation(
+            "num_active_loops"
+        )
+    )
+    assert num_active_loops_sym.obj == 0
+
+
+def test_summarized_symbols_resynced_at_loop_exit():
+    run_cell("y = 0")
+    run_cell(
+        """
+        for i in range(100):
+            y = y + i
+        z = y + 1
+        """
+    )
+    y_sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation("y")
+    z_sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation("z")
+    assert y_sym.obj == sum(range(100))
+    assert y_sym in z_sym.parents
+
+
+def test_loops_in_functions_and_nested_loops():
+    run_cell("x = 2\nd = {}")
+    run_cell(
+        """
+        def f(n):
+            acc = []
+            for j in range(n):
+                acc.append(j * x)
+            return acc
+        w = f(10)
+        """
+    )
+    w_sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation("w")
+    assert w_sym.obj == [j * 2 for j in range(10)]
+    run_cell(
+        """
+        for a in range(3):
+            for b in range(3):
+                d[(a, b)] = a * b
+        """
+    )
+    assert len(subscript_symbol_names("d")) >= 4
+
+
+def test_updated_symbols_trimmed_between_iterations():
+    run_cell(
+        """
+        from ipyflow.singletons import tracer
+        max_logged = 0
+        for i in range(50):
+            if i % 2 == 0:
+                a = i
+            else:
+                b = i
+            max_logged = max(max_logged, len(tracer().loop_iter_updated_symbols))
+        """
+    )
+    # alternating iterations never stabilize, so every one of them is traced
+    b_sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation("b")
+    assert b_sym.obj == 49
+    max_logged_sym = flow().global_scope.lookup_data_symbol_by_name_this_indentation(
+        "max_logged"
+    )
+    assert max_logged_sym.obj <= 3
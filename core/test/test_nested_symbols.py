@@ -4,7 +4,7 @@ from test.utils import assert_bool, make_flow_fixture, skipif_known_failing
 from typing import Optional, Set
 
 from ipyflow.data_model.data_symbol import DataSymbol
-from ipyflow.singletons import flow
+from ipyflow.singletons import flow, tracer
 
 logging.basicConfig(level=logging.ERROR)
 
@@ -178,6 +178,36 @@ def test_nested_readable_name_list_in_tuple():
     )
 
 
+def test_deeply_nested_literal_deps():
+    run_cell("x = object()")
+    run_cell('d = {"a": [{"b": (x, "y")}], "c": [[x], 0]}')
+    x_sym = lookup_symbol(flow().global_scope.lookup_data_symbol_by_name("x").obj)
+    readable_names = set()
+    for sym in lookup_symbols(x_sym.obj):
+        if sym is x_sym:
+            continue
+        readable_names.add(sym.readable_name)
+        assert x_sym in sym.parents, "%s should depend on x" % sym.readable_name
+    assert readable_names == {"d[a][0][b][0]", "d[c][0][0]"}, (
+        "got unexpected aliases %s" % readable_names
+    )
+
+
+def test_large_constant_literal_elements_materialized_lazily():
+    run_cell("tbl = [%s]" % ", ".join(str(i) for i in range(100)))
+    tbl_sym = flow().global_scope.lookup_data_symbol_by_name("tbl")
+    assert flow().namespaces.get(tbl_sym.obj_id) is None
+    run_cell("x = object()")
+    run_cell("tbl[5] = x")
+    x_sym = flow().global_scope.lookup_data_symbol_by_name("x")
+    tbl_ns = flow().namespaces[tbl_sym.obj_id]
+    assert [
+        sym.readable_name for sym in tbl_ns.all_data_symbols_this_indentation()
+    ] == ["tbl[5]"]
+    assert x_sym in tbl_ns.lookup_data_symbol_by_name(5, is_subscript=True).parents
+    assert len(tracer().constant_literal_node_ids) == 0
+
+
 def test_nested_symbol_created_for_symbol_already_existing():
     run_cell("x = 42")
     run_cell("lst = [1, 2, [7, x, 8], 4]")
@@ -228,6 +258,32 @@ def test_list_insert():
     )
 
 
+def test_list_insert_and_pop_with_sparse_symbols():
+    run_cell("lst = list(range(1000))")
+    run_cell("x = object()")
+    run_cell("lst[10] = x")
+    lst_ns = flow().global_scope.lookup_data_symbol_by_name("lst").namespace
+    x_sym = flow().global_scope.lookup_data_symbol_by_name("x")
+    elt_sym = lst_ns.lookup_data_symbol_by_name_this_indentation(10, is_subscript=True)
+    assert x_sym in elt_sym.parents
+    run_cell("lst.insert(0, -1)")
+    assert elt_sym.readable_name == "lst[11]", "got %s" % elt_sym.readable_name
+    assert (
+        lst_ns.lookup_data_symbol_by_name_this_indentation(11, is_subscript=True)
+        is elt_sym
+    )
+    assert (
+        lst_ns.lookup_data_symbol_by_name_this_indentation(10, is_subscript=True)
+        is None
+    )
+    run_cell("lst.pop(0)")
+    assert elt_sym.readable_name == "lst[10]", "got %s" % elt_sym.readable_name
+    assert (
+        lst_ns.lookup_data_symbol_by_name_this_indentation(10, is_subscript=True)
+        is elt_sym
+    )
+
+
 def test_list_delete():
     run_cell("lst = [0, 1, 2, 3, 3, 4, 5, 6]")
     name = lookup_symbol(2).readable_name
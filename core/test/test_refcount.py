@@ -24,3 +24,16 @@ def test_basic():
     # Right now (28/04/2021, hash 9099347) this isn't used anywhere but
     # that may change.
     assert lookup_symbol_by_name("y").get_ref_count() == -1
+
+
+def test_gc_only_visits_symbols_from_previous_execution():
+    run_cell("x = object()", cell_id="a")
+    x_sym = lookup_symbol_by_name("x")
+    assert x_sym in flow().symbols_by_defined_cell_num[x_sym.defined_cell_num]
+    run_cell("y = x", cell_id="b")
+    assert x_sym.defined_cell_num in flow().symbols_by_defined_cell_num
+    run_cell("x = object()", cell_id="a")
+    # symbols from the previous execution of cell "a" get visited exactly once
+    assert x_sym.defined_cell_num not in flow().symbols_by_defined_cell_num
+    assert len(flow().garbage_candidate_symbols) == 0
+    assert len(flow().garbage_candidate_namespaces) == 0
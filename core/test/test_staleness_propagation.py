@@ -4,6 +4,8 @@ import sys
 
 from pyccolo.extra_builtins import EMIT_EVENT
 
+from ipyflow.config import FingerprintMode
+from ipyflow.data_model.utils.fingerprint_utils import fingerprint
 from ipyflow.singletons import flow
 
 from .utils import assert_bool, make_flow_fixture, skipif_known_failing
@@ -308,6 +310,17 @@ def test_empty_list_assignment():
     assert_detected("`b` depends on stale `a`")
 
 
+def test_large_reassignment_with_same_contents():
+    run_cell("a = 'x' * 200000")
+    run_cell("b = a + 'y'")
+    run_cell("a = 'x' * 200000")
+    run_cell("logging.info(b)")
+    assert_not_detected("`a` was reassigned to a value with the same contents")
+    run_cell("a = 'z' * 200000")
+    run_cell("logging.info(b)")
+    assert_detected("`b` depends on stale `a`")
+
+
 # redefined function example from the project prompt
 def test_redefined_function_in_list():
     run_cell(
@@ -1517,6 +1530,28 @@ def test_numpy_subscripting_fp():
     assert_not_detected("`y` depends on unchanged `x[3]` and not on changed `x[0]`")
 
 
+def test_numpy_ufunc_out_arg_mutated():
+    run_cell("import numpy as np")
+    run_cell("x = np.ones(5)")
+    run_cell("y = np.zeros(5)")
+    run_cell("z = y + 1")
+    run_cell("np.sqrt(x)")
+    run_cell("logging.info(z)")
+    assert_not_detected("`z` independent of pure call on `x`")
+    run_cell("np.sqrt(x, out=y)")
+    run_cell("logging.info(z)")
+    assert_detected("`z` depends on `y`, which was overwritten via `out=`")
+
+
+def test_pure_pandas_method_does_not_mutate_caller():
+    run_cell("import pandas as pd")
+    run_cell('df = pd.DataFrame({"a": [0, 1], "b": [2., 3.]})')
+    run_cell("s = df.a.sum()")
+    run_cell("df.info()")
+    run_cell("logging.info(s)")
+    assert_not_detected("`df.info()` does not mutate `df`")
+
+
 def test_old_format_string():
     run_cell("a = 5\nb = 7")
     run_cell('expr_str = "{} + {} = {}".format(a, b, a + b)')
@@ -1676,6 +1711,14 @@ def test_multiline_dictionary_literal():
     assert_detected("`d` depends on stale `bar`")
 
 
+def test_large_constant_literal_element_update():
+    run_cell("tbl = [%s]" % ", ".join(str(i) for i in range(100)))
+    run_cell("y = tbl[3] + 1")
+    run_cell("tbl[3] = 7")
+    run_cell("logging.info(y)")
+    assert_detected("`y` depends on stale `tbl[3]`")
+
+
 def test_exception():
     run_cell("lst = list(range(5))")
     run_cell("x = 6")
@@ -2164,6 +2207,27 @@ def test_tracing_reenabled_after_dup_funcall():
     assert_detected()
 
 
+def test_tracing_reenabled_after_callbacks_from_library_code():
+    run_cell("x = 0")
+    run_cell(
+        """
+        def key(v):
+            w = v + 1
+            return -w
+        """
+    )
+    run_cell(
+        """
+        s = sorted(range(10), key=key)
+        s = sorted(s, key=key)
+        y = x + 1
+        """
+    )
+    run_cell("x = 42")
+    run_cell("logging.info(y)")
+    assert_detected("`y` depends on stale `x`")
+
+
 def test_one_time_tracing_func():
     run_cell("x = 0")
     run_cell("y = 1")
@@ -2641,3 +2705,9 @@ if sys.version_info >= (3, 8):
         assert_detected("`x` depends on old value of `foo.x`")
         run_cell("logging.info(a)")
         assert_detected("`a` depends on old value of `foo.x`")
+
+
+def test_fingerprint_of_self_referential_container():
+    d = {"s": "x" * 10**6}
+    d["self"] = d
+    assert fingerprint(d, FingerprintMode.FULL) is None
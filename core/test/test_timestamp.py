@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import copy
+import itertools
+import pickle
+
+from ipyflow.data_model.timestamp import Timestamp
+
+_PAIRS = [
+    (cell_num, stmt_num)
+    for cell_num in (-1, 0, 1, 42, 10**6)
+    for stmt_num in (-1, 0, 1, 7, 10**6)
+]
+
+
+def test_fields_round_trip():
+    for cell_num, stmt_num in _PAIRS:
+        ts = Timestamp(cell_num, stmt_num)
+        assert ts.cell_num == cell_num
+        assert ts.stmt_num == stmt_num
+        assert ts.plus(1, -1) == Timestamp(cell_num + 1, stmt_num - 1)
+
+
+def test_ordering_matches_tuples():
+    for first, second in itertools.product(_PAIRS, _PAIRS):
+        ts1, ts2 = Timestamp(*first), Timestamp(*second)
+        assert (ts1 < ts2) == (first < second)
+        assert (ts1 == ts2) == (first == second)
+        assert (hash(ts1) == hash(ts2)) or first != second
+    assert max(Timestamp(2, 0), Timestamp(1, 99)) == Timestamp(2, 0)
+
+
+def test_uninitialized():
+    assert not Timestamp.uninitialized().is_initialized
+    assert Timestamp.uninitialized() is Timestamp.uninitialized()
+    assert Timestamp(0, -1).is_initialized
+    assert Timestamp(-1, 0).is_initialized
+
+
+def test_pickle_and_copy():
+    ts = Timestamp(3, 4)
+    for clone in (pickle.loads(pickle.dumps(ts)), copy.deepcopy(ts)):
+        assert type(clone) is Timestamp
+        assert clone == ts
+    assert repr(ts) == "Timestamp(cell_num=3, stmt_num=4)"
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
-from test.utils import make_flow_fixture
+from test.utils import lookup_symbol_by_name, make_flow_fixture
 
 from ipyflow.singletons import flow
 
@@ -46,3 +46,39 @@ def test_dict_hierarchy():
     )
     run_cell('d["foo"]["bar"] = 0')
     assert updated_symbol_names() == sorted(["d[foo][bar]", "d[foo]", "d"])
+
+
+def test_updated_symbols_indexed_by_cell_counter():
+    run_cell("a = 0")
+    run_cell("b = a + 1")
+    run_cell('d = {"foo": a}')
+    run_cell('d["foo"] = b')
+    names_by_ctr = {
+        ctr: sorted(
+            sym.readable_name
+            for sym in flow().symbols_updated_at(ctr)
+            if not sym.is_anonymous
+        )
+        for ctr in range(1, 5)
+    }
+    assert names_by_ctr[1] == ["a"]
+    assert names_by_ctr[2] == ["b"]
+    assert names_by_ctr[3] == ["d", "d[foo]"], "got %s" % names_by_ctr[3]
+    assert names_by_ctr[4] == ["d", "d[foo]"], "got %s" % names_by_ctr[4]
+
+
+def test_collected_symbols_leave_every_updated_symbols_bucket():
+    run_cell("d = {}")
+    run_cell('d["foo"] = 0')
+    run_cell('d["foo"] += 1')
+    d_sym = lookup_symbol_by_name("d")
+    indexed_ctrs = {
+        ctr
+        for ctr, syms in flow().updated_symbols_by_cell_num.items()
+        if d_sym in syms
+    }
+    assert indexed_ctrs == {1, 2, 3}, "got %s" % indexed_ctrs
+    d_sym.mark_garbage()
+    d_sym.collect_self_garbage()
+    for syms in flow().updated_symbols_by_cell_num.values():
+        assert d_sym not in syms
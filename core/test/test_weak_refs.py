@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import logging
+from test.utils import lookup_symbol_by_name, make_flow_fixture
+
+from ipyflow.singletons import flow
+
+logging.basicConfig(level=logging.ERROR)
+
+# Reset dependency graph before each test
+_flow_fixture, run_cell = make_flow_fixture(use_weak_refs=True)
+
+
+def test_weakrefable_objects_held_weakly():
+    run_cell(
+        """
+        class Foo:
+            pass
+        """
+    )
+    run_cell("foo = Foo()")
+    run_cell("lst = [0, 1, 2]")
+    assert lookup_symbol_by_name("foo").holds_obj_weakly
+    assert not lookup_symbol_by_name("lst").holds_obj_weakly
+
+
+def test_ref_count_ignores_weak_refs():
+    run_cell(
+        """
+        class Foo:
+            pass
+        """
+    )
+    run_cell("foo = Foo()")
+    assert lookup_symbol_by_name("foo").get_ref_count() == 1
+    run_cell("bar = foo")
+    assert lookup_symbol_by_name("foo").get_ref_count() == 2
+    assert lookup_symbol_by_name("bar").get_ref_count() == 2
+
+
+def test_deleted_objects_get_freed():
+    run_cell(
+        """
+        class Foo:
+            pass
+        """
+    )
+    run_cell("foo = Foo()")
+    foo_sym = lookup_symbol_by_name("foo")
+    foo_id = foo_sym.obj_id
+    run_cell("del foo")
+    assert foo_sym.obj is None
+    assert foo_sym not in flow().aliases.get(foo_id, set())
+    assert len(flow().freed_obj_refs) == 0
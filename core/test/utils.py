@@ -19,7 +19,11 @@ from ipyflow.data_model.data_symbol import DataSymbol
 from ipyflow.flow import NotebookFlow
 from ipyflow.kernel.kernel import IPyflowKernelBase
 from ipyflow.singletons import flow
-from ipyflow.tracing.external_calls.base_handlers import REGISTERED_HANDLER_BY_FUNCTION
+from ipyflow.tracing.external_calls import clear_external_call_resolution_cache
+from ipyflow.tracing.external_calls.base_handlers import (
+    REGISTERED_HANDLER_BY_FUNCTION,
+    REGISTERED_HANDLER_BY_METHOD,
+)
 from ipyflow.tracing.ipyflow_tracer import DataflowTracer
 
 
@@ -42,19 +46,25 @@ def clear_registered_annotations(clear_afterwards=False):
     orig_class_specs = dict(REGISTERED_CLASS_SPECS)
     orig_function_specs = dict(REGISTERED_FUNCTION_SPECS)
     orig_handlers = dict(REGISTERED_HANDLER_BY_FUNCTION)
+    orig_method_handlers = dict(REGISTERED_HANDLER_BY_METHOD)
     try:
         REGISTERED_CLASS_SPECS.clear()
         REGISTERED_FUNCTION_SPECS.clear()
         REGISTERED_HANDLER_BY_FUNCTION.clear()
+        REGISTERED_HANDLER_BY_METHOD.clear()
+        clear_external_call_resolution_cache()
         yield
     finally:
         if clear_afterwards:
             REGISTERED_CLASS_SPECS.clear()
             REGISTERED_FUNCTION_SPECS.clear()
             REGISTERED_HANDLER_BY_FUNCTION.clear()
+            REGISTERED_HANDLER_BY_METHOD.clear()
         REGISTERED_CLASS_SPECS.update(orig_class_specs)
         REGISTERED_FUNCTION_SPECS.update(orig_function_specs)
         REGISTERED_HANDLER_BY_FUNCTION.update(orig_handlers)
+        REGISTERED_HANDLER_BY_METHOD.update(orig_method_handlers)
+        clear_external_call_resolution_cache()
 
 
 def lookup_symbol_by_name(name: str) -> DataSymbol:
@@ -63,8 +73,7 @@ def lookup_symbol_by_name(name: str) -> DataSymbol:
     return ret
 
 
-# Reset dependency graph before each test to prevent unexpected stale dependency
-def make_flow_fixture(**kwargs) -> Tuple[Any, Any]:
+def make_flow_harness(**kwargs) -> Tuple[Any, Any]:
     os.environ[PYCCOLO_DEV_MODE_ENV_VAR] = "1"
 
     def run_cell(code, cell_id=None, cell_pos=None, ignore_exceptions=False) -> int:
@@ -104,8 +113,8 @@ def make_flow_fixture(**kwargs) -> Tuple[Any, Any]:
     extra_fixture = kwargs.pop("extra_fixture", None)
     flow_direction = kwargs.pop("flow_direction", FlowDirection.ANY_ORDER)
 
-    @pytest.fixture(autouse=True)
-    def init_or_reset_dependency_graph():
+    @contextmanager
+    def flow_context():
         IPyflowKernelBase.clear_instance()
         IPyflowKernelBase.instance(
             store_history=False,
@@ -138,4 +147,16 @@ def make_flow_fixture(**kwargs) -> Tuple[Any, Any]:
                 raise exc
         get_ipython().reset()  # reset ipython state
 
+    return flow_context, run_cell
+
+
+# Reset dependency graph before each test to prevent unexpected stale dependency
+def make_flow_fixture(**kwargs) -> Tuple[Any, Any]:
+    flow_context, run_cell = make_flow_harness(**kwargs)
+
+    @pytest.fixture(autouse=True)
+    def init_or_reset_dependency_graph():
+        with flow_context():
+            yield
+
     return init_or_reset_dependency_graph, run_cell
@@ -30,6 +30,8 @@ const cleanup = new Event('cleanup');
 let dirtyCells: Set<string> = new Set();
 let waitingCells: Set<string> = new Set();
 let readyCells: Set<string> = new Set();
+// ready cells as last sent by the kernel, which patches are relative to
+let kernelReadyCells: Set<string> = new Set();
 let waiterLinks: { [id: string]: string[] } = {};
 let readyMakerLinks: { [id: string]: string[] } = {};
 let activeCell: Cell<ICellModel> = null;
@@ -46,11 +48,15 @@ let lastExecutionHighlights: Highlights = null;
 let executedReactiveReadyCells: Set<string> = new Set();
 let newReadyCells: Set<string> = new Set();
 let forcedReactiveCells: Set<string> = new Set();
+let syncedCellMetadata: HashedCellMetadataMap | null = null;
+let cellMetadataVersion = 0;
+let execScheduleVersion: number | null = null;
 
 function resetState(): void {
   dirtyCells = new Set();
   waitingCells = new Set();
   readyCells = new Set();
+  kernelReadyCells = new Set();
   waiterLinks = {};
   readyMakerLinks = {};
   activeCell = null;
@@ -66,8 +72,126 @@ function resetState(): void {
   executedReactiveReadyCells = new Set();
   newReadyCells = new Set();
   forcedReactiveCells = new Set();
+  syncedCellMetadata = null;
+  cellMetadataVersion = 0;
+  execScheduleVersion = null;
 }
 
+type CellIdsPatch = { added: string[]; removed: string[] };
+
+type CellLinksPatch = {
+  changed: { [id: string]: string[] };
+  removed: string[];
+};
+
+const patchCellIds = (cellIds: Set<string>, patch: CellIdsPatch) => {
+  const patched = new Set(cellIds);
+  patch.removed.forEach((id) => patched.delete(id));
+  patch.added.forEach((id) => patched.add(id));
+  return patched;
+};
+
+const patchCellLinks = (
+  links: { [id: string]: string[] },
+  patch: CellLinksPatch
+) => {
+  const patched = { ...links };
+  patch.removed.forEach((id) => delete patched[id]);
+  return { ...patched, ...patch.changed };
+};
+
+type CellMetadataMap = {
+  [id: string]: {
+    index: number;
+    content: string;
+    type: string;
+  };
+};
+
+type HashedCellMetadataMap = {
+  [id: string]: {
+    index: number;
+    type: string;
+    content_hash: string;
+  };
+};
+
+// FNV-1a; only needs to tell apart versions of the same cell
+const hashContent = (content: string): string => {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < content.length; i++) {
+    hash ^= content.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return `${content.length}:${(hash >>> 0).toString(16)}`;
+};
+
+/**
+ * Computes the cell metadata fields of a request to the kernel. After the
+ * first full sync, only cells that were added, moved, or edited since the
+ * last request get sent (and only edited cells include their content),
+ * along with the ids of removed cells. Returns null if nothing changed and
+ * `skipIfUnchanged` is set.
+ */
+const makeCellMetadataPayload = (
+  cellMetadataById: CellMetadataMap,
+  skipIfUnchanged = false
+): { [key: string]: any } | null => {
+  const hashed: HashedCellMetadataMap = {};
+  for (const [id, metadata] of Object.entries(cellMetadataById)) {
+    hashed[id] = {
+      index: metadata.index,
+      type: metadata.type,
+      content_hash: hashContent(metadata.content),
+    };
+  }
+  const prev = syncedCellMetadata;
+  if (prev === null) {
+    syncedCellMetadata = hashed;
+    cellMetadataVersion += 1;
+    const full: { [id: string]: any } = {};
+    for (const [id, metadata] of Object.entries(cellMetadataById)) {
+      full[id] = { ...metadata, content_hash: hashed[id].content_hash };
+    }
+    return {
+      cell_metadata_version: cellMetadataVersion,
+      cell_metadata_by_id: full,
+    };
+  }
+  const changed: { [id: string]: any } = {};
+  const removed: string[] = [];
+  for (const [id, metadata] of Object.entries(hashed)) {
+    const prevMetadata = prev[id];
+    if (prevMetadata?.content_hash !== metadata.content_hash) {
+      changed[id] = { ...metadata, content: cellMetadataById[id].content };
+    } else if (
+      prevMetadata.index !== metadata.index ||
+      prevMetadata.type !== metadata.type
+    ) {
+      changed[id] = metadata;
+    }
+  }
+  for (const id of Object.keys(prev)) {
+    if (hashed[id] === undefined) {
+      removed.push(id);
+    }
+  }
+  if (
+    skipIfUnchanged &&
+    Object.keys(changed).length === 0 &&
+    removed.length === 0
+  ) {
+    return null;
+  }
+  syncedCellMetadata = hashed;
+  cellMetadataVersion += 1;
+  return {
+    cell_metadata_version: cellMetadataVersion,
+    cell_metadata_base_version: cellMetadataVersion - 1,
+    cell_metadata_delta: { changed, removed },
+  };
+};
+
 /**
  * Initialization data for the jupyterlab-ipyflow extension.
  */
@@ -350,13 +474,7 @@ const connectToComm = (session: ISessionContext, notebook: Notebook) => {
   let disconnected = false;
 
   const gatherCellMetadataAndContent = () => {
-    const cell_metadata_by_id: {
-      [id: string]: {
-        index: number;
-        content: string;
-        type: string;
-      };
-    } = {};
+    const cell_metadata_by_id: CellMetadataMap = {};
     notebook.widgets.forEach((itercell, idx) => {
       const model = itercell.model;
       cell_metadata_by_id[model.id] = {
@@ -373,19 +491,31 @@ const connectToComm = (session: ISessionContext, notebook: Notebook) => {
       notebook.model.contentChanged.disconnect(onContentChanged);
       return;
     }
+    const cellMetadataPayload = makeCellMetadataPayload(
+      gatherCellMetadataAndContent(),
+      true
+    );
+    if (cellMetadataPayload === null) {
+      return;
+    }
     comm.send({
       type: 'notify_content_changed',
-      cell_metadata_by_id: gatherCellMetadataAndContent(),
+      ...cellMetadataPayload,
+      accepts_exec_schedule_patch: true,
     });
   }, 500);
 
-  const requestComputeExecSchedule = (cell?: ICellModel) => {
-    const cell_metadata_by_id = gatherCellMetadataAndContent();
+  const requestComputeExecSchedule = (
+    cell?: ICellModel,
+    fullSnapshot = false
+  ) => {
     comm.send({
       type: 'compute_exec_schedule',
       executed_cell_id: cell?.id,
-      cell_metadata_by_id,
+      ...makeCellMetadataPayload(gatherCellMetadataAndContent()),
       is_reactively_executing: isReactivelyExecuting,
+      accepts_exec_schedule_patch: true,
+      full_snapshot: fullSnapshot,
     });
   };
 
@@ -571,7 +701,20 @@ const connectToComm = (session: ISessionContext, notebook: Notebook) => {
 
   comm.onMsg = (msg) => {
     const payload = msg.content.data;
-    if (disconnected || !(payload.success ?? false)) {
+    if (disconnected) {
+      return;
+    }
+    if (payload.needs_full_resync ?? false) {
+      // the kernel could not apply our last delta, so send everything again
+      syncedCellMetadata = null;
+      if (payload.type === 'compute_exec_schedule') {
+        requestComputeExecSchedule();
+      } else {
+        onContentChanged();
+      }
+      return;
+    }
+    if (!(payload.success ?? false)) {
       return;
     }
     if (payload.type === 'establish') {
@@ -583,8 +726,30 @@ const connectToComm = (session: ISessionContext, notebook: Notebook) => {
       isAltModeExecuting = false;
       lastExecutionMode = payload.exec_mode as string;
     } else if (payload.type === 'compute_exec_schedule') {
-      waitingCells = new Set(payload.waiting_cells as string[]);
-      readyCells = new Set(payload.ready_cells as string[]);
+      if (payload.patch == null) {
+        waitingCells = new Set(payload.waiting_cells as string[]);
+        kernelReadyCells = new Set(payload.ready_cells as string[]);
+        waiterLinks = payload.waiter_links as { [id: string]: string[] };
+        readyMakerLinks = payload.ready_maker_links as {
+          [id: string]: string[];
+        };
+      } else if (payload.exec_schedule_base_version !== execScheduleVersion) {
+        // we missed whatever this patch is relative to
+        execScheduleVersion = null;
+        requestComputeExecSchedule(undefined, true);
+        return;
+      } else {
+        const patch = payload.patch as { [key: string]: any };
+        waitingCells = patchCellIds(waitingCells, patch.waiting_cells);
+        kernelReadyCells = patchCellIds(kernelReadyCells, patch.ready_cells);
+        waiterLinks = patchCellLinks(waiterLinks, patch.waiter_links);
+        readyMakerLinks = patchCellLinks(
+          readyMakerLinks,
+          patch.ready_maker_links
+        );
+      }
+      execScheduleVersion = (payload.exec_schedule_version as number) ?? null;
+      readyCells = new Set(kernelReadyCells);
       newReadyCells = new Set([
         ...newReadyCells,
         ...(payload.new_ready_cells as string[]),
@@ -593,8 +758,6 @@ const connectToComm = (session: ISessionContext, notebook: Notebook) => {
         ...forcedReactiveCells,
         ...(payload.forced_reactive_cells as string[]),
       ]);
-      waiterLinks = payload.waiter_links as { [id: string]: string[] };
-      readyMakerLinks = payload.ready_maker_links as { [id: string]: string[] };
       cellPendingExecution = null;
       const exec_mode = payload.exec_mode as string;
       isReactivelyExecuting =
@@ -16,6 +16,8 @@ const cleanup = new Event('cleanup');
 // ipyflow frontend state
 let waitingCells: Set<string> = new Set();
 let readyCells: Set<string> = new Set();
+// ready cells as last sent by the kernel, which patches are relative to
+let kernelReadyCells: Set<string> = new Set();
 let waiterLinks: { [id: string]: string[] } = {};
 let readyMakerLinks: { [id: string]: string[] } = {};
 let activeCell: any | null = null;
@@ -34,6 +36,9 @@ let lastExecutionHighlights: Highlights | null = null;
 let executedReactiveReadyCells: Set<string> = new Set();
 let newReadyCells: Set<string> = new Set();
 let forcedReactiveCells: Set<string> = new Set();
+let syncedCellMetadata: HashedCellMetadataMap | null = null;
+let cellMetadataVersion = 0;
+let execScheduleVersion: number | null = null;
 
 function getCellInputSection(elem: HTMLElement): Element | null {
   if (elem === null) {
@@ -322,8 +327,118 @@ function gatherCellMetadataById(Jupyter: any): CellMetadataMap {
   return cell_metadata_by_id;
 }
 
+type HashedCellMetadataMap = {
+  [id: string]: {
+    index: number;
+    type: string;
+    content_hash: string;
+  };
+};
+
+// FNV-1a; only needs to tell apart versions of the same cell
+function hashContent(content: string): string {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < content.length; i++) {
+    hash ^= content.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return `${content.length}:${(hash >>> 0).toString(16)}`;
+}
+
+/**
+ * Computes the cell metadata fields of a request to the kernel. After the
+ * first full sync, only cells that were added, moved, or edited since the
+ * last request get sent (and only edited cells include their content),
+ * along with the ids of removed cells. Returns null if nothing changed and
+ * `skipIfUnchanged` is set.
+ */
+function makeCellMetadataPayload(
+  cellMetadataById: CellMetadataMap,
+  skipIfUnchanged = false
+): { [key: string]: any } | null {
+  const hashed: HashedCellMetadataMap = {};
+  for (const [id, metadata] of Object.entries(cellMetadataById)) {
+    hashed[id] = {
+      index: metadata.index,
+      type: metadata.type,
+      content_hash: hashContent(metadata.content)
+    };
+  }
+  const prev = syncedCellMetadata;
+  if (prev === null) {
+    syncedCellMetadata = hashed;
+    cellMetadataVersion += 1;
+    const full: { [id: string]: any } = {};
+    for (const [id, metadata] of Object.entries(cellMetadataById)) {
+      full[id] = { ...metadata, content_hash: hashed[id].content_hash };
+    }
+    return {
+      cell_metadata_version: cellMetadataVersion,
+      cell_metadata_by_id: full
+    };
+  }
+  const changed: { [id: string]: any } = {};
+  const removed: string[] = [];
+  for (const [id, metadata] of Object.entries(hashed)) {
+    const prevMetadata = prev[id];
+    if (prevMetadata?.content_hash !== metadata.content_hash) {
+      changed[id] = { ...metadata, content: cellMetadataById[id].content };
+    } else if (
+      prevMetadata.index !== metadata.index ||
+      prevMetadata.type !== metadata.type
+    ) {
+      changed[id] = metadata;
+    }
+  }
+  for (const id of Object.keys(prev)) {
+    if (hashed[id] === undefined) {
+      removed.push(id);
+    }
+  }
+  if (
+    skipIfUnchanged &&
+    Object.keys(changed).length === 0 &&
+    removed.length === 0
+  ) {
+    return null;
+  }
+  syncedCellMetadata = hashed;
+  cellMetadataVersion += 1;
+  return {
+    cell_metadata_version: cellMetadataVersion,
+    cell_metadata_base_version: cellMetadataVersion - 1,
+    cell_metadata_delta: { changed, removed }
+  };
+}
+
+type CellIdsPatch = { added: string[]; removed: string[] };
+
+type CellLinksPatch = {
+  changed: { [id: string]: string[] };
+  removed: string[];
+};
+
+function patchCellIds(cellIds: Set<string>, patch: CellIdsPatch): Set<string> {
+  const patched = new Set(cellIds);
+  patch.removed.forEach(id => patched.delete(id));
+  patch.added.forEach(id => patched.add(id));
+  return patched;
+}
+
+function patchCellLinks(
+  links: { [id: string]: string[] },
+  patch: CellLinksPatch
+): { [id: string]: string[] } {
+  const patched = { ...links };
+  patch.removed.forEach(id => delete patched[id]);
+  return { ...patched, ...patch.changed };
+}
+
 function connectToComm(Jupyter: any, code_cell: any): () => void {
   let disconnected = false;
+  syncedCellMetadata = null;
+  execScheduleVersion = null;
+  kernelReadyCells = new Set();
   const comm = Jupyter.notebook.kernel.comm_manager.new_comm('ipyflow', {
     interface: 'jupyter'
   });
@@ -341,7 +456,8 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
     comm.send({
       type: 'compute_exec_schedule',
       executed_cell_id: data.cell.cell_id,
-      cell_metadata_by_id: gatherCellMetadataById(Jupyter)
+      ...makeCellMetadataPayload(gatherCellMetadataById(Jupyter)),
+      accepts_exec_schedule_patch: true
     });
   };
 
@@ -383,7 +499,21 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
     // console.log('comm got msg: ');
     // console.log(msg.content.data)
     const payload = msg.content.data;
-    if (disconnected || !(payload.success ?? false)) {
+    if (disconnected) {
+      return;
+    }
+    if (payload.needs_full_resync ?? false) {
+      // the kernel could not apply our last delta, so send everything again
+      syncedCellMetadata = null;
+      comm.send({
+        type: payload.type,
+        ...makeCellMetadataPayload(gatherCellMetadataById(Jupyter)),
+        is_reactively_executing: isReactivelyExecuting,
+        accepts_exec_schedule_patch: true
+      });
+      return;
+    }
+    if (!(payload.success ?? false)) {
       return;
     }
     if (payload.type === 'establish') {
@@ -400,10 +530,17 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
         if (disconnected) {
           return;
         }
-        comm.send({
-          type: 'notify_content_changed',
-          cell_metadata_by_id: gatherCellMetadataById(Jupyter)
-        });
+        const cellMetadataPayload = makeCellMetadataPayload(
+          gatherCellMetadataById(Jupyter),
+          true
+        );
+        if (cellMetadataPayload !== null) {
+          comm.send({
+            type: 'notify_content_changed',
+            ...cellMetadataPayload,
+            accepts_exec_schedule_patch: true
+          });
+        }
         setTimeout(notifyContents, 2000);
       };
       notifyContents();
@@ -447,8 +584,9 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
       });
       comm.send({
         type: 'compute_exec_schedule',
-        cell_metadata_by_id: gatherCellMetadataById(Jupyter),
-        is_reactively_executing: isReactivelyExecuting
+        ...makeCellMetadataPayload(gatherCellMetadataById(Jupyter)),
+        is_reactively_executing: isReactivelyExecuting,
+        accepts_exec_schedule_patch: true
       });
     } else if (payload.type === 'set_exec_mode') {
       isAltModeExecuting = false;
@@ -461,9 +599,37 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
         Jupyter.notebook.execute_cells([idxToExec]);
       }
     } else if (payload.type === 'compute_exec_schedule') {
+      if (payload.patch == null) {
+        waitingCells = new Set((payload.waiting_cells ?? []) as string[]);
+        kernelReadyCells = new Set((payload.ready_cells ?? []) as string[]);
+        waiterLinks = payload.waiter_links as { [id: string]: string[] };
+        readyMakerLinks = payload.ready_maker_links as {
+          [id: string]: string[];
+        };
+      } else if (payload.exec_schedule_base_version !== execScheduleVersion) {
+        // we missed whatever this patch is relative to
+        execScheduleVersion = null;
+        comm.send({
+          type: 'compute_exec_schedule',
+          ...makeCellMetadataPayload(gatherCellMetadataById(Jupyter)),
+          is_reactively_executing: isReactivelyExecuting,
+          accepts_exec_schedule_patch: true,
+          full_snapshot: true
+        });
+        return;
+      } else {
+        const patch = payload.patch;
+        waitingCells = patchCellIds(waitingCells, patch.waiting_cells);
+        kernelReadyCells = patchCellIds(kernelReadyCells, patch.ready_cells);
+        waiterLinks = patchCellLinks(waiterLinks, patch.waiter_links);
+        readyMakerLinks = patchCellLinks(
+          readyMakerLinks,
+          patch.ready_maker_links
+        );
+      }
+      execScheduleVersion = payload.exec_schedule_version ?? null;
+      readyCells = new Set(kernelReadyCells);
       refreshNodeMapping(Jupyter);
-      waitingCells = new Set((payload.waiting_cells ?? []) as string[]);
-      readyCells = new Set((payload.ready_cells ?? []) as string[]);
       newReadyCells = new Set([
         ...newReadyCells,
         ...(payload.new_ready_cells as string[])
@@ -472,8 +638,6 @@ function connectToComm(Jupyter: any, code_cell: any): () => void {
         ...forcedReactiveCells,
         ...(payload.forced_reactive_cells as string[])
       ]);
-      waiterLinks = payload.waiter_links as { [id: string]: string[] };
-      readyMakerLinks = payload.ready_maker_links as { [id: string]: string[] };
       cellPendingExecution = null;
       cellPendingExecutionIdx = null;
       const exec_mode = payload.exec_mode as string;
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import glob
+import importlib
+import os
+import sys
+
+# need PYTHONPATH="." for this to work (when in $ROOT/core)
+try:
+    import benchmark
+except ImportError:
+    sys.path.append(".")
+    import benchmark
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if len(args) > 0 and not args[0].startswith('-'):
+        bench_patt = args[0]
+        bench_args = args[1:]
+    else:
+        bench_patt = None
+        bench_args = args
+    bench_dir = os.path.dirname(benchmark.__file__)
+    # resolve everything up front, since the flow harness resets the IPython
+    # user namespace (which doubles as this script's globals)
+    bench_mains = []
+    for path in sorted(glob.glob(os.path.join(bench_dir, 'bench_*.py'))):
+        name = os.path.basename(path)[:-3]
+        if bench_patt is not None and bench_patt not in name:
+            continue
+        bench_mains.append(importlib.import_module('benchmark.' + name).main)
+    for bench_main in bench_mains:
+        bench_main(bench_args)
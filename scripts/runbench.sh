@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+
+set -e
+
+# usage: ./scripts/runbench.sh [benchmark_name_filter] [-- benchmark args]
+# ref: https://github.com/ipython/ipython/issues/9752
+pushd core
+env PYTHONPATH="." ipython3 --quick --no-banner --quiet --colors=NoColor --simple-prompt ../scripts/bench_runner.py -- $@
+popd